@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Stream bank statement CSV exports into budget planner totals.
+Rows are read in chunks, merchants are matched against a precompiled keyword index,
+and totals are kept per month and budget-planner field (unmatched spending per
+description), so memory grows with months and merchants, not with rows.
+"""
+
+import argparse
+import csv
+import json
+import re
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+
+CHUNK_SIZE = 50000
+MERCHANT_CACHE_SIZE = 100000
+
+# Budget planner field prefix -> data-category used by calculateBudget
+FIELD_CATEGORIES = {
+    'home': 'Home',
+    'insurance': 'Insurance',
+    'transport': 'Transport',
+    'loan': 'Loan Repayments',
+    'food': 'Food & Drink',
+    'family': 'Family',
+    'entertainment': 'Entertainment',
+    'health': 'Health',
+    'clothes': 'Clothes',
+    'education': 'Education',
+    'other': 'Other'
+}
+
+# Income fields read by calculateTotalIncome
+INCOME_FIELDS = ('incomeEmployment', 'incomePension', 'incomeBenefits', 'incomeOther')
+
+# Spending not matched by any keyword is reported on its own, by description, rather than
+# being filed under a planner field it doesn't belong to; the largest are listed
+UNMATCHED_LISTED = 50
+
+# Budget planner field -> merchant keywords found in statement descriptions
+MERCHANT_KEYWORDS = {
+    'homeMortgageRent': ['MORTGAGE', 'NATIONWIDE BS', 'HALIFAX MTG', 'RENT', 'LETTINGS', 'OPENRENT'],
+    'homeGroundRent': ['GROUND RENT', 'SERVICE CHARGE', 'MANAGEMENT CO'],
+    'homeCouncilTax': ['COUNCIL TAX', 'COUNCIL', 'BOROUGH'],
+    'homeGas': ['BRITISH GAS', 'OCTOPUS ENERGY', 'OVO', 'EDF', 'E.ON', 'EON NEXT', 'SCOTTISH POWER'],
+    'homeElectricity': ['ELECTRIC', 'SSE', 'SO ENERGY', 'BULB'],
+    'homeInternet': ['BT GROUP', 'VIRGIN MEDIA', 'PLUSNET', 'TALKTALK', 'HYPEROPTIC', 'COMMUNITY FIBRE'],
+    'homeTVLicense': ['TV LICENCE', 'TV LICENSE'],
+    'homeTVSubs': ['NETFLIX', 'SKY DIGITAL', 'DISNEY PLUS', 'DISNEYPLUS', 'NOW TV', 'PRIME VIDEO'],
+    'homeMobilePhone': ['VODAFONE', 'EE LIMITED', 'O2', 'THREE', 'GIFFGAFF', 'TESCO MOBILE', 'SMARTY', 'LEBARA'],
+    'insuranceLife': ['LIFE ASSURANCE', 'LEGAL & GENERAL', 'AVIVA LIFE', 'ROYAL LONDON', 'VITALITYLIFE'],
+    'insuranceIncomeProtection': ['INCOME PROTECTION'],
+    'insuranceCriticalIllness': ['CRITICAL ILLNESS'],
+    'insurancePet': ['PETPLAN', 'PET INSURANCE', 'MORETHAN PET', 'MANYPETS'],
+    'insuranceDental': ['DENPLAN', 'DENTAL INS'],
+    'insuranceOther': ['INSURANCE', 'HOME INS', 'DIRECT LINE', 'AVIVA'],
+    'transportCarInsurance': ['CAR INSURANCE', 'ADMIRAL', 'HASTINGS', 'CHURCHILL', 'LV=', 'ESURE'],
+    'transportCarTax': ['DVLA', 'VEHICLE TAX'],
+    'transportFuel': ['SHELL', 'ESSO', 'BP', 'TEXACO', 'JET', 'GULF', 'PETROL', 'FUEL'],
+    'transportServicing': ['KWIK FIT', 'HALFORDS', 'MOT', 'GARAGE', 'NATIONAL TYRES'],
+    'transportBreakdown': ['RAC', 'THE AA', 'AA MEMBERSHIP', 'GREEN FLAG'],
+    'transportPublic': ['TFL', 'TRAINLINE', 'NATIONAL RAIL', 'GWR', 'LNER', 'AVANTI', 'STAGECOACH',
+                        'ARRIVA', 'FIRST BUS', 'NORTHERN', 'UBER', 'BOLT'],
+    'transportOther': ['PARKING', 'RINGGO', 'PAYBYPHONE', 'CONGESTION', 'DART CHARGE', 'ULEZ'],
+    'loanPersonal': ['LOAN', 'ZOPA', 'RATESETTER', 'FINANCE'],
+    'loanCar': ['BLACK HORSE', 'CAR FINANCE', 'MOTONOVO', 'PCP'],
+    'loanCreditCard': ['AMERICAN EXPRESS', 'AMEX', 'BARCLAYCARD', 'MBNA', 'CAPITAL ONE', 'CREDIT CARD', 'VANQUIS'],
+    'loanOther': ['KLARNA', 'CLEARPAY', 'PAYPAL CREDIT', 'LAYBUY'],
+    'foodGroceries': ['TESCO', 'SAINSBURY', 'ASDA', 'MORRISONS', 'ALDI', 'LIDL', 'WAITROSE', 'CO-OP',
+                      'COOP', 'ICELAND', 'M&S SIMPLY FOOD', 'OCADO', 'FARMFOODS'],
+    'foodEatingOut': ['RESTAURANT', 'NANDOS', 'WAGAMAMA', 'PIZZA EXPRESS', 'ZIZZI', 'BELLA ITALIA',
+                      'WETHERSPOON', 'PUB', 'BAR'],
+    'foodLunchWork': ['PRET', 'GREGGS', 'COSTA', 'STARBUCKS', 'CAFFE NERO', 'LEON', 'EAT.', 'ITSU', 'SUBWAY'],
+    'foodTakeaways': ['DELIVEROO', 'JUST EAT', 'UBER EATS', 'DOMINOS', 'PAPA JOHNS', 'MCDONALDS', 'KFC',
+                      'BURGER KING'],
+    'familyChildcare': ['NURSERY', 'CHILDMINDER', 'CHILDCARE', 'BREAKFAST CLUB', 'AFTER SCHOOL'],
+    'familySchoolFees': ['SCHOOL FEES', 'PARENTPAY', 'SCHOOLMONEY'],
+    'familyActivities': ['SWIMMING LESSONS', 'SCOUTS', 'BROWNIES', 'DANCE SCHOOL', 'FOOTBALL CLUB'],
+    'familyMaintenance': ['CHILD MAINTENANCE', 'CMS'],
+    'familyPetFood': ['PETS AT HOME', 'JOLLYES', 'BUTCHERS PET', 'TAILS.COM', 'PET FOOD'],
+    'familyVetBills': ['VETS', 'VETERINARY', 'MEDIVET', 'VETS4PETS'],
+    'familySchoolTrips': ['SCHOOL TRIP'],
+    'entertainmentCinema': ['ODEON', 'CINEWORLD', 'VUE', 'PICTUREHOUSE', 'EVERYMAN'],
+    'entertainmentDaysOut': ['NATIONAL TRUST', 'ENGLISH HERITAGE', 'MERLIN', 'ZOO', 'TICKETMASTER', 'SEETICKETS'],
+    'entertainmentHobbies': ['HOBBYCRAFT', 'WATERSTONES', 'GAME', 'STEAM', 'PLAYSTATION', 'XBOX', 'NINTENDO'],
+    'entertainmentAppSubs': ['SPOTIFY', 'APPLE.COM', 'GOOGLE PLAY', 'AUDIBLE', 'YOUTUBE PREMIUM', 'PATREON'],
+    'entertainmentSeasonTickets': ['SEASON TICKET', 'FOOTBALL CLUB TICKETS'],
+    'entertainmentGambling': ['BET365', 'PADDY POWER', 'WILLIAM HILL', 'LADBROKES', 'CORAL', 'SKY BET',
+                              'BETFAIR', 'NATIONAL LOTTERY'],
+    'healthFitness': ['PUREGYM', 'PURE GYM', 'THE GYM', 'DAVID LLOYD', 'NUFFIELD', 'VIRGIN ACTIVE',
+                      'ANYTIME FITNESS', 'GYM'],
+    'healthHaircuts': ['BARBER', 'HAIR', 'SALON', 'BEAUTY', 'NAILS'],
+    'healthDentistry': ['DENTAL', 'DENTIST', 'MYDENTIST'],
+    'healthOpticians': ['SPECSAVERS', 'VISION EXPRESS', 'BOOTS OPTICIANS', 'OPTICIAN'],
+    'clothesChildren': ['MOTHERCARE', 'JOJO MAMAN', 'CLARKS', 'SCHOOL UNIFORM'],
+    'clothesWork': ['PRIMARK', 'NEXT', 'H&M', 'ZARA', 'UNIQLO', 'TK MAXX', 'MARKS & SPENCER', 'ASOS',
+                    'JOHN LEWIS', 'SPORTS DIRECT'],
+    'educationCourses': ['UDEMY', 'COURSERA', 'OPEN UNIVERSITY', 'COLLEGE', 'UNIVERSITY'],
+    'educationSchoolFees': ['UNIFORM'],
+    'educationTuition': ['TUITION', 'TUTOR', 'PIANO LESSONS', 'DRIVING LESSON'],
+    'otherHolidays': ['EASYJET', 'RYANAIR', 'JET2', 'BRITISH AIRWAYS', 'TUI', 'BOOKING.COM', 'AIRBNB',
+                      'EXPEDIA', 'HOTEL', 'PREMIER INN', 'TRAVELODGE'],
+    'otherChristmas': ['CHRISTMAS', 'MOONPIG', 'FUNKY PIGEON', 'CARD FACTORY'],
+    'otherHomeRefurb': ['B&Q', 'WICKES', 'SCREWFIX', 'TOOLSTATION', 'DUNELM', 'IKEA', 'HOMEBASE', 'WILKO']
+}
+
+# Credits are matched against these before falling back to incomeOther
+INCOME_KEYWORDS = {
+    'incomeEmployment': ['SALARY', 'PAYROLL', 'WAGES', 'BGC'],
+    'incomePension': ['PENSION', 'ANNUITY'],
+    'incomeBenefits': ['DWP', 'HMRC', 'UNIVERSAL CREDIT', 'CHILD BENEFIT', 'TAX CREDIT', 'PIP']
+}
+
+# Transfers between a user's own accounts are neither income nor spending
+TRANSFER_KEYWORDS = ['TRANSFER TO', 'TRANSFER FROM', 'TFR', 'OWN ACCOUNT', 'SAVINGS POT', 'ISA']
+
+# Header names recognised in common UK bank exports
+DATE_FORMATS = ('%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%d/%m/%y', '%d.%m.%y', '%d %b %Y', '%d %B %Y', '%d-%b-%Y',
+                '%d %b %y', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S')
+DATE_COLUMNS = ('date', 'transaction date', 'posting date', 'completed date')
+DESCRIPTION_COLUMNS = ('description', 'transaction description', 'details', 'memo', 'name', 'narrative', 'payee')
+AMOUNT_COLUMNS = ('amount', 'value', 'amount (gbp)')
+DEBIT_COLUMNS = ('paid out', 'debit amount', 'money out', 'debit', 'out')
+CREDIT_COLUMNS = ('paid in', 'credit amount', 'money in', 'credit', 'in')
+
+
+def field_category(field_id):
+    """Budget planner data-category for a field id, e.g. foodGroceries -> Food & Drink"""
+    for prefix, category in FIELD_CATEGORIES.items():
+        if field_id.startswith(prefix):
+            return category
+    return 'Other'
+
+
+def compile_keyword_index(keyword_map):
+    """
+    Compile a field -> keywords map into one regex and a keyword -> field lookup.
+    Longer keywords are tried first, so 'UBER EATS' wins over 'UBER'.
+    """
+    lookup = {}
+    for field_id, keywords in keyword_map.items():
+        for keyword in keywords:
+            lookup.setdefault(keyword.upper(), field_id)
+
+    # Keywords must stand alone, so 'RENT' does not match inside 'CURRENT'
+    ordered = sorted(lookup, key=len, reverse=True)
+    pattern = re.compile(r'(?<![A-Z0-9])(?:' +'|'.join(re.escape(k) for k in ordered) + r')(?![A-Z0-9])')
+    return pattern, lookup
+
+
+SPENDING_INDEX = compile_keyword_index(MERCHANT_KEYWORDS)
+INCOME_INDEX = compile_keyword_index(INCOME_KEYWORDS)
+TRANSFER_INDEX = compile_keyword_index({'transfer': TRANSFER_KEYWORDS})
+
+
+def _find_column(header, names):
+    """Index of the first header matching one of the names, or None"""
+    for i, column in enumerate(header):
+        if column.strip().lower() in names:
+            return i
+    return None
+
+
+def _parse_amount(text):
+    """Parse '£1,234.56', '-12.30' or '(12.30)' into a float"""
+    text = text.strip().replace(',', '').replace('£', '')
+    if not text:
+        return 0.0
+    if text[0] == '(' and text[-1] == ')':
+        return -float(text[1:-1])
+    return float(text)
+
+
+@lru_cache(maxsize=4096)
+def _month_key(text):
+    """
+    'YYYY-MM' from a statement date. UK exports are day-first ('05/01/2024', '5/1/2024',
+    '05 Jan 2024') or ISO ('2024-01-05', optionally with a time); anything else raises
+    ValueError so the row is counted as skipped. Cached because dates repeat row after row.
+    """
+    text = text.strip()
+    for date_format in DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+        return f"{parsed.year:04d}-{parsed.month:02d}"
+    raise ValueError(f"unrecognised date {text!r}")
+
+
+def iter_chunks(rows, chunk_size=CHUNK_SIZE):
+    """Yield lists of up to chunk_size rows from any row iterator"""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class BudgetAggregator:
+    """Running per-month, per-field totals; memory grows with months, not rows"""
+
+    def __init__(self):
+        self.months = {}
+        self.unmatched = {}
+        self.rows = 0
+        self.skipped = 0
+        self._spending_cache = {}
+        self._income_cache = {}
+
+    def _classify(self, description, index, cache, default):
+        """Field id for a description, memoised because merchants repeat constantly"""
+        field_id = cache.get(description)
+        if field_id is None:
+            pattern, lookup = index
+            match = pattern.search(description.upper())
+            field_id = lookup[match.group(0)] if match else default
+            if len(cache) >= MERCHANT_CACHE_SIZE:
+                cache.clear()
+            cache[description] = field_id
+        return field_id
+
+    def add_chunk(self, chunk, date_col, desc_col, amount_col=None, debit_col=None, credit_col=None):
+        """Fold a chunk of parsed CSV rows into the running totals"""
+        months = self.months
+        transfer_pattern = TRANSFER_INDEX[0]
+
+        for row in chunk:
+            try:
+                if amount_col is not None:
+                    amount = _parse_amount(row[amount_col])
+                else:
+                    amount = _parse_amount(row[credit_col]) - _parse_amount(row[debit_col])
+                month = _month_key(row[date_col])
+                description = row[desc_col]
+            except (IndexError, ValueError):
+                self.skipped += 1
+                continue
+
+            if amount == 0 or transfer_pattern.search(description.upper()):
+                continue
+
+            if amount < 0:
+                field_id = self._classify(description, SPENDING_INDEX, self._spending_cache, '')
+                amount = -amount
+                if not field_id:
+                    unmatched = self.unmatched.setdefault(month, {})
+                    unmatched[description] = unmatched.get(description, 0.0) + amount
+                    continue
+            else:
+                field_id = self._classify(description, INCOME_INDEX, self._income_cache, 'incomeOther')
+
+            totals = months.get(month)
+            if totals is None:
+                totals = months[month] = {}
+            totals[field_id] = totals.get(field_id, 0.0) + amount
+
+        self.rows += len(chunk)
+
+    def add_csv(self, path, chunk_size=CHUNK_SIZE):
+        """Stream one CSV export into the totals"""
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+
+            date_col = _find_column(header, DATE_COLUMNS)
+            desc_col = _find_column(header, DESCRIPTION_COLUMNS)
+            amount_col = _find_column(header, AMOUNT_COLUMNS)
+            debit_col = _find_column(header, DEBIT_COLUMNS)
+            credit_col = _find_column(header, CREDIT_COLUMNS)
+
+            if date_col is None or desc_col is None:
+                raise ValueError(f"{path}: could not find date and description columns in {header}")
+            if amount_col is None and (debit_col is None or credit_col is None):
+                raise ValueError(f"{path}: need an amount column or paid in/paid out columns")
+
+            for chunk in iter_chunks(reader, chunk_size):
+                self.add_chunk(chunk, date_col, desc_col, amount_col, debit_col, credit_col)
+
+    def month_budget(self, month):
+        """Totals for one month in the shape calculateBudget works with"""
+        return budget_from_fields(self.months.get(month, {}), self.unmatched.get(month, {}))
+
+    def budgets(self):
+        """Budget for every month seen, oldest first"""
+        return {month: self.month_budget(month) for month in sorted(self.months.keys() | self.unmatched.keys())}
+
+    def average_budget(self):
+        """Average monthly budget across all months, for pre-filling the planner"""
+        count = len(self.months.keys() | self.unmatched.keys())
+        if count == 0:
+            return budget_from_fields({})
+
+        combined = {}
+        for totals in self.months.values():
+            for field_id, amount in totals.items():
+                combined[field_id] = combined.get(field_id, 0.0) + amount
+        unmatched = {}
+        for totals in self.unmatched.values():
+            for description, amount in totals.items():
+                unmatched[description] = unmatched.get(description, 0.0) + amount
+        return budget_from_fields({k: v / count for k, v in combined.items()},
+                                  {k: v / count for k, v in unmatched.items()})
+
+
+def budget_from_fields(field_totals, unmatched_totals=None):
+    """
+    Build the calculateBudget result from per-field totals:
+    income fields, expense fields, category totals, totalIncome, totalExpenses and netBalance.
+    Spending no keyword matched (description -> amount) is reported under 'unmatched', with
+    its total and the largest descriptions, and counts towards totalExpenses.
+    """
+    unmatched_totals = unmatched_totals or {}
+    income = {field_id: round(field_totals.get(field_id, 0.0), 2) for field_id in INCOME_FIELDS}
+    fields = {k: round(v, 2) for k, v in field_totals.items() if k not in INCOME_FIELDS}
+
+    categories = {category: 0.0 for category in FIELD_CATEGORIES.values()}
+    for field_id, amount in fields.items():
+        categories[field_category(field_id)] += amount
+    categories = {k: round(v, 2) for k, v in categories.items()}
+
+    largest = sorted(unmatched_totals.items(), key=lambda item: (-item[1], item[0]))[:UNMATCHED_LISTED]
+    unmatched = {
+        'total': round(sum(unmatched_totals.values()), 2),
+        'count': len(unmatched_totals),
+        'largest': [{'description': description, 'amount': round(amount, 2)} for description, amount in largest]
+    }
+
+    total_income = round(sum(income.values()), 2)
+    total_expenses = round(sum(categories.values()) + unmatched['total'], 2)
+
+    return {
+        'income': income,
+        'fields': fields,
+        'categories': categories,
+        'unmatched': unmatched,
+        'totalIncome': total_income,
+        'totalExpenses': total_expenses,
+        'netBalance': round(total_income - total_expenses, 2)
+    }
+
+
+def ingest(paths, chunk_size=CHUNK_SIZE):
+    """Stream a set of CSV exports and return the populated aggregator"""
+    aggregator = BudgetAggregator()
+    for path in paths:
+        aggregator.add_csv(path, chunk_size)
+    return aggregator
+
+
+def main():
+    """Ingest bank statement CSVs and print or save the monthly budgets"""
+    parser = argparse.ArgumentParser(description="Turn bank statement CSV exports into budget planner totals")
+    parser.add_argument('csv_files', nargs='+', help="Bank statement CSV exports")
+    parser.add_argument('--output', help="Write monthly and average budgets to this JSON file")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows per processing chunk")
+    args = parser.parse_args()
+
+    aggregator = ingest(args.csv_files, args.chunk_size)
+    average = aggregator.average_budget()
+
+    print(f"Ingested {aggregator.rows:,} rows across {len(aggregator.months.keys() | aggregator.unmatched.keys())} months ({aggregator.skipped:,} skipped)")
+    print(f"Average monthly income: £{average['totalIncome']:,.2f}")
+    print(f"Average monthly spending: £{average['totalExpenses']:,.2f}")
+    for category, amount in sorted(average['categories'].items(), key=lambda item: -item[1]):
+        if amount > 0:
+            print(f"  {category}: £{amount:,.2f}")
+    if average['unmatched']['total']:
+        print(f"  Not matched to a planner field: £{average['unmatched']['total']:,.2f} "
+              f"({average['unmatched']['count']:,} descriptions, see --output)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'months': aggregator.budgets(), 'average': average}, f, indent=2)
+        print(f"Saved budgets to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
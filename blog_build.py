@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Blog build.
+Renders the Markdown posts in posts/ (see blog_posts.py) through the shared page
+template into blog-<slug>.html (hand-written `layout: static` posts only get the
+template's navigation), and regenerates the post listing in blogs.html and the blog
+section of sitemap.xml from every post's front matter. Posts are only re-rendered
+when their source changes (or the template code does), and files are only written when
+their content changes, so editing one post rewrites one page. build_site.py --watch
+rebuilds the blog along with the generated pages.
+
+The Markdown is a small subset: paragraphs, # headings, - and 1. lists, > quotes,
+| pipe | tables |, **bold**, *italic*, `code`, [links](url) and ![images](src).
+Blocks starting with '<' are passed through as HTML.
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import time
+from datetime import date
+
+import update_sitemap
+from blog_posts import SITE_URL, last_modified, latest_first, parse_post, post_page, sitemap_entries, source_paths
+from responsive_images import load_manifest, rewrite_img_tags
+from site_template import page, replace_nav
+
+INDEX_PAGE = 'blogs.html'
+STATE_FILE = os.path.join('.build-cache', 'blog', 'state.json')
+CODE_FILES = ('blog_build.py', 'blog_posts.py', 'site_template.py')
+SITEMAP_SECTION = 'blog-posts'
+PUBLISH_TIME = 'T09:00:00+00:00'
+AUTHOR = 'QuidWise Team'
+
+INDEX_BLOCK = re.compile(r'(<!-- blog-index:start -->\n)(.*?)([ \t]*<!-- blog-index:end -->)', re.S)
+HEADING = re.compile(r'(#{1,6})\s+(.*)')
+LIST_ITEM = re.compile(r'(?:[-*]|(\d+)\.)\s+(.*)')
+TABLE_RULE = re.compile(r'\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?')
+
+INLINE_RULES = (
+    (re.compile(r'!\[([^\]]*)\]\(([^)\s]+)\)'), r'<img src="\2" alt="\1">'),
+    (re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)'), r'<a href="\2">\1</a>'),
+    (re.compile(r'\*\*(.+?)\*\*'), r'<strong>\1</strong>'),
+    (re.compile(r'(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?![*\w])'), r'<em>\1</em>'),
+)
+
+
+def inline(text):
+    """Inline Markdown to HTML; code spans are escaped and left otherwise untouched"""
+    parts = text.split('`')
+    for i, part in enumerate(parts):
+        if i % 2:
+            parts[i] = f"<code>{html.escape(part, quote=False)}</code>"
+        else:
+            for pattern, replacement in INLINE_RULES:
+                part = pattern.sub(replacement, part)
+            parts[i] = part
+    return ''.join(parts)
+
+
+def _cells(line):
+    return [cell.strip() for cell in line.strip().strip('|').split('|')]
+
+
+def _table(lines):
+    head = ''.join(f"<th>{inline(cell)}</th>" for cell in _cells(lines[0]))
+    rows = [''.join(f"<td>{inline(cell)}</td>" for cell in _cells(line)) for line in lines[2:]]
+    return '\n'.join(['<table>', '    <thead>', f"        <tr>{head}</tr>", '    </thead>', '    <tbody>']
+                     + [f"        <tr>{row}</tr>" for row in rows] + ['    </tbody>', '</table>'])
+
+
+def _list(lines):
+    tag = 'ol' if LIST_ITEM.match(lines[0]).group(1) else 'ul'
+    items = []
+    for line in lines:
+        match = LIST_ITEM.match(line)
+        if match:
+            items.append(match.group(2))
+        else:
+            items[-1] += ' ' + line.strip()
+    return '\n'.join([f"<{tag}>"] + [f"    <li>{inline(item)}</li>" for item in items] + [f"</{tag}>"])
+
+
+def _blocks(chunk):
+    """HTML blocks for one blank-line separated chunk of Markdown"""
+    lines = chunk.split('\n')
+    if lines[0].startswith('<'):
+        return [chunk]
+    if len(lines) > 1 and lines[0].startswith('|') and TABLE_RULE.fullmatch(lines[1].strip()):
+        return [_table(lines)]
+
+    blocks = []
+    paragraph = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        heading = HEADING.fullmatch(line)
+        if heading or LIST_ITEM.match(line) or line.startswith('>'):
+            if paragraph:
+                blocks.append(f"<p>{inline(' '.join(paragraph))}</p>")
+                paragraph = []
+        if heading:
+            level = len(heading.group(1))
+            blocks.append(f"<h{level}>{inline(heading.group(2))}</h{level}>")
+        elif LIST_ITEM.match(line):
+            start = i
+            while i + 1 < len(lines) and not HEADING.fullmatch(lines[i + 1]) and not lines[i + 1].startswith('>'):
+                i += 1
+            blocks.append(_list(lines[start:i + 1]))
+        elif line.startswith('>'):
+            quoted = [line[1:].strip()]
+            while i + 1 < len(lines) and lines[i + 1].startswith('>'):
+                i += 1
+                quoted.append(lines[i][1:].strip())
+            blocks.append(f"<blockquote>\n    <p>{inline(' '.join(quoted))}</p>\n</blockquote>")
+        else:
+            paragraph.append(line.strip())
+        i += 1
+    if paragraph:
+        blocks.append(f"<p>{inline(' '.join(paragraph))}</p>")
+    return blocks
+
+
+def render_markdown(text, indent=''):
+    """HTML for a Markdown document, one block per paragraph with a blank line between"""
+    blocks = []
+    for chunk in re.split(r'\n[ \t]*\n', text.strip('\n')):
+        if chunk.strip():
+            blocks.extend(_blocks(chunk.rstrip()))
+    return '\n\n'.join('\n'.join(f"{indent}{line}" if line else line for line in block.split('\n'))
+                       for block in blocks)
+
+
+def _attr(value):
+    return value.replace('"', '&quot;')
+
+
+def _json(value):
+    return json.dumps(html.unescape(value), ensure_ascii=False)
+
+
+def display_date(iso):
+    day = date.fromisoformat(iso)
+    return f"{day.day} {day:%B %Y}"
+
+
+def render_post(post, body):
+    """The full page for a Markdown post"""
+    url = f"{SITE_URL}/{post_page(post['slug'])}"
+    image_url = f"{SITE_URL}/{post['image']}"
+    description = post.get('description') or post['excerpt']
+    keywords = f'\n    <meta name="keywords" content="{_attr(post["keywords"])}">' if post.get('keywords') else ''
+    published = post['date'] + PUBLISH_TIME
+    modified = last_modified(post) + PUBLISH_TIME
+
+    head = f"""    <meta name="description" content="{_attr(description)}">{keywords}
+    <meta name="author" content="QuidWise">
+    <meta name="robots" content="index, follow">
+    <link rel="canonical" href="{url}">
+
+    <!-- Open Graph / Facebook -->
+    <meta property="og:type" content="article">
+    <meta property="og:url" content="{url}">
+    <meta property="og:title" content="{_attr(post['title'])}">
+    <meta property="og:description" content="{_attr(post.get('og_description') or description)}">
+    <meta property="og:image" content="{image_url}">
+    <meta property="og:site_name" content="QuidWise">
+    <meta property="og:locale" content="en_GB">
+    <meta property="article:published_time" content="{published}">
+    <meta property="article:author" content="QuidWise">
+
+    <!-- Twitter -->
+    <meta name="twitter:card" content="summary_large_image">
+    <meta name="twitter:url" content="{url}">
+    <meta name="twitter:title" content="{_attr(post['title'])}">
+    <meta name="twitter:description" content="{_attr(post.get('twitter_description') or description)}">
+    <meta name="twitter:image" content="{image_url}">
+
+    <title>{post['title']} | QuidWise</title>
+
+    <!-- Structured Data (Schema.org) -->
+    <script type="application/ld+json">
+    {{
+      "@context": "https://schema.org",
+      "@type": "Article",
+      "headline": {_json(post['title'])},
+      "description": {_json(description)},
+      "image": "{image_url}",
+      "author": {{
+        "@type": "Organization",
+        "name": "QuidWise",
+        "url": "{SITE_URL}"
+      }},
+      "publisher": {{
+        "@type": "Organization",
+        "name": "QuidWise",
+        "logo": {{
+          "@type": "ImageObject",
+          "url": "{SITE_URL}/logo.svg"
+        }}
+      }},
+      "datePublished": "{published}",
+      "dateModified": "{modified}",
+      "mainEntityOfPage": {{
+        "@type": "WebPage",
+        "@id": "{url}"
+      }}
+    }}
+    </script>
+
+    <!-- Breadcrumb Schema -->
+    <script type="application/ld+json">
+    {{
+      "@context": "https://schema.org",
+      "@type": "BreadcrumbList",
+      "itemListElement": [{{
+        "@type": "ListItem",
+        "position": 1,
+        "name": "Home",
+        "item": "{SITE_URL}/"
+      }},{{
+        "@type": "ListItem",
+        "position": 2,
+        "name": "Blog",
+        "item": "{SITE_URL}/{INDEX_PAGE}"
+      }},{{
+        "@type": "ListItem",
+        "position": 3,
+        "name": {_json(post.get('breadcrumb') or post['title'])},
+        "item": "{url}"
+      }}]
+    }}
+    </script>"""
+
+    content = f"""    <div class="container">
+        <div class="blog-post">
+            <header class="blog-header">
+                <h1>{post.get('heading') or post['title']}</h1>
+                <div class="blog-meta">
+                    <span><i class="fas fa-calendar"></i> {display_date(post['date'])}</span>
+                    <span><i class="fas fa-clock"></i> {post['read_time']} min read</span>
+                    <span><i class="fas fa-user"></i> {AUTHOR}</span>
+                </div>
+            </header>
+
+            <div class="blog-content">
+                <img src="{post['image']}" alt="{_attr(post.get('image_alt', ''))}" style="width: 100%; max-width: 800px; height: 400px; object-fit: cover; margin: 2rem auto; display: block; border-radius: 8px;">
+
+{render_markdown(body, ' ' * 16)}
+            </div>
+        </div>
+    </div>"""
+    return page(head, content)
+
+
+def render_card(post):
+    """A post's card in the blogs.html listing"""
+    alt = post.get('card_alt') or post.get('image_alt', '')
+    return f"""            <article class="blog-card">
+                <a href="{post_page(post['slug'])}" class="blog-card-link">
+                    <div class="blog-image">
+                        <img src="{post['image']}" alt="{_attr(alt)}" style="width: 100%; height: 200px; object-fit: cover;">
+                    </div>
+                    <div class="blog-content">
+                        <div class="blog-meta">
+                            <span class="blog-date"><i class="fas fa-calendar"></i> {display_date(post['date'])}</span>
+                            <span class="blog-read-time"><i class="fas fa-clock"></i> {post['read_time']} min read</span>
+                        </div>
+                        <h2>{post['title']}</h2>
+                        <p class="blog-excerpt">{post.get('excerpt') or post['description']}</p>
+                        <span class="read-more">Read more <i class="fas fa-arrow-right"></i></span>
+                    </div>
+                </a>
+            </article>
+"""
+
+
+def _write_if_changed(path, text):
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return True
+
+
+def update_index(posts, images, path=INDEX_PAGE):
+    """Regenerate the listing between the blog-index markers in blogs.html; True if it changed"""
+    with open(path, encoding='utf-8') as f:
+        markup = f.read()
+    cards = rewrite_img_tags('\n'.join(render_card(post) for post in posts), images)
+    updated, count = INDEX_BLOCK.subn(lambda m: m.group(1) + cards + m.group(3), markup, count=1)
+    if not count:
+        raise ValueError(f"{path} has no blog-index markers")
+    return _write_if_changed(path, updated)
+
+
+def code_hash():
+    digest = hashlib.sha1()
+    for path in CODE_FILES:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def load_state(path=STATE_FILE):
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return {'code': None, 'images': None, 'posts': {}}
+
+
+def save_state(state, path=STATE_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+
+
+def build(full=False):
+    """
+    Render the posts whose source changed, then bring blogs.html and the sitemap's blog
+    section up to date. Returns (pages rendered, pages changed, pages removed).
+    """
+    state = load_state()
+    code = code_hash()
+    images = load_manifest()
+    # Posts point at the image variants, so a new manifest re-renders them all
+    images_hash = hashlib.sha1(json.dumps(images, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    full = full or state['code'] != code or state.get('images') != images_hash
+    sources = source_paths()
+    posts = []
+    rendered = []
+    changed = []
+
+    for slug, path in sources.items():
+        with open(path, 'rb') as f:
+            source = f.read()
+        digest = hashlib.sha1(source).hexdigest()[:16]
+        cached = state['posts'].get(slug)
+        static = cached and cached['meta'].get('layout') == 'static'
+        if not full and cached and cached['hash'] == digest and (static or os.path.exists(post_page(slug))):
+            posts.append(cached['meta'])
+            continue
+
+        post, body = parse_post(source.decode('utf-8'), slug)
+        if post.get('layout') != 'static':
+            markup = rewrite_img_tags(render_post(post, body), images)
+            if _write_if_changed(post_page(slug), markup):
+                changed.append(post_page(slug))
+            rendered.append(post_page(slug))
+        elif os.path.exists(post_page(slug)):
+            # Hand-written pages keep their content but take the template's navigation
+            with open(post_page(slug), encoding='utf-8') as f:
+                markup = replace_nav(f.read())
+            if _write_if_changed(post_page(slug), markup):
+                changed.append(post_page(slug))
+        state['posts'][slug] = {'hash': digest, 'meta': post}
+        posts.append(post)
+
+    removed = []
+    for slug in [slug for slug in state['posts'] if slug not in sources]:
+        # Hand-written pages stay; they just drop out of the listing
+        if state['posts'].pop(slug)['meta'].get('layout') != 'static' and os.path.exists(post_page(slug)):
+            os.remove(post_page(slug))
+            removed.append(post_page(slug))
+
+    posts = latest_first(posts)
+    if update_index(posts, images):
+        changed.append(INDEX_PAGE)
+        update_sitemap.update_entries([INDEX_PAGE])
+    update_sitemap.update_section(SITEMAP_SECTION, sitemap_entries(posts))
+
+    state['code'] = code
+    state['images'] = images_hash
+    save_state(state)
+    return rendered, changed, removed
+
+
+def main():
+    """Build the blog"""
+    parser = argparse.ArgumentParser(description="Render the Markdown blog posts and the blog listing")
+    parser.add_argument('--full', action='store_true', help="Re-render every post")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rendered, changed, removed = build(full=args.full)
+    print(f"{len(rendered)} posts rendered, {len(changed)} pages changed, {len(removed)} removed "
+          f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+    for path in changed + removed:
+        print(f"  {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Blog post sources.
+Every post is a Markdown file in posts/ named after its slug (posts/isa-guide.md is
+blog-isa-guide.html), starting with a front matter block of `key: value` lines:
+
+    ---
+    title: ISA guide: understanding your tax-free savings options
+    excerpt: From Cash ISAs to Stocks & Shares and Lifetime ISAs, ...
+    date: 2025-10-07
+    read_time: 5
+    image: images/towfiqu-barbhuiya-0ITvgXAU5Oo-unsplash.jpg
+    image_alt: ISA Guide
+    ---
+
+Values are inserted into the pages as HTML. Posts with `layout: static` have a
+hand-written page and are only listed (blogs.html, sitemap.xml); every other post is
+rendered from its Markdown by blog_build.py. Optional keys: updated (the date of the last
+revision), heading, breadcrumb, description, og_description, twitter_description,
+keywords and card_alt.
+"""
+
+import os
+
+POSTS_DIR = 'posts'
+SITE_URL = 'https://www.quidwise.co.uk'
+REQUIRED = ('title', 'date', 'read_time', 'image')
+
+
+def parse_post(text, slug):
+    """(front matter dict, Markdown body) of a post source"""
+    meta = {}
+    body = text
+    if text.startswith('---\n'):
+        header, _, body = text[4:].partition('\n---\n')
+        for line in header.splitlines():
+            if line.strip():
+                key, _, value = line.partition(':')
+                meta[key.strip()] = value.strip()
+    missing = [key for key in REQUIRED if not meta.get(key)]
+    if missing:
+        raise ValueError(f"{POSTS_DIR}/{slug}.md: missing front matter {', '.join(missing)}")
+    if not (meta.get('excerpt') or meta.get('description')):
+        raise ValueError(f"{POSTS_DIR}/{slug}.md: needs an excerpt or a description")
+    meta['slug'] = slug
+    return meta, body.lstrip('\n')
+
+
+def post_page(slug):
+    return f"blog-{slug}.html"
+
+
+def source_paths(posts_dir=POSTS_DIR):
+    """{slug: source path} for every post"""
+    if not os.path.isdir(posts_dir):
+        return {}
+    return {name[:-3]: os.path.join(posts_dir, name)
+            for name in sorted(os.listdir(posts_dir)) if name.endswith('.md')}
+
+
+def load_posts(posts_dir=POSTS_DIR):
+    """Every post's front matter, latest first"""
+    posts = []
+    for slug, path in source_paths(posts_dir).items():
+        with open(path, encoding='utf-8') as f:
+            posts.append(parse_post(f.read(), slug)[0])
+    return latest_first(posts)
+
+
+def latest_first(posts):
+    """Newest first; posts from the same day in slug order"""
+    return sorted(sorted(posts, key=lambda post: post['slug']), key=lambda post: post['date'], reverse=True)
+
+
+def last_modified(post):
+    return max(post['date'], post.get('updated') or post['date'])
+
+
+def sitemap_entries(posts):
+    """Sitemap entries for the posts, in the same shape as update_sitemap's"""
+    return [{
+        'url': f"{SITE_URL}/{post_page(post['slug'])}",
+        'lastmod': last_modified(post),
+        'changefreq': 'monthly',
+        'priority': '0.7'
+    } for post in posts]
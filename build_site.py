@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Incremental build of the generated pages, with a --watch mode.
+Every generated page depends on its generator's code (the module, minus its per-page data
+table, plus every local module it imports), on its own entry in that data and on
+styles.css (through the inlined critical CSS). A page is only re-rendered when the
+signature of its inputs changes. Directories with re-rendered pages then get their
+related links and critical CSS refreshed, and sitemap.xml is updated for the pages whose
+output actually changed. The blog is built incrementally by blog_build.py, and the
+savings estimator's tax schedule in expenses.js is rewritten when the schedule changes.
+--watch polls the inputs' modification times and rebuilds on every save.
+"""
+
+import argparse
+import ast
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+import traceback
+from functools import lru_cache
+
+import blog_build
+import blog_posts
+import critical_css
+import related_pages
+import self_employment
+import update_sitemap
+
+STATE_FILE = os.path.join('.build-cache', 'build-state.json')
+STYLESHEET = 'styles.css'
+POLL_INTERVAL = 0.2
+
+# Generated page families: (output directory, generator module, per-page data table)
+FAMILIES = (
+    ('income-tax-calculator', 'regenerate_income_tax_pages', None),
+    ('stamp-duty-calculator', 'generate_stamp_duty_pages', None),
+    ('expenses', 'generate_expense_pages', 'CATEGORIES'),
+)
+
+# Every module whose code the build depends on, besides what they import
+BUILD_MODULES = [module for _, module, _ in FAMILIES] + ['blog_build']
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:16]
+
+
+def local_imports(module_name):
+    """Local modules (files next to this one) that a module imports"""
+    return _local_imports(module_name, os.stat(f"{module_name}.py").st_mtime_ns)
+
+
+@lru_cache(maxsize=None)
+def _local_imports(module_name, mtime):
+    with open(f"{module_name}.py", encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+    return frozenset(name for name in names if os.path.exists(f"{name}.py"))
+
+
+def dependency_order(module_names):
+    """The modules and everything they import locally, dependencies first"""
+    order = []
+    seen = set()
+
+    def visit(name):
+        if name in seen:
+            return
+        seen.add(name)
+        for dependency in sorted(local_imports(name)):
+            visit(dependency)
+        order.append(name)
+
+    for name in module_names:
+        visit(name)
+    return order
+
+
+def code_hash(module_name, data_name=None):
+    """
+    Hash of the code a family's pages are rendered by: the generator module with its
+    per-page data table cut out, plus the source of every local module it imports.
+    """
+    with open(f"{module_name}.py", encoding='utf-8') as f:
+        source = f.read()
+    if data_name:
+        lines = source.splitlines(keepends=True)
+        for node in ast.parse(source).body:
+            if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == data_name for t in node.targets):
+                lines[node.lineno - 1:node.end_lineno] = ['\n'] * (node.end_lineno - node.lineno + 1)
+        source = ''.join(lines)
+
+    digest = hashlib.sha1(source.encode('utf-8'))
+    for dependency in dependency_order([module_name])[:-1]:
+        digest.update(_file_hash(f"{dependency}.py").encode('ascii'))
+    return digest.hexdigest()[:16]
+
+
+def page_signature(code, data):
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha1(f"{code}\n{payload}".encode('utf-8')).hexdigest()[:16]
+
+
+def load_state(path=STATE_FILE):
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return {'pages': {}, 'outputs': {}, 'stylesheet': None}
+
+
+def save_state(state, path=STATE_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+
+
+def build(state, full=False):
+    """
+    Re-render the pages whose inputs changed and refresh everything downstream of them.
+    Returns (pages rendered, pages whose output changed, pages removed).
+    """
+    rendered = []
+    removed = []
+    touched_dirs = set()
+
+    for directory, module_name, data_name in FAMILIES:
+        module = importlib.import_module(module_name)
+        code = code_hash(module_name, data_name)
+        current = set()
+        for path, data, render in module.pages(directory):
+            key = path.replace(os.sep, '/')
+            current.add(key)
+            signature = page_signature(code, data)
+            if not full and state['pages'].get(key) == signature and os.path.exists(path):
+                continue
+            if key not in state['outputs'] and os.path.exists(path):
+                state['outputs'][key] = _file_hash(path)   # Baseline, so an unchanged page isn't reported
+            os.makedirs(directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(render())
+            state['pages'][key] = signature
+            rendered.append(key)
+            touched_dirs.add(directory)
+
+        # Pages whose data entry has gone
+        for key in [k for k in state['pages'] if k.startswith(f"{directory}/") and k not in current]:
+            if os.path.exists(key):
+                os.remove(key)
+            del state['pages'][key]
+            state['outputs'].pop(key, None)
+            removed.append(key)
+            touched_dirs.add(directory)
+
+    css_dirs = set()
+    stylesheet = _file_hash(STYLESHEET)
+    if stylesheet != state.get('stylesheet'):
+        css_dirs = {directory for directory, _, _ in FAMILIES}
+        state['stylesheet'] = stylesheet
+
+    for directory in sorted(touched_dirs):
+        related_pages.page_label.cache_clear()
+        related_pages.apply_related_links([directory])
+    for directory in sorted(touched_dirs | css_dirs):
+        critical_css.apply_to_directory(directory)
+
+    changed = []
+    for directory in sorted(touched_dirs | css_dirs):
+        for name in sorted(os.listdir(directory)):
+            key = f"{directory}/{name}"
+            if not name.endswith('.html'):
+                continue
+            digest = _file_hash(key)
+            if state['outputs'].get(key) != digest:
+                if key in state['outputs'] or key in rendered:
+                    changed.append(key)
+                state['outputs'][key] = digest
+
+    if changed or removed:
+        update_sitemap.update_entries(changed, removed)
+    save_state(state)
+    if self_employment.update_savings_script():
+        changed.append(self_employment.SAVINGS_SCRIPT)
+
+    # The blog keeps its own sitemap section up to date
+    posts_rendered, posts_changed, posts_removed = blog_build.build(full)
+    return rendered + posts_rendered, changed + posts_changed, removed + posts_removed
+
+
+def watched_files():
+    """Every input file: the generators, the local modules they import, the stylesheet and the posts"""
+    modules = dependency_order(BUILD_MODULES)
+    return [f"{module}.py" for module in modules] + [STYLESHEET] + list(blog_posts.source_paths().values())
+
+
+def _mtimes(paths):
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+
+def reload_modules(changed_files):
+    """Reload changed modules and every module that imports them, dependencies first"""
+    changed = {path[:-3] for path in changed_files if path.endswith('.py')}
+    dirty = set()
+    for name in dependency_order(BUILD_MODULES):
+        if name in changed or local_imports(name) & dirty:
+            dirty.add(name)
+            if name in sys.modules:
+                importlib.reload(sys.modules[name])
+    return dirty
+
+
+def report(rendered, changed, removed, elapsed):
+    print(f"{len(rendered)} rendered, {len(changed)} changed, {len(removed)} removed in {elapsed * 1000:.0f}ms")
+    for key in (changed + removed)[:10]:
+        print(f"  {key}")
+
+
+def watch(state):
+    """Rebuild whenever an input changes, until interrupted"""
+    mtimes = _mtimes(watched_files())
+    print(f"Watching {len(mtimes)} files (Ctrl+C to stop)")
+    while True:
+        time.sleep(POLL_INTERVAL)
+        # Re-listed on every poll, so new and deleted posts are picked up
+        current = _mtimes(watched_files())
+        changed_files = sorted(path for path in current.keys() | mtimes.keys() if current.get(path) != mtimes.get(path))
+        if not changed_files:
+            continue
+        start = time.perf_counter()
+        print(f"Changed: {', '.join(changed_files)}")
+        try:
+            reload_modules(changed_files)
+            report(*build(state), time.perf_counter() - start)
+        except Exception:
+            # Half-saved files are common while editing; wait for the next save
+            traceback.print_exc()
+        mtimes = _mtimes(watched_files())
+
+
+def main():
+    """Build the generated pages incrementally, optionally watching for changes"""
+    parser = argparse.ArgumentParser(description="Incrementally build the generated pages")
+    parser.add_argument('--watch', action='store_true', help="Keep rebuilding as inputs change")
+    parser.add_argument('--full', action='store_true', help="Re-render every page")
+    args = parser.parse_args()
+
+    state = load_state()
+    start = time.perf_counter()
+    report(*build(state, full=args.full), time.perf_counter() - start)
+    if args.watch:
+        try:
+            watch(state)
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Critical CSS build stage for generated pages.
+Works out which styles.css rules a template family actually uses, inlines that subset
+in <head> and loads the full stylesheet and Font Awesome without blocking rendering.
+Pages from one generator share a template, so each family gets one signature (the
+tags, classes and ids of a spread of its pages), the subset is keyed by a hash of that
+signature plus styles.css, and the same subset is inlined into every page of the family.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import time
+
+STYLESHEET = 'styles.css'
+CACHE_DIR = os.path.join('.build-cache', 'critical-css')
+
+# Directories of generated pages, one template family each
+PAGE_DIRS = ('income-tax-calculator', 'stamp-duty-calculator', 'expenses')
+
+START_MARKER = '<!-- critical-css:start -->'
+END_MARKER = '<!-- critical-css:end -->'
+
+# Any <link> tag; whether it is a stylesheet is decided from its attributes, in any order
+LINK_TAG = re.compile(r'[ \t]*<link\b([^>]*)>\n?', re.I)
+ATTRIBUTE = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))')
+INJECTED_BLOCK = re.compile(re.escape(START_MARKER) + r'.*?' + re.escape(END_MARKER) + r'\n?', re.S)
+
+# Pages, spread evenly across a directory, whose markup stands in for the whole family
+SAMPLE_PAGES = 12
+
+# Selectors that apply to every page
+ALWAYS = {'*', 'html', 'body', ':root'}
+
+_subset_cache = {}
+
+
+def parse_rules(css):
+    """
+    Split a stylesheet into (prelude, body) pairs. At-rules that contain rules
+    (@media, @supports) come back with a list of nested pairs as their body.
+    """
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    rules = []
+    i = 0
+    while i < len(css):
+        open_brace = css.find('{', i)
+        if open_brace == -1:
+            break
+        prelude = css[i:open_brace].strip()
+
+        depth = 1
+        j = open_brace + 1
+        while depth and j < len(css):
+            if css[j] == '{':
+                depth += 1
+            elif css[j] == '}':
+                depth -= 1
+            j += 1
+        body = css[open_brace + 1:j - 1]
+
+        if prelude.startswith(('@media', '@supports')):
+            rules.append((prelude, parse_rules(body)))
+        else:
+            rules.append((prelude, body.strip()))
+        i = j
+    return rules
+
+
+def page_signature(markup):
+    """Tags, classes and ids used in a page's markup"""
+    tags = set(re.findall(r'<([a-zA-Z][a-zA-Z0-9-]*)', markup))
+    classes = set()
+    for value in re.findall(r'class="([^"]*)"', markup):
+        classes.update(value.split())
+    ids = set(re.findall(r'id="([^"]*)"', markup))
+    return frozenset(t.lower() for t in tags), frozenset(classes), frozenset(ids)
+
+
+def family_signature(pages, sample_size=SAMPLE_PAGES):
+    """
+    One signature for a template family: the union over sample_size of its pages, spread
+    evenly from the first to the last name so sections that only some salaries or prices
+    show are still seen. pages maps file name to markup.
+    """
+    names = sorted(pages)
+    if len(names) > sample_size > 1:
+        step = (len(names) - 1) / (sample_size - 1)
+        names = [names[round(i * step)] for i in range(sample_size)]
+    tags, classes, ids = set(), set(), set()
+    for name in names:
+        page_tags, page_classes, page_ids = page_signature(_without_injection(pages[name]))
+        tags |= page_tags
+        classes |= page_classes
+        ids |= page_ids
+    return frozenset(tags), frozenset(classes), frozenset(ids)
+
+
+def selector_used(selector, signature):
+    """Whether a selector could match anything in a page with this signature"""
+    tags, classes, ids = signature
+    selector = selector.strip()
+    if selector in ALWAYS:
+        return True
+    # Pseudo-classes/elements and attribute tests don't decide whether the element exists
+    simple = re.sub(r'::?[a-zA-Z-]+(\([^)]*\))?|\[[^\]]*\]', '', selector)
+    for compound in re.split(r'[\s>+~]+', simple):
+        if not compound or compound == '*':
+            continue
+        tag = re.match(r'^[a-zA-Z][a-zA-Z0-9-]*', compound)
+        if tag and tag.group(0).lower() not in tags:
+            return False
+        if any(c not in classes for c in re.findall(r'\.([\w-]+)', compound)):
+            return False
+        if any(i not in ids for i in re.findall(r'#([\w-]+)', compound)):
+            return False
+    return True
+
+
+def used_rules(rules, signature):
+    """CSS text for the rules whose selectors match the signature"""
+    out = []
+    for prelude, body in rules:
+        if isinstance(body, list):
+            inner = used_rules(body, signature)
+            if inner:
+                out.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith('@'):
+            # @keyframes, @font-face: small, and kept rules may refer to them
+            out.append(f"{prelude}{{{_compact(body)}}}")
+        else:
+            selectors = [s for s in prelude.split(',') if selector_used(s, signature)]
+            if selectors:
+                out.append(f"{','.join(s.strip() for s in selectors)}{{{_compact(body)}}}")
+    return ''.join(out)
+
+
+def _compact(body):
+    return re.sub(r'\s*([:;,{}])\s*', r'\1', body)
+
+
+def template_hash(signature, stylesheet_text):
+    """Cache key for a template family: its signature plus the stylesheet it is cut from"""
+    tags, classes, ids = signature
+    digest = hashlib.sha1(stylesheet_text.encode('utf-8'))
+    for part in (tags, classes, ids):
+        digest.update(('|'.join(sorted(part)) + '\n').encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def critical_subset(signature, stylesheet_text, cache_dir=CACHE_DIR):
+    """Critical CSS for a signature, from memory, then disk, then computed"""
+    key = template_hash(signature, stylesheet_text)
+    if key in _subset_cache:
+        return _subset_cache[key]
+
+    path = os.path.join(cache_dir, f"{key}.css")
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            css = f.read()
+    else:
+        css = used_rules(parse_rules(stylesheet_text), signature)
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(css)
+    _subset_cache[key] = css
+    return css
+
+
+def _link_attributes(match):
+    # findall gives '' for the quoting styles that didn't match
+    return {name.lower(): ''.join(values) for name, *values in ATTRIBUTE.findall(match.group(1))}
+
+
+def stylesheet_links(markup):
+    """(match, href) for each <link rel="stylesheet" href="..."> however its attributes are written"""
+    links = []
+    for match in LINK_TAG.finditer(markup):
+        attributes = _link_attributes(match)
+        if 'stylesheet' in attributes.get('rel', '').lower().split() and attributes.get('href'):
+            links.append((match, attributes['href']))
+    return links
+
+
+def _async_links(hrefs):
+    """Non-blocking stylesheet links, with a <noscript> fallback"""
+    lines = []
+    for href in hrefs:
+        lines.append(f'    <link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">')
+    lines.append('    <noscript>' + ''.join(f'<link rel="stylesheet" href="{href}">' for href in hrefs) + '</noscript>')
+    return '\n'.join(lines)
+
+
+def inline_critical_css(markup, css, hrefs):
+    """Replace the blocking stylesheet links (or a previous injection) with inlined CSS"""
+    block = f"    {START_MARKER}\n    <style>{css}</style>\n{_async_links(hrefs)}\n    {END_MARKER}\n"
+    if START_MARKER in markup:
+        return INJECTED_BLOCK.sub(lambda _: block.lstrip(' '), markup, count=1)
+
+    links = stylesheet_links(markup)
+    if not links:
+        return markup
+    start = links[0][0].start()
+    pieces = [markup[:start], block]
+    position = start
+    for match, _ in links:
+        pieces.append(markup[position:match.start()])
+        position = match.end()
+    pieces.append(markup[position:])
+    return ''.join(pieces)
+
+
+def _stylesheet_hrefs(markup):
+    """Stylesheets a page loads, from its links or from a previous injection"""
+    if START_MARKER in markup:
+        block = INJECTED_BLOCK.search(markup).group(0)
+        return list(dict.fromkeys(re.findall(r'<link rel="preload" href="([^"]+)" as="style"', block)))
+    return [href for _, href in stylesheet_links(markup)]
+
+
+def _without_injection(markup):
+    return INJECTED_BLOCK.sub('', markup)
+
+
+def apply_to_directory(directory, stylesheet=STYLESHEET, cache_dir=CACHE_DIR):
+    """
+    Inline critical CSS into every page in a generated-page directory.
+    The pages share one template, so the subset is cut once from the family signature
+    and the same block goes into every page.
+    """
+    with open(stylesheet, encoding='utf-8') as f:
+        stylesheet_text = f.read()
+
+    pages = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.html'):
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                pages[name] = f.read()
+
+    css = critical_subset(family_signature(pages), stylesheet_text, cache_dir)
+
+    updated_pages = 0
+    for name, markup in pages.items():
+        hrefs = _stylesheet_hrefs(markup)
+        if not hrefs:
+            continue
+        updated = inline_critical_css(markup, css, hrefs)
+        if updated != markup:
+            with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+                f.write(updated)
+            updated_pages += 1
+    return len(pages), updated_pages, len(css)
+
+
+def main():
+    """Inline critical CSS into the generated page directories"""
+    parser = argparse.ArgumentParser(description="Inline critical CSS into generated pages")
+    parser.add_argument('directories', nargs='*', default=list(PAGE_DIRS))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for directory in args.directories:
+        if os.path.isdir(directory):
+            pages, updated, size = apply_to_directory(directory)
+            print(f"{directory}: {updated} of {pages} pages updated, {size:,} bytes of critical CSS")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
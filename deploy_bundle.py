@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Delta deploy bundles.
+Compares a manifest of the files Render publishes (the git tree: everything not matched
+by .gitignore) with the manifest of the last deployment and streams only the new and
+changed files into a tar.gz, together with the list of deleted files. Files are only
+re-hashed when their size or modification time changes, so apart from one stat per file
+the work is proportional to the number of changed files.
+
+    python deploy_bundle.py                         # bundle what changed to .build-cache/deploy/deploy.tar.gz
+    python deploy_bundle.py --mark-deployed         # once the upload has succeeded
+
+The bundle carries two extra members: .deploy/deleted.txt (one path per line, first in
+the archive so the receiver can delete before unpacking) and .deploy/manifest.json (the
+full manifest of this deployment, last). Pass a manifest.json from a previous bundle as
+--base to diff against a deployment made from another machine.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import tarfile
+import time
+
+from site_files import ALWAYS_EXCLUDED, published_files
+
+CACHE_DIR = os.path.join('.build-cache', 'deploy')
+STAT_CACHE = os.path.join(CACHE_DIR, 'stat-cache.json')
+DEPLOYED_MANIFEST = os.path.join(CACHE_DIR, 'deployed.json')
+PENDING_MANIFEST = os.path.join(CACHE_DIR, 'pending.json')
+DEFAULT_BUNDLE = os.path.join(CACHE_DIR, 'deploy.tar.gz')
+MANIFEST_VERSION = 1
+
+# A bundle unpacked into the tree leaves .deploy/ behind; it is never published
+EXCLUDED = ALWAYS_EXCLUDED | {'.deploy'}
+DELETED_MEMBER = '.deploy/deleted.txt'
+MANIFEST_MEMBER = '.deploy/manifest.json'
+READ_SIZE = 1 << 16
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while chunk := f.read(READ_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def _load_json(path, default):
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return default
+
+
+def _save_json(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(payload, separators=(',', ':'), sort_keys=True))
+
+
+def current_manifest(root='.', stat_cache_file=STAT_CACHE, skip=()):
+    """
+    {path: content hash} for the published files, less the paths in `skip`. Hashes are
+    reused from the stat cache while a file's size and mtime are unchanged.
+    Returns (manifest, files hashed).
+    """
+    cache = _load_json(stat_cache_file, {})
+    manifest = {}
+    fresh = {}
+    hashed = 0
+    for path, st in published_files(root, EXCLUDED):
+        if path in skip:
+            continue
+        cached = cache.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            digest = cached[2]
+        else:
+            digest = file_hash(os.path.join(root, path))
+            hashed += 1
+        manifest[path] = digest
+        fresh[path] = [st.st_size, st.st_mtime_ns, digest]
+    if hashed or len(fresh) != len(cache):
+        _save_json(stat_cache_file, fresh)
+    return manifest, hashed
+
+
+def load_manifest(path):
+    """A deployed manifest's {path: hash}; empty (so everything is new) if there isn't one"""
+    manifest = _load_json(path, None)
+    if manifest is None:
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"{path}: unsupported manifest version {manifest.get('version')}")
+    return manifest['files']
+
+
+def diff_manifests(base, current):
+    """(new or changed paths, deleted paths), both sorted"""
+    changed = sorted(path for path, digest in current.items() if base.get(path) != digest)
+    deleted = sorted(base.keys() - current.keys())
+    return changed, deleted
+
+
+def _add_bytes(tar, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    info.mode = 0o644
+    tar.addfile(info, io.BytesIO(data))
+
+
+def write_bundle(fileobj, changed, deleted, manifest, root='.'):
+    """
+    Stream a tar.gz of the changed files to fileobj: the deletion list first, then the
+    files, then the new manifest. Each file is read in chunks, so memory use is constant.
+    Returns the bytes of file content written.
+    """
+    total = 0
+    with tarfile.open(fileobj=fileobj, mode='w|gz', format=tarfile.PAX_FORMAT) as tar:
+        _add_bytes(tar, DELETED_MEMBER, ''.join(f"{path}\n" for path in deleted).encode('utf-8'))
+        for path in changed:
+            with open(os.path.join(root, path), 'rb') as f:
+                st = os.fstat(f.fileno())
+                info = tarfile.TarInfo(path)
+                info.size = st.st_size
+                info.mtime = int(st.st_mtime)
+                info.mode = 0o644
+                tar.addfile(info, f)
+            total += st.st_size
+        payload = {'version': MANIFEST_VERSION, 'files': manifest}
+        _add_bytes(tar, MANIFEST_MEMBER, json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8'))
+    return total
+
+
+def _tree_path(path, root):
+    """path as a '/'-separated path relative to root, or None if it's outside the tree"""
+    rel = os.path.relpath(os.path.abspath(path), os.path.abspath(root))
+    return None if rel.startswith(os.pardir) else rel.replace(os.sep, '/')
+
+
+def build_bundle(out=DEFAULT_BUNDLE, base=DEPLOYED_MANIFEST, root='.', dry_run=False):
+    """
+    Bundle the files that changed since the deployment described by `base`. The manifest
+    bundled is kept as pending until mark_deployed() is called. Returns a summary dict.
+    The bundle is never part of its own manifest, wherever --out puts it.
+    """
+    manifest, hashed = current_manifest(root, skip={_tree_path(out, root)} if out != '-' else ())
+    changed, deleted = diff_manifests(load_manifest(base), manifest)
+    summary = {'files': len(manifest), 'hashed': hashed, 'changed': changed, 'deleted': deleted, 'bytes': 0}
+    if dry_run or not (changed or deleted):
+        return summary
+
+    if out == '-':
+        summary['bytes'] = write_bundle(sys.stdout.buffer, changed, deleted, manifest, root)
+        sys.stdout.buffer.flush()
+    else:
+        if os.path.dirname(out):
+            os.makedirs(os.path.dirname(out), exist_ok=True)
+        with open(out, 'wb') as f:
+            summary['bytes'] = write_bundle(f, changed, deleted, manifest, root)
+    _save_json(PENDING_MANIFEST, {'version': MANIFEST_VERSION, 'files': manifest})
+    return summary
+
+
+def mark_deployed():
+    """Record the last bundled manifest as deployed, so the next bundle is relative to it"""
+    if not os.path.exists(PENDING_MANIFEST):
+        return False
+    os.replace(PENDING_MANIFEST, DEPLOYED_MANIFEST)
+    return True
+
+
+def main():
+    """Build a delta deploy bundle, or record the last one as deployed"""
+    parser = argparse.ArgumentParser(description="Bundle the files changed since the last deployment")
+    parser.add_argument('--out', default=DEFAULT_BUNDLE, help="Bundle path, or - for stdout")
+    parser.add_argument('--base', default=DEPLOYED_MANIFEST, help="Manifest of the deployment to diff against")
+    parser.add_argument('--dry-run', action='store_true', help="List the changes without writing a bundle")
+    parser.add_argument('--mark-deployed', action='store_true', help="Record the last bundle as deployed")
+    args = parser.parse_args()
+
+    if args.mark_deployed:
+        if not mark_deployed():
+            print("No pending bundle to mark as deployed", file=sys.stderr)
+            sys.exit(1)
+        print("Marked the last bundle as deployed", file=sys.stderr)
+        return
+
+    start = time.perf_counter()
+    summary = build_bundle(args.out, args.base, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - start
+    if args.dry_run:
+        for path in summary['changed']:
+            print(f"CHANGED {path}")
+        for path in summary['deleted']:
+            print(f"DELETED {path}")
+    # The bundle itself may be on stdout, so the summary goes to stderr
+    print(f"{summary['files']} files ({summary['hashed']} hashed): {len(summary['changed'])} new or changed, "
+          f"{len(summary['deleted'])} deleted", end='', file=sys.stderr)
+    if not (summary['changed'] or summary['deleted']):
+        print(", nothing to deploy", end='', file=sys.stderr)
+    elif not args.dry_run:
+        print(f", {summary['bytes'] / 1024:.0f}KB bundled to {args.out}", end='', file=sys.stderr)
+    print(f" in {elapsed:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Differential fuzz harness for calculate_net_pay.
+Compares the scalar reference in regenerate_income_tax_pages.py against every fast
+path (the compiled batch engine, the integer-pence engine, the generated salary pages)
+and, optionally, the older copies of calculate_net_pay, at millions of random and
+boundary-focused salaries.
+Reports the first diverging input for each candidate and exits non-zero on any drift.
+
+Inputs are checked in chunks of CHUNK_SIZE, so memory stays flat however many points are
+asked for. The scalar reference is the bottleneck by design: on one core the reference
+runs at about 95,000 inputs/s and the batch engine at about 160,000/s, so the default
+million points take about 23s end to end; use --points 100000 for a 2s check.
+"""
+
+import argparse
+import ast
+import os
+import random
+import re
+import sys
+import time
+
+from pence_engine import net_pay_pence_batch, to_pence
+from regenerate_income_tax_pages import calculate_net_pay
+from tax_schedules import TAX_YEARS, DEFAULT_TAX_YEAR, net_pay_batch, net_pay_schedule
+
+# Results are rounded to the penny, so allow for float noise either side of a half penny
+TOLERANCE = 0.011
+
+# The pence engine rounds the HMRC way at each step where the reference rounds once at the
+# end: taxable income drops to whole pounds (up to 40p less higher-rate tax), the taper
+# only bites per whole £2 (up to £1 more allowance, another 40p), and tax on each band
+# and NI round to the penny (a few pence). So it can sit up to 84p from the reference.
+PENCE_TOLERANCE = 0.85
+
+COMPARED_FIELDS = ('tax', 'ni', 'net')
+
+# Other copies of calculate_net_pay that are expected to stay in step with the reference
+COPIES = ('test_calculation.py', 'simple_test.py')
+
+PAGES_DIR = 'income-tax-calculator'
+
+CHUNK_SIZE = 100000
+
+
+def load_function(path, name='calculate_net_pay'):
+    """Load one function from a script without running the script's top-level code"""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    nodes = [node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name == name]
+    if not nodes:
+        raise ValueError(f"{path} has no function {name}")
+    namespace = {}
+    exec(compile(ast.Module(body=nodes, type_ignores=[]), path, 'exec'), namespace)
+    return namespace[name]
+
+
+def boundary_points(tax_year=DEFAULT_TAX_YEAR):
+    """Salaries at and either side of every threshold in the rules and the compiled schedule"""
+    rules = TAX_YEARS[tax_year]
+    edges = set(net_pay_schedule(tax_year).breakpoints)
+    edges.update(value for value in rules.values() if isinstance(value, int) and value > 1000)
+    edges.add(rules['basic_rate_band'] + rules['personal_allowance'])
+
+    points = []
+    for edge in sorted(edges):
+        for offset in (-2, -1, -0.5, -0.01, 0, 0.01, 0.5, 1, 2):
+            if edge + offset >= 0:
+                points.append(round(edge + offset, 2))
+    return points
+
+
+def generate_points(count, seed, max_salary):
+    """Boundary points, the page grid, then random salaries (uniform and log-uniform)"""
+    rng = random.Random(seed)
+    points = boundary_points()
+    points.extend(range(20000, 70001, 250))
+
+    remaining = max(0, count - len(points))
+    half = remaining // 2
+    points.extend(round(rng.uniform(0, max_salary), 2) for _ in range(half))
+    points.extend(round(10 ** rng.uniform(3, 6.5), 2) for _ in range(remaining - half))
+    return points
+
+
+def generate_pensions(count, seed):
+    """Pension percentages: mostly none, otherwise 0-20% to one decimal place"""
+    rng = random.Random(seed + 1)
+    return [0 if rng.random() < 0.6 else round(rng.uniform(0, 20), 1) for _ in range(count)]
+
+
+def reference_results(salaries, pensions):
+    """Scalar reference results as columns"""
+    columns = {field: [] for field in COMPARED_FIELDS}
+    for salary, pension in zip(salaries, pensions):
+        result = calculate_net_pay(salary, has_pension=pension > 0, pension_percentage=pension)
+        for field in COMPARED_FIELDS:
+            columns[field].append(result[field])
+    return columns
+
+
+def merge_divergence(total, found):
+    """Fold one chunk's (count, first) into a running (count, first), keeping the lowest salary"""
+    count, first = found
+    if total[1] is None or (first is not None and first['salary'] < total[1]['salary']):
+        return total[0] + count, first
+    return total[0] + count, total[1]
+
+
+def first_divergence(salaries, pensions, expected, actual, tolerance=TOLERANCE, indices=None):
+    """(count, first diverging input by salary) between two sets of result columns"""
+    first = None
+    count = 0
+    for i in (indices if indices is not None else range(len(salaries))):
+        for field in COMPARED_FIELDS:
+            if abs(expected[field][i] - actual[field][i]) > tolerance:
+                count += 1
+                if first is None or salaries[i] < first['salary']:
+                    first = {
+                        'salary': salaries[i],
+                        'pension_percentage': pensions[i],
+                        'field': field,
+                        'expected': expected[field][i],
+                        'actual': actual[field][i]
+                    }
+                break
+    return count, first
+
+
+def check_batch_engine(salaries, pensions, expected):
+    """Compiled schedule engine against the reference"""
+    actual = net_pay_batch(salaries, pension_percentage=pensions)
+    return first_divergence(salaries, pensions, expected, actual)
+
+
+def check_pence_engine(salaries, pensions, expected):
+    """Integer-pence engine against the reference, allowing for HMRC's step-by-step rounding"""
+    result = net_pay_pence_batch([to_pence(salary) for salary in salaries],
+                                 pension_bps=[int(round(pension * 100)) for pension in pensions])
+    actual = {field: [pence / 100 for pence in result[field]] for field in COMPARED_FIELDS}
+    return first_divergence(salaries, pensions, expected, actual, tolerance=PENCE_TOLERANCE)
+
+
+def check_copy(func, salaries, pensions, expected):
+    """An older calculate_net_pay copy (see load_function) against the reference, pension-free inputs only"""
+    indices = [i for i, pension in enumerate(pensions) if pension == 0]
+    actual = {field: [0.0] * len(salaries) for field in COMPARED_FIELDS}
+    for i in indices:
+        result = func(salaries[i])
+        for field in COMPARED_FIELDS:
+            actual[field][i] = result[field]
+    return first_divergence(salaries, pensions, expected, actual, indices=indices)
+
+
+def read_page_table(pages_dir=PAGES_DIR):
+    """Salary -> (tax, ni, net) whole-pound strings as published on the generated pages"""
+    pattern = re.compile(
+        r'class="value tax">-£([\d,]+)</span>.*?class="value ni">-£([\d,]+)</span>.*?class="value net">£([\d,]+)</span>',
+        re.S
+    )
+    table = {}
+    for name in os.listdir(pages_dir):
+        if not name.endswith('.html'):
+            continue
+        with open(os.path.join(pages_dir, name), encoding='utf-8') as f:
+            match = pattern.search(f.read())
+        if match:
+            table[int(name[:-5])] = match.groups()
+    return table
+
+
+def check_pages(pages_dir=PAGES_DIR):
+    """Published salary pages against the reference, formatted the way the pages are"""
+    table = read_page_table(pages_dir)
+    first = None
+    count = 0
+    for salary in sorted(table):
+        result = calculate_net_pay(salary)
+        expected = tuple(f"{result[field]:,.0f}" for field in COMPARED_FIELDS)
+        if expected != table[salary]:
+            count += 1
+            if first is None:
+                field = COMPARED_FIELDS[[e == a for e, a in zip(expected, table[salary])].index(False)]
+                first = {
+                    'salary': salary,
+                    'pension_percentage': 0,
+                    'field': field,
+                    'expected': expected[COMPARED_FIELDS.index(field)],
+                    'actual': table[salary][COMPARED_FIELDS.index(field)]
+                }
+    return count, first, len(table)
+
+
+def main():
+    """Run every candidate against the reference and report drift"""
+    parser = argparse.ArgumentParser(description="Differential fuzz harness for calculate_net_pay")
+    parser.add_argument('--points', type=int, default=1000000, help="Number of salaries to test")
+    parser.add_argument('--seed', type=int, default=2025, help="Random seed")
+    parser.add_argument('--max-salary', type=float, default=300000, help="Upper bound for uniform salaries")
+    parser.add_argument('--copies', action='store_true', help="Also check the older calculate_net_pay copies")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    salaries = generate_points(args.points, args.seed, args.max_salary)
+    pensions = generate_pensions(len(salaries), args.seed)
+    print(f"Generated {len(salaries):,} inputs in {time.perf_counter() - start:.2f}s")
+
+    engines = {
+        'tax_schedules.net_pay_batch': check_batch_engine,
+        'pence_engine.net_pay_pence_batch': check_pence_engine
+    }
+    candidates = list(engines) + (list(COPIES) if args.copies else [])
+    totals = {name: (0, None) for name in candidates}
+    timings = {name: 0.0 for name in candidates}
+    reference_time = 0.0
+    copies = {path: load_function(path) for path in COPIES} if args.copies else {}
+
+    for offset in range(0, len(salaries), CHUNK_SIZE):
+        chunk_salaries = salaries[offset:offset + CHUNK_SIZE]
+        chunk_pensions = pensions[offset:offset + CHUNK_SIZE]
+
+        start = time.perf_counter()
+        expected = reference_results(chunk_salaries, chunk_pensions)
+        reference_time += time.perf_counter() - start
+
+        for name, check in engines.items():
+            start = time.perf_counter()
+            found = check(chunk_salaries, chunk_pensions, expected)
+            totals[name] = merge_divergence(totals[name], found)
+            timings[name] += time.perf_counter() - start
+
+        for path, func in copies.items():
+            start = time.perf_counter()
+            found = check_copy(func, chunk_salaries, chunk_pensions, expected)
+            totals[path] = merge_divergence(totals[path], found)
+            timings[path] += time.perf_counter() - start
+
+    print(f"Reference: {len(salaries):,} inputs in {reference_time:.2f}s "
+          f"({len(salaries) / max(reference_time, 1e-9):,.0f}/s)")
+    results = [(name, len(salaries), *totals[name], timings[name]) for name in candidates]
+
+    if os.path.isdir(PAGES_DIR):
+        start = time.perf_counter()
+        count, first, pages = check_pages()
+        results.append((f'{PAGES_DIR}/*.html', pages, count, first, time.perf_counter() - start))
+
+    failed = False
+    for name, checked, count, first, elapsed in results:
+        if count == 0:
+            print(f"PASS {name}: {checked:,} inputs agree ({elapsed:.2f}s, {checked / max(elapsed, 1e-9):,.0f}/s)")
+            continue
+        failed = True
+        print(f"FAIL {name}: {count:,} diverging inputs ({elapsed:.2f}s)")
+        print(f"     first: salary £{first['salary']:,} pension {first['pension_percentage']}% "
+              f"{first['field']} expected {first['expected']} got {first['actual']}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
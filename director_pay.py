@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Salary vs dividend optimiser for limited company directors.
+For a given company profit (before paying the director), take-home pay is
+piecewise-linear in the salary taken: employer NI, corporation tax, employee NI,
+income tax and dividend tax only change rate at thresholds. The optimiser finds every
+salary at which some rate changes and evaluates just those, so the best split is exact
+and a whole range of profits is answered in milliseconds.
+"""
+
+import argparse
+import time
+
+from tax_schedules import (
+    TAX_YEARS, DEFAULT_TAX_YEAR, class1_ni, corporation_tax, employer_ni, personal_allowance
+)
+
+
+def _band_tax(start, amount, bands):
+    """Tax on `amount` of income stacked from `start`, given (upper limit, rate) bands"""
+    tax = 0.0
+    lower = 0.0
+    for upper, rate in bands:
+        overlap = min(start + amount, upper) - max(start, lower)
+        if overlap > 0:
+            tax += overlap * rate
+        lower = upper
+    return tax
+
+
+def director_take_home(profit, salary, rules):
+    """Full breakdown of paying `salary` and the rest of `profit` as dividends"""
+    er_ni = employer_ni(salary, rules)
+    company_profit = max(0.0, profit - salary - er_ni)
+    ct = corporation_tax(company_profit, rules)
+    dividends = company_profit - ct
+
+    # Personal tax: the allowance tapers on total income, dividends sit on top of salary
+    total_income = salary + dividends
+    allowance = personal_allowance(total_income, rules)
+    taxable_salary = max(0.0, salary - allowance)
+    taxable_dividends = max(0.0, dividends - max(0.0, allowance - salary))
+    band_limits = (rules['basic_rate_band'], rules['additional_rate_threshold'], float('inf'))
+
+    salary_tax = _band_tax(0, taxable_salary, zip(band_limits, (
+        rules['basic_rate'], rules['higher_rate'], rules['additional_rate'])))
+
+    # The dividend allowance is taxed at 0% but still uses up band space
+    covered = min(taxable_dividends, rules['dividend_allowance'])
+    dividend_tax = _band_tax(taxable_salary + covered, taxable_dividends - covered, zip(band_limits, (
+        rules['dividend_basic_rate'], rules['dividend_higher_rate'], rules['dividend_additional_rate'])))
+
+    ee_ni = class1_ni(salary, rules)
+    take_home = salary - ee_ni - salary_tax + dividends - dividend_tax
+
+    return {
+        'profit': profit,
+        'salary': round(salary, 2),
+        'dividends': round(dividends, 2),
+        'employer_ni': round(er_ni, 2),
+        'corporation_tax': round(ct, 2),
+        'employee_ni': round(ee_ni, 2),
+        'income_tax': round(salary_tax, 2),
+        'dividend_tax': round(dividend_tax, 2),
+        'total_tax': round(er_ni + ct + ee_ni + salary_tax + dividend_tax, 2),
+        'take_home': round(take_home, 2)
+    }
+
+
+def max_salary(profit, rules):
+    """Largest salary the profit can fund once employer NI is paid"""
+    threshold = rules['employer_ni_threshold']
+    if profit <= threshold:
+        return max(0.0, profit)
+    return threshold + (profit - threshold) / (1 + rules['employer_ni_rate'])
+
+
+def _refine(points, func, thresholds):
+    """Add the points where a function that is linear between `points` crosses each threshold"""
+    added = set(points)
+    values = [func(p) for p in points]
+    for a, b, fa, fb in zip(points, points[1:], values, values[1:]):
+        for t in thresholds:
+            if (fa - t) * (fb - t) < 0:
+                added.add(a + (t - fa) * (b - a) / (fb - fa))
+    return sorted(added)
+
+
+def candidate_salaries(profit, rules):
+    """
+    Every salary at which the marginal rate of take-home pay can change.
+    Each stage makes one more quantity linear between points, so the next stage's
+    crossings can be solved exactly.
+    """
+    top = max_salary(profit, rules)
+    pa = rules['personal_allowance']
+    limit = rules['personal_allowance_limit']
+    salary_thresholds = (
+        rules['employer_ni_threshold'], rules['ni_primary_threshold'], rules['ni_upper_earnings_limit'],
+        pa, pa + rules['basic_rate_band'], limit, limit + 2 * pa
+    )
+    points = sorted({0.0, top} | {float(t) for t in salary_thresholds if 0 < t < top})
+
+    def company_profit(s):
+        return profit - s - employer_ni(s, rules)
+
+    def dividends(s):
+        p = max(0.0, company_profit(s))
+        return p - corporation_tax(p, rules)
+
+    def allowance(s):
+        return personal_allowance(s + dividends(s), rules)
+
+    bands = (rules['basic_rate_band'], rules['additional_rate_threshold'])
+
+    points = _refine(points, company_profit, (0, rules['corporation_tax_lower_limit'],
+                                              rules['corporation_tax_upper_limit']))
+    points = _refine(points, lambda s: s + dividends(s), (limit, limit + 2 * pa))
+    points = _refine(points, lambda s: s - allowance(s), (0,))
+    points = _refine(points, lambda s: dividends(s) - max(0.0, allowance(s) - s), (0, rules['dividend_allowance']))
+
+    def taxable_salary(s):
+        return max(0.0, s - allowance(s))
+
+    def taxable_dividends(s):
+        return max(0.0, dividends(s) - max(0.0, allowance(s) - s))
+
+    points = _refine(points, taxable_salary, bands)
+    points = _refine(points, lambda s: taxable_salary(s) + min(taxable_dividends(s), rules['dividend_allowance']),
+                     bands)
+    points = _refine(points, lambda s: taxable_salary(s) + taxable_dividends(s), bands)
+    return points
+
+
+def optimise(profit, tax_year=DEFAULT_TAX_YEAR, step=None):
+    """
+    Best salary/dividend split for one company profit.
+    By default only the breakpoints are evaluated; pass step (e.g. 100) to sweep every
+    salary in that step instead.
+    """
+    rules = TAX_YEARS[tax_year]
+    if step:
+        top = max_salary(profit, rules)
+        salaries = [s * step for s in range(int(top // step) + 1)] + [top]
+    else:
+        salaries = candidate_salaries(profit, rules)
+
+    best = None
+    for salary in salaries:
+        result = director_take_home(profit, salary, rules)
+        if best is None or result['take_home'] > best['take_home'] + 0.005:
+            best = result
+    return best
+
+
+def optimise_batch(profits, tax_year=DEFAULT_TAX_YEAR):
+    """Best split for each of many profit levels"""
+    return [optimise(profit, tax_year) for profit in profits]
+
+
+def positive_amount(text):
+    """argparse type for a company profit: the split is only meaningful above zero"""
+    value = float(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"profit must be above zero, got {text}")
+    return value
+
+
+def main():
+    """Print the best split for a range of company profits"""
+    parser = argparse.ArgumentParser(description="Optimal director salary and dividend split")
+    parser.add_argument('--tax-year', default=DEFAULT_TAX_YEAR, choices=sorted(TAX_YEARS))
+    parser.add_argument('--profit', type=positive_amount, action='append', help="Company profit before salary (repeatable)")
+    args = parser.parse_args()
+
+    profits = args.profit or list(range(20000, 300001, 10000))
+    start = time.perf_counter()
+    results = optimise_batch(profits, args.tax_year)
+    elapsed = time.perf_counter() - start
+
+    print(f"Best salary/dividend split ({args.tax_year}, {len(profits)} profits in {elapsed * 1000:.1f}ms)")
+    print("=" * 78)
+    for r in results:
+        print(f"£{r['profit']:>9,.0f}: salary £{r['salary']:>9,.2f} + dividends £{r['dividends']:>9,.2f} "
+              f"= £{r['take_home']:>9,.2f} take-home ({r['total_tax'] / r['profit']:.1%} tax)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Local rule-based expense categoriser.
+Builds merchant and keyword patterns from the CATEGORIES guide content, compiles them
+into a single Aho-Corasick automaton, and returns a category with a confidence score.
+Only low-confidence results need to go to the api/ai/categorise route.
+"""
+
+import argparse
+import html
+import json
+import re
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+
+from generate_expense_pages import CATEGORIES
+
+NOT_CLAIMABLE = 'not-claimable'
+
+# Below this confidence a description should be sent to the AI route
+AI_FALLBACK_THRESHOLD = 0.7
+
+# Pattern weights by source
+MERCHANT_WEIGHT = 1.0     # Known merchant names
+LABEL_WEIGHT = 0.8        # Bold item labels in the guide, e.g. "Public transport"
+TERM_WEIGHT = 0.6         # Items listed under a label, and worked-example lines
+
+# Merchants commonly seen on statements and receipts, by category id
+MERCHANTS = {
+    'office-supplies': ['adobe', 'microsoft 365', 'office 365', 'slack', 'trello', 'xero', 'quickbooks',
+                        'freeagent', 'royal mail', 'dpd', 'parcelforce', 'evri', 'zoom', 'dropbox',
+                        'google workspace', 'github', 'notion', 'ryman', 'staples', 'viking direct',
+                        'currys', 'godaddy', 'namecheap', '123 reg'],
+    'travel': ['trainline', 'tfl', 'uber', 'bolt', 'addison lee', 'national rail', 'lner', 'avanti',
+               'gwr', 'easyjet', 'ryanair', 'premier inn', 'travelodge', 'ncp', 'ringgo', 'paybyphone',
+               'dart charge', 'congestion charge'],
+    'working-from-home': ['octopus energy', 'british gas', 'edf', 'eon', 'ovo', 'council tax', 'home insurance'],
+    'professional-services': ['accountant', 'accountancy', 'solicitor', 'hiscox', 'simply business', 'qdos',
+                              'acca', 'rics', 'cipd', 'ico', 'companies house'],
+    'marketing': ['google ads', 'facebook ads', 'meta ads', 'instagram ads', 'linkedin ads', 'mailchimp',
+                  'convertkit', 'squarespace', 'wix', 'vistaprint', 'moo', 'canva', 'hootsuite', 'buffer',
+                  'behance', 'dribbble'],
+    'clothing': ['arco', 'hi vis', 'workwear', 'scrubs', 'chef whites', 'overalls', 'steel toe'],
+    'training': ['udemy', 'coursera', 'pluralsight', 'linkedin learning', 'skillshare', 'oreilly', 'eventbrite'],
+    'staff': ['upwork', 'fiverr', 'peopleperhour', 'subcontractor', 'virtual assistant', 'payroll'],
+    'stock-materials': ['shutterstock', 'istock', 'adobe stock', 'envato', 'alibaba', 'booker', 'wholesale'],
+    'financial': ['stripe', 'paypal fee', 'sumup', 'zettle', 'square fee', 'loan interest', 'overdraft',
+                  'bank charges', 'account fee'],
+    NOT_CLAIMABLE: ['netflix', 'spotify', 'disney plus', 'parking fine', 'penalty charge', 'speeding fine',
+                    'hmrc penalty', 'gym membership', 'specsavers']
+}
+
+# Words that start sentences rather than items when splitting guide text
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'any', 'all', 'if', 'for', 'on', 'to', 'of', 'in', 'by', 'both',
+    'even', 'only', 'this', 'that', 'these', 'those', 'items', 'anything', 'everything', 'whatever',
+    'whether', 'etc', 'eg', 'e', 'g', 'your', 'you', 'other', 'similar', 'new', 'more', 'not',
+    'from', 'many', 'essential'
+}
+
+
+def normalise(text):
+    """Lower-case, strip markup, collapse non-alphanumerics to single spaces"""
+    text = html.unescape(re.sub(r'<[^>]+>', ' ', text)).lower()
+    return re.sub(r'[^a-z0-9]+', ' ', text).strip()
+
+
+def _split_terms(text):
+    """Short item phrases from a comma/slash separated list in guide text"""
+    terms = []
+    for part in re.split(r'[,/();]|\band\b|\bor\b', text):
+        words = normalise(part).split()
+        if not 1 <= len(words) <= 3 or words[0] in STOPWORDS or words[-1] in STOPWORDS or words[0].isdigit():
+            continue
+        terms.append(' '.join(words))
+        # Statements say "hotel" where the guide says "hotels"
+        last = words[-1]
+        if len(last) > 3 and last.endswith('s') and not last.endswith('ss'):
+            terms.append(' '.join(words[:-1] + [last[:-1]]))
+    return terms
+
+
+def extract_patterns(categories=CATEGORIES):
+    """
+    Derive (pattern, category_id, weight) triples from the guide content.
+    Items in "CANNOT claim" sections map to not-claimable.
+    """
+    patterns = []
+
+    for cat in categories:
+        for section in cat['content_sections']:
+            negative = 'CANNOT' in section['heading'].upper()
+
+            for item in re.findall(r'<li>(.*?)</li>', section['text'], re.S):
+                strong = re.search(r'<strong>(.*?)</strong>', item, re.S)
+                if strong:
+                    label = strong.group(1)
+                    if 'NOT CLAIMABLE' in label.upper():
+                        continue
+                    target = NOT_CLAIMABLE if negative else cat['id']
+                    label_text = re.sub(r'\(.*?\)', '', label).rstrip(': ')
+                    for term in _split_terms(label_text):
+                        patterns.append((term, target, LABEL_WEIGHT))
+
+                    # The listed items run up to the first sentence break or dash
+                    rest = html.unescape(re.sub(r'<[^>]+>', '', item[strong.end():]))
+                    listing = re.split(r'\.\s|—', rest, maxsplit=1)[0]
+                    for term in _split_terms(listing):
+                        patterns.append((term, target, TERM_WEIGHT))
+                elif not negative:
+                    # Plain lists such as the working-from-home bills
+                    plain = re.sub(r'\(.*?\)', '', item)
+                    if len(normalise(plain).split()) <= 3:
+                        for term in _split_terms(plain):
+                            patterns.append((term, cat['id'], TERM_WEIGHT))
+
+        for label, _ in cat['calculation_example']['lines']:
+            label = re.split(r'[(:]', label)[0]
+            for term in _split_terms(label):
+                patterns.append((term, cat['id'], TERM_WEIGHT))
+
+    for category_id, merchants in MERCHANTS.items():
+        for merchant in merchants:
+            patterns.append((normalise(merchant), category_id, MERCHANT_WEIGHT))
+
+    return patterns
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: one pass over the text finds every pattern occurrence"""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        self.patterns = list(patterns)
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = nxt
+            self.out[state] = self.out[state] + (index,)
+
+        # Breadth-first failure links; outputs inherit from their failure state
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, text):
+        """List of (end_index, pattern_index) for every match in text"""
+        goto, fail, out = self.goto, self.fail, self.out
+        matches = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for index in out[state]:
+                    matches.append((i, index))
+        return matches
+
+
+def compile_categoriser(categories=CATEGORIES):
+    """Compile the guide-derived patterns into one automaton plus per-pattern targets"""
+    targets = {}
+    for term, category_id, weight in extract_patterns(categories):
+        if not term:
+            continue
+        # Space-padded patterns only match whole words in space-padded text
+        key = f' {term} '
+        per_category = targets.setdefault(key, {})
+        per_category[category_id] = max(weight, per_category.get(category_id, 0))
+
+    keys = sorted(targets)
+    automaton = AhoCorasick(keys)
+    return automaton, [tuple(targets[k].items()) for k in keys]
+
+
+AUTOMATON, PATTERN_TARGETS = compile_categoriser()
+HMRC_CATEGORIES = {cat['id']: cat['hmrc_category'] for cat in CATEGORIES}
+
+
+NO_MATCH = MappingProxyType({
+    'category_id': None,
+    'hmrc_category': None,
+    'confidence': 0.0,
+    'matches': (),
+    'needs_ai': True
+})
+
+
+@lru_cache(maxsize=65536)
+def classify(description):
+    """
+    Categorise one expense description.
+    Returns category_id, hmrc_category, confidence (0-1), matched terms and whether
+    the AI route is still needed, as a read-only mapping: results are cached and shared
+    between callers, so they must not be modified.
+    """
+    text = f' {normalise(description)} '
+    found = AUTOMATON.find(text)
+
+    # A match inside a longer one only counts if it agrees with it:
+    # 'adobe stock' suppresses the office-supplies 'adobe', 'adobe creative cloud' keeps it
+    spans = [(end - len(AUTOMATON.patterns[index]) + 1, end, index) for end, index in found]
+    kept = set()
+    for start, end, index in spans:
+        categories = {category_id for category_id, _ in PATTERN_TARGETS[index]}
+        contained = any(
+            s <= start and end <= e and (e - s) > (end - start)
+            and not categories <= {category_id for category_id, _ in PATTERN_TARGETS[i]}
+            for s, e, i in spans
+        )
+        if not contained:
+            kept.add(index)
+
+    scores = {}
+    for index in kept:
+        for category_id, weight in PATTERN_TARGETS[index]:
+            scores[category_id] = scores.get(category_id, 0.0) + weight
+
+    if not scores:
+        return NO_MATCH
+
+    # Share of squared evidence, so one merchant hit outweighs a stray generic term,
+    # scaled down when the only evidence is weak
+    category_id, top = max(scores.items(), key=lambda item: item[1])
+    share = top * top / sum(score * score for score in scores.values())
+    confidence = round(share * min(1.0, top), 3)
+
+    return MappingProxyType({
+        'category_id': category_id,
+        'hmrc_category': HMRC_CATEGORIES.get(category_id),
+        'confidence': confidence,
+        'matches': tuple(sorted(AUTOMATON.patterns[i].strip() for i in kept)),
+        'needs_ai': confidence < AI_FALLBACK_THRESHOLD
+    })
+
+
+def classify_batch(descriptions):
+    """Categorise many descriptions, splitting them into local results and AI fallbacks"""
+    local = []
+    fallback = []
+    for description in descriptions:
+        result = classify(description)
+        (fallback if result['needs_ai'] else local).append((description, result))
+    return local, fallback
+
+
+def main():
+    """Categorise descriptions (one per line) and print JSON lines"""
+    parser = argparse.ArgumentParser(description="Categorise expense descriptions locally")
+    parser.add_argument('input', nargs='?', help="File with one description per line (default: stdin)")
+    args = parser.parse_args()
+
+    source = open(args.input, encoding='utf-8') if args.input else sys.stdin
+    with source:
+        descriptions = [line.strip() for line in source if line.strip()]
+
+    local, fallback = classify_batch(descriptions)
+    for description, result in local + fallback:
+        print(json.dumps({'description': description, **result}))
+
+    print(f"{len(local)} categorised locally, {len(fallback)} need the AI route", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -96,6 +96,25 @@ function toggleCard(id) {
    SAVINGS ESTIMATOR
    ======================================== */
 
+// Income tax (with the personal allowance taper) plus Class 4 NI on a trading profit, as the
+// piecewise-linear schedule compiled by tax_schedules.py. The block is rewritten by
+// self_employment.update_savings_script() (python generate_expense_pages.py); don't edit it by hand.
+/* profit-tax-schedule:start */
+var PROFIT_TAX_SCHEDULE = {"taxYear":"2025/26","breakpoints":[0,12570,50270,100000,125140],"values":[0.0,0.0,9802.0,30688.6,46275.4],"slopes":[0.0,0.26,0.42,0.62,0.47]};
+/* profit-tax-schedule:end */
+
+function selfEmployedTax(profit) {
+    var schedule = PROFIT_TAX_SCHEDULE;
+    if (profit <= 0) {
+        return schedule.values[0];
+    }
+    var i = schedule.breakpoints.length - 1;
+    while (schedule.breakpoints[i] > profit) {
+        i--;
+    }
+    return schedule.values[i] + schedule.slopes[i] * (profit - schedule.breakpoints[i]);
+}
+
 function calculateSavings() {
     var input = document.getElementById('incomeInput');
     var result = document.getElementById('savingsResult');
@@ -113,24 +132,10 @@ function calculateSavings() {
     var lowExpenses = Math.round(income * 0.10);
     var highExpenses = Math.round(income * 0.20);
 
-    // Calculate tax saving based on marginal rate
-    var lowRate, highRate;
-    if (income <= 50270) {
-        lowRate = 0.20; // basic rate
-        highRate = 0.20;
-    } else if (income <= 125140) {
-        lowRate = 0.20;
-        highRate = 0.40; // higher rate
-    } else {
-        lowRate = 0.40;
-        highRate = 0.45;
-    }
-
-    // Also include NI saving (8% for basic, 2% for higher)
-    var niRate = income <= 50270 ? 0.08 : 0.02;
-
-    var lowSaving = Math.round(lowExpenses * (lowRate + niRate));
-    var highSaving = Math.round(highExpenses * (highRate + niRate));
+    // Tax saving = income tax + Class 4 NI before expenses minus the same after,
+    // so savings that cross a band edge or fall in the £100k taper are right
+    var lowSaving = Math.round(selfEmployedTax(income) - selfEmployedTax(income - lowExpenses));
+    var highSaving = Math.round(selfEmployedTax(income) - selfEmployedTax(income - highExpenses));
 
     amountEl.textContent = '\u00a3' + lowSaving.toLocaleString() + ' \u2013 \u00a3' + highSaving.toLocaleString();
     detailEl.textContent = 'Estimated tax saving if you claim \u00a3' + lowExpenses.toLocaleString() + ' \u2013 \u00a3' + highExpenses.toLocaleString() + ' in expenses (typical for a \u00a3' + income.toLocaleString() + ' income).';
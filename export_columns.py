@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Columnar export of the calculators for analysts.
+Evaluates the net pay and stamp duty engines over configurable grids and streams the
+results in chunks to one .npy file per column (readable by numpy.load(mmap_mode='r'),
+or by open_columns below without numpy), or to a compact CSV or JSON Lines file.
+Grids of tens of millions of rows never have to fit in memory.
+"""
+
+import argparse
+import ast
+import csv
+import json
+import mmap
+import os
+import sys
+import time
+from array import array
+from itertools import islice, product
+
+from generate_stamp_duty_pages import calculate_stamp_duty
+from tax_schedules import TAX_YEARS, DEFAULT_TAX_YEAR, Schedule, net_pay_batch
+
+CHUNK_ROWS = 250_000
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+NPY_HEADER_SIZE = 128   # Fixed so the row count can be filled in after streaming
+
+NET_PAY_COLUMNS = ('salary', 'pension_percentage', 'tax', 'ni', 'net', 'monthly', 'weekly')
+STAMP_DUTY_COLUMNS = ('price', 'buyer_type', 'stamp_duty', 'effective_rate')
+
+# buyer_type codes in the stamp duty export
+BUYER_TYPES = {0: 'standard', 1: 'first-time', 2: 'additional'}
+
+# Prices where the stamp duty bands change (see calculate_stamp_duty)
+STAMP_DUTY_BREAKPOINTS = (125000, 250000, 300000, 500000, 925000, 1500000)
+FIRST_TIME_BUYER_LIMIT = 500000
+
+
+def parse_range(text):
+    """'20000:70000:250' -> inclusive list of values; a single number is a one-value range"""
+    parts = [float(p) for p in text.split(':')]
+    if len(parts) == 1:
+        return parts
+    start, stop, step = parts if len(parts) == 3 else (parts[0], parts[1], 1)
+    count = int(round((stop - start) / step)) + 1
+    return [round(start + i * step, 6) for i in range(count)]
+
+
+def chunks(rows, size=CHUNK_ROWS):
+    """Lists of up to `size` rows from an iterator"""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def net_pay_chunks(salaries, pensions, tax_year=DEFAULT_TAX_YEAR):
+    """Column chunks for every salary x pension percentage"""
+    for chunk in chunks(product(salaries, pensions)):
+        salary, pension = zip(*chunk)
+        result = net_pay_batch(salary, tax_year, pension_percentage=pension)
+        yield {
+            'salary': array('d', salary),
+            'pension_percentage': array('d', pension),
+            'tax': result['tax'],
+            'ni': result['ni'],
+            'net': result['net'],
+            'monthly': result['monthly'],
+            'weekly': result['weekly']
+        }
+
+
+def _stamp_duty_schedules():
+    """calculate_stamp_duty compiled into one schedule per buyer type"""
+    schedules = {}
+    for code, buyer in BUYER_TYPES.items():
+        schedules[code] = Schedule.compile(
+            lambda price, buyer=buyer: calculate_stamp_duty(
+                price, is_first_time_buyer=buyer == 'first-time', is_additional_property=buyer == 'additional'
+            )['total_stamp_duty'],
+            STAMP_DUTY_BREAKPOINTS
+        )
+    return schedules
+
+
+def stamp_duty_chunks(prices, buyer_types=tuple(BUYER_TYPES)):
+    """Column chunks for every price x buyer type"""
+    schedules = _stamp_duty_schedules()
+    for chunk in chunks(product(prices, buyer_types)):
+        price, buyer = zip(*chunk)
+        duty = []
+        for p, b in chunk:
+            # First-time buyer relief stops completely above the limit
+            if b == 1 and p > FIRST_TIME_BUYER_LIMIT:
+                b = 0
+            duty.append(round(schedules[b](p), 2))
+        yield {
+            'price': array('d', price),
+            'buyer_type': array('d', buyer),
+            'stamp_duty': array('d', duty),
+            'effective_rate': array('d', (round(d / p * 100, 2) if p > 0 else 0.0 for d, p in zip(duty, price)))
+        }
+
+
+class NpyColumnWriter:
+    """Streams float64 values to a .npy file, filling in the shape when closed"""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.file = open(path, 'wb')
+        self.file.write(self._header(0))
+
+    @staticmethod
+    def _header(rows):
+        header = repr({'descr': '<f8', 'fortran_order': False, 'shape': (rows,)})
+        header = header.ljust(NPY_HEADER_SIZE - len(NPY_MAGIC) - 2 - 1) + '\n'
+        return NPY_MAGIC + len(header).to_bytes(2, 'little') + header.encode('latin1')
+
+    def write(self, values):
+        if not isinstance(values, array) or sys.byteorder != 'little':
+            values = array('d', values)
+            if sys.byteorder != 'little':
+                values.byteswap()
+        values.tofile(self.file)
+        self.rows += len(values)
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(self._header(self.rows))
+        self.file.close()
+
+
+def export_npy(column_chunks, columns, out_dir, manifest):
+    """Write each column to out_dir/<column>.npy plus a manifest.json"""
+    os.makedirs(out_dir, exist_ok=True)
+    writers = {name: NpyColumnWriter(os.path.join(out_dir, f"{name}.npy")) for name in columns}
+    try:
+        for chunk in column_chunks:
+            for name, writer in writers.items():
+                writer.write(chunk[name])
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    rows = writers[columns[0]].rows
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump({**manifest, 'rows': rows, 'columns': list(columns), 'dtype': '<f8'}, f, indent=2)
+    return rows
+
+
+def export_rows(column_chunks, columns, path, fmt):
+    """Write rows as CSV or JSON Lines"""
+    rows = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f) if fmt == 'csv' else None
+        if writer:
+            writer.writerow(columns)
+        for chunk in column_chunks:
+            values = zip(*(chunk[name] for name in columns))
+            if writer:
+                writer.writerows(values)
+            else:
+                f.writelines(json.dumps(dict(zip(columns, row)), separators=(',', ':')) + '\n' for row in values)
+            rows += len(chunk[columns[0]])
+    return rows
+
+
+def open_columns(directory):
+    """
+    Memory-map an exported directory back as {column: memoryview of float64}.
+    Nothing is read until values are accessed.
+    """
+    columns = {}
+    for name in os.listdir(directory):
+        if not name.endswith('.npy'):
+            continue
+        with open(os.path.join(directory, name), 'rb') as f:
+            magic = f.read(len(NPY_MAGIC))
+            if magic[:6] != NPY_MAGIC[:6]:
+                raise ValueError(f"{name} is not a .npy file")
+            header_len = int.from_bytes(f.read(2), 'little')
+            header = ast.literal_eval(f.read(header_len).decode('latin1'))
+            if header['descr'] != '<f8' or header['fortran_order']:
+                raise ValueError(f"{name}: only little-endian float64 columns are supported")
+            offset = len(NPY_MAGIC) + 2 + header_len
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if header['shape'][0] else b''
+        columns[name[:-4]] = memoryview(mapped)[offset:].cast('d') if mapped else memoryview(array('d'))
+    return columns
+
+
+def main():
+    """Export a grid of calculator results"""
+    parser = argparse.ArgumentParser(description="Export calculator results as columns")
+    parser.add_argument('engine', choices=('net-pay', 'stamp-duty'))
+    parser.add_argument('--salaries', default='10000:200000:100', help="start:stop:step (inclusive)")
+    parser.add_argument('--pensions', default='0', help="Pension percentages, start:stop:step")
+    parser.add_argument('--prices', default='50000:2000000:1000', help="Property prices, start:stop:step")
+    parser.add_argument('--tax-year', default=DEFAULT_TAX_YEAR, choices=sorted(TAX_YEARS))
+    parser.add_argument('--format', default='npy', choices=('npy', 'csv', 'jsonl'))
+    parser.add_argument('--out', help="Output directory (npy) or file (csv/jsonl)")
+    args = parser.parse_args()
+
+    if args.engine == 'net-pay':
+        columns = NET_PAY_COLUMNS
+        source = net_pay_chunks(parse_range(args.salaries), parse_range(args.pensions), args.tax_year)
+        manifest = {'engine': 'net-pay', 'tax_year': args.tax_year, 'salaries': args.salaries,
+                    'pensions': args.pensions}
+    else:
+        columns = STAMP_DUTY_COLUMNS
+        source = stamp_duty_chunks(parse_range(args.prices))
+        manifest = {'engine': 'stamp-duty', 'prices': args.prices, 'buyer_types': BUYER_TYPES}
+
+    out = args.out or (f"exports/{args.engine}" + ('' if args.format == 'npy' else f".{args.format}"))
+    start = time.perf_counter()
+    if args.format == 'npy':
+        rows = export_npy(source, columns, out, manifest)
+    else:
+        os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+        rows = export_rows(source, columns, out, args.format)
+    print(f"Exported {rows:,} rows to {out} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
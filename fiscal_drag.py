@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Fiscal drag projections.
+Projects take-home pay across the salary grid for ten years of wage growth, with tax
+and NI thresholds frozen or rising with inflation. Every threshold in the schedules
+scales together, so tax under thresholds scaled by f is f * tax(salary / f) under
+today's rules: the whole salary x year x scenario cube is one batch evaluation of the
+compiled take-home schedule.
+"""
+
+import argparse
+import json
+
+from tax_schedules import DEFAULT_TAX_YEAR, net_pay_schedule
+
+WAGE_GROWTH = 0.035
+INFLATION = 0.025
+YEARS = 10
+
+# Salaries on the generated income tax pages
+DEFAULT_SALARIES = range(20000, 70001, 250)
+
+# Years thresholds stay frozen in each scenario (None = frozen for the whole projection)
+SCENARIOS = {
+    'frozen': None,
+    'indexed': 0
+}
+
+
+def threshold_factors(years, inflation, frozen_years):
+    """How far thresholds have moved from today's in each year of the projection"""
+    if frozen_years is None:
+        return [1.0] * (years + 1)
+    return [(1 + inflation) ** max(0, year - frozen_years) for year in range(years + 1)]
+
+
+def project(salaries=DEFAULT_SALARIES, years=YEARS, wage_growth=WAGE_GROWTH, inflation=INFLATION,
+            scenarios=SCENARIOS, tax_year=DEFAULT_TAX_YEAR):
+    """
+    Take-home pay for every salary, year and scenario.
+    Returns flat axes plus [scenario][salary][year] matrices of net pay (cash and in
+    today's prices), tax and NI, and the fiscal drag against the first scenario that
+    indexes thresholds.
+    """
+    salaries = list(salaries)
+    schedule = net_pay_schedule(tax_year)
+    growth = [(1 + wage_growth) ** year for year in range(years + 1)]
+    prices = [(1 + inflation) ** year for year in range(years + 1)]
+    gross = [[salary * g for g in growth] for salary in salaries]
+
+    # One flat batch: every (scenario, salary, year) cell scaled into today's thresholds
+    factors = {name: threshold_factors(years, inflation, frozen) for name, frozen in scenarios.items()}
+    scaled = [cell / f for name in scenarios for row in gross for cell, f in zip(row, factors[name])]
+    values = schedule.batch(scaled)
+
+    net = {}
+    deductions = {}
+    real_net = {}
+    width = years + 1
+    position = 0
+    for name in scenarios:
+        f = factors[name]
+        net[name], deductions[name], real_net[name] = [], [], []
+        for row in gross:
+            cells = values[position:position + width]
+            position += width
+            net_row = [round(v * fy, 2) for v, fy in zip(cells, f)]
+            net[name].append(net_row)
+            deductions[name].append([round(g - n, 2) for g, n in zip(row, net_row)])
+            real_net[name].append([round(n / p, 2) for n, p in zip(net_row, prices)])
+
+    baseline = next((name for name, frozen in scenarios.items() if frozen == 0), None)
+    drag = {}
+    if baseline:
+        for name in scenarios:
+            drag[name] = [[round(b - n, 2) for b, n in zip(base_row, row)]
+                          for base_row, row in zip(net[baseline], net[name])]
+
+    return {
+        'tax_year': tax_year,
+        'salaries': salaries,
+        'years': list(range(years + 1)),
+        'scenarios': list(scenarios),
+        'gross': [[round(g, 2) for g in row] for row in gross],
+        'net': net,
+        'real_net': real_net,
+        'deductions': deductions,
+        'fiscal_drag': drag
+    }
+
+
+def main():
+    """Print the fiscal drag on a few salaries, or the whole cube as JSON"""
+    parser = argparse.ArgumentParser(description="Project take-home pay with frozen vs indexed thresholds")
+    parser.add_argument('--years', type=int, default=YEARS, help="Years to project")
+    parser.add_argument('--wage-growth', type=float, default=WAGE_GROWTH, help="Annual wage growth, e.g. 0.035")
+    parser.add_argument('--inflation', type=float, default=INFLATION, help="Annual threshold indexation / CPI")
+    parser.add_argument('--json', action='store_true', help="Print the full cube as JSON")
+    args = parser.parse_args()
+
+    cube = project(years=args.years, wage_growth=args.wage_growth, inflation=args.inflation)
+    if args.json:
+        print(json.dumps(cube))
+        return
+
+    print(f"Fiscal drag after {args.years} years ({args.wage_growth:.1%} wage growth, {args.inflation:.1%} inflation)")
+    print("=" * 60)
+    for salary in (25000, 35000, 50000, 70000):
+        i = cube['salaries'].index(salary)
+        print(f"£{salary:,}: £{cube['gross'][i][-1]:,.0f} gross, "
+              f"£{cube['fiscal_drag']['frozen'][i][-1]:,.0f}/yr more tax and NI with frozen thresholds")
+
+
+if __name__ == "__main__":
+    main()
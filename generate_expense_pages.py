@@ -6,6 +6,11 @@ Each page is ~1000-1500 words of genuinely helpful content about that expense ca
 
 import os
 
+from critical_css import apply_to_directory
+from related_pages import apply_related_links
+from site_template import nav
+from self_employment import basic_rate_saving, savings_table, update_savings_script
+
 # Category data with full SEO content
 CATEGORIES = [
     {
@@ -533,8 +538,13 @@ def generate_category_page(cat):
     # Build calculation example
     calc = cat["calculation_example"]
     total = sum(line[1] for line in calc["lines"])
-    saving = round(total * 0.20)
+    saving = round(basic_rate_saving(total))
     tax_note = calc["tax_note"].replace("{saving}", f"&pound;{saving:,}")
+
+    # Real tax + Class 4 NI saving at each income band
+    savings_rows = ""
+    for row in savings_table(total):
+        savings_rows += f'<tr><td style="padding:0.5rem 1rem;border-bottom:1px solid #eee;">{row["band"]}</td><td style="text-align:right;padding:0.5rem 1rem;border-bottom:1px solid #eee;">&pound;{row["profit"]:,}</td><td style="text-align:right;padding:0.5rem 1rem;border-bottom:1px solid #eee;">&pound;{row["income_tax"]:,.0f}</td><td style="text-align:right;padding:0.5rem 1rem;border-bottom:1px solid #eee;">&pound;{row["class4_ni"]:,.0f}</td><td style="text-align:right;padding:0.5rem 1rem;border-bottom:1px solid #eee;font-weight:700;">&pound;{row["total"]:,.0f} ({row["relief_rate"]:g}%)</td></tr>\n'
     
     calc_rows = ""
     for label, amount in calc["lines"]:
@@ -549,10 +559,16 @@ def generate_category_page(cat):
                         <tr style="background:#1B4332;color:white;font-weight:700;"><td style="padding:0.75rem 1rem;">{calc['total_label']}</td><td style="text-align:right;padding:0.75rem 1rem;">&pound;{total:,}</td></tr>
                     </table>
                     <p style="font-size:0.9rem;color:#666;margin-top:0.5rem;">{tax_note}</p>
+                    <h3 style="font-size:1.05rem;color:#1B4332;margin-top:1.25rem;">What claiming &pound;{total:,} saves at your profit level</h3>
+                    <table style="width:100%;border-collapse:collapse;margin:0.75rem 0;font-size:0.9rem;">
+                        <tr style="background:#f0faf4;"><th style="text-align:left;padding:0.5rem 1rem;border-bottom:2px solid #ddd;">Tax band</th><th style="text-align:right;padding:0.5rem 1rem;border-bottom:2px solid #ddd;">Profit</th><th style="text-align:right;padding:0.5rem 1rem;border-bottom:2px solid #ddd;">Income tax</th><th style="text-align:right;padding:0.5rem 1rem;border-bottom:2px solid #ddd;">Class 4 NI</th><th style="text-align:right;padding:0.5rem 1rem;border-bottom:2px solid #ddd;">Total saved</th></tr>
+                        {savings_rows}
+                    </table>
+                    <p style="font-size:0.85rem;color:#666;">Savings compare income tax and Class 4 National Insurance on your profit before and after the expenses, for 2025/26. Between &pound;100,000 and &pound;125,140 the personal allowance taper means each &pound;1 of expenses saves 62p.</p>
                 </div>
 """
 
-    # Build related categories links
+    # Placeholder related categories; related_pages fills in the most similar ones after the build
     related = [c for c in CATEGORIES if c["id"] != cat["id"]][:4]
     related_html = ""
     for r in related:
@@ -764,44 +780,7 @@ def generate_category_page(cat):
     </style>
 </head>
 <body>
-    <nav class="main-nav">
-        <div class="nav-container">
-            <a href="../index.html" class="logo-link">
-                <div class="quidwise-logo">
-                    <img src="../logo.svg" alt="QuidWise Logo" class="logo-image">
-                    <div class="logo-text-container">
-                        <span class="logo-text">QuidWise</span>
-                        <span class="logo-tagline">Make your pay go further</span>
-                    </div>
-                </div>
-            </a>
-            <button class="mobile-menu-toggle" aria-label="Toggle menu">
-                <span></span><span></span><span></span>
-            </button>
-            <ul class="nav-menu">
-                <li class="nav-item dropdown">
-                    <a href="#" class="nav-link">Tax & Budgeting <i class="fas fa-chevron-down"></i></a>
-                    <ul class="dropdown-menu">
-                        <li><a href="../income-tax-calculator.html">Income Tax Calculator</a></li>
-                        <li><a href="../budget-planner.html">Budget Planner</a></li>
-                        <li><a href="../expenses.html">Allowable Expenses Guide</a></li>
-                    </ul>
-                </li>
-                <li class="nav-item dropdown">
-                    <a href="#" class="nav-link">Mortgages & Property <i class="fas fa-chevron-down"></i></a>
-                    <ul class="dropdown-menu">
-                        <li><a href="../mortgage-calculator.html">Mortgage Calculator</a></li>
-                        <li><a href="../mortgage-affordability.html">Mortgage Affordability</a></li>
-                        <li><a href="../stamp-duty-calculator.html">Stamp Duty Calculator</a></li>
-                        <li><a href="../find-mortgage-deals.html">Mortgage Rate Comparison</a></li>
-                        <li><a href="../mortgage-overpayment.html">Mortgage Overpayment Calculator</a></li>
-                        <li><a href="../buy-or-rent.html">Buy vs Rent Estimate</a></li>
-                    </ul>
-                </li>
-                <li class="nav-item"><a href="../blogs.html" class="nav-link">Blog</a></li>
-            </ul>
-        </div>
-    </nav>
+{nav('../')}
 
     <div class="container" style="max-width: 900px;">
         <div class="expense-page-hero">
@@ -819,10 +798,12 @@ def generate_category_page(cat):
 
 {calc_html}
 
-            <div class="related-categories">
+            <div class="related-categories" data-nosearch>
                 <h3>Explore Other Expense Categories</h3>
                 <div class="related-links">
+                    <!-- related:start scope="expenses/" limit="4" -->
                     {related_html}
+                    <!-- related:end -->
                 </div>
             </div>
 
@@ -854,20 +835,30 @@ def generate_category_page(cat):
     return html
 
 
+def pages(output_dir="expenses"):
+    """(path, input data, render) for every category page"""
+    return [
+        (os.path.join(output_dir, f"{cat['id']}.html"), cat, lambda cat=cat: generate_category_page(cat))
+        for cat in CATEGORIES
+    ]
+
+
 def main():
     output_dir = "expenses"
     os.makedirs(output_dir, exist_ok=True)
 
     print(f"Generating {len(CATEGORIES)} expense category pages...")
 
-    for cat in CATEGORIES:
-        content = generate_category_page(cat)
-        filepath = os.path.join(output_dir, f"{cat['id']}.html")
+    for filepath, cat, render in pages(output_dir):
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+            f.write(render())
         print(f"  Generated: {cat['id']}.html - {cat['name']}")
 
-    print(f"\nDone! {len(CATEGORIES)} pages saved in {output_dir}/")
+    apply_related_links([output_dir])
+    apply_to_directory(output_dir)
+    if update_savings_script():
+        print("  Updated the savings estimator's tax schedule in expenses.js")
+    print(f"\nDone! {len(CATEGORIES)} pages saved in {output_dir}/ (critical CSS inlined)")
 
 
 if __name__ == "__main__":
@@ -7,6 +7,17 @@ Each page will be pre-filled with the property price and include comprehensive S
 import os
 import math
 
+from results import StampDutyBand, StampDutyResult
+from critical_css import apply_to_directory
+from related_pages import apply_related_links
+from site_template import nav
+from svg_charts import amortization_chart, band_chart, cache_stats, split_chart
+
+# Mortgage used for the illustrative repayment chart on each page
+ILLUSTRATIVE_DEPOSIT = 0.10
+ILLUSTRATIVE_RATE = 0.045
+ILLUSTRATIVE_TERM = 25
+
 def calculate_stamp_duty(property_price, is_first_time_buyer=False, is_additional_property=False):
     """Calculate stamp duty for a given property price in England"""
     price = property_price
@@ -54,26 +65,26 @@ def calculate_stamp_duty(property_price, is_first_time_buyer=False, is_additiona
             tax_in_band = taxable_in_band * band['rate']
             total_tax += tax_in_band
 
-            band_breakdown.append({
-                'label': band['label'],
-                'taxable_amount': taxable_in_band,
-                'rate': band['rate'],
-                'tax': tax_in_band
-            })
+            band_breakdown.append(StampDutyBand(
+                label=band['label'],
+                taxable_amount=taxable_in_band,
+                rate=band['rate'],
+                tax=tax_in_band
+            ))
 
         previous_threshold = band_max
 
         if price <= band_max:
             break
 
-    return {
-        'property_price': property_price,
-        'total_stamp_duty': round(total_tax, 2),
-        'effective_rate': round((total_tax / property_price) * 100, 2) if property_price > 0 else 0,
-        'bands': band_breakdown,
-        'is_first_time_buyer': is_first_time_buyer,
-        'is_additional_property': is_additional_property
-    }
+    return StampDutyResult(
+        property_price=property_price,
+        total_stamp_duty=round(total_tax, 2),
+        effective_rate=round((total_tax / property_price) * 100, 2) if property_price > 0 else 0,
+        bands=tuple(band_breakdown),
+        is_first_time_buyer=is_first_time_buyer,
+        is_additional_property=is_additional_property
+    )
 
 def format_currency(amount):
     """Format amount as currency"""
@@ -186,56 +197,7 @@ def generate_page_content(property_price, calculations):
     </script>
 </head>
 <body>
-    <!-- Navigation -->
-    <nav class="main-nav">
-        <div class="nav-container">
-            <a href="../index.html" class="logo-link">
-                <div class="quidwise-logo">
-                    <img src="../logo.svg" alt="QuidWise Logo" class="logo-image">
-                    <div class="logo-text-container">
-                        <span class="logo-text">QuidWise</span>
-                        <span class="logo-tagline">Make your pay go further</span>
-                    </div>
-                </div>
-            </a>
-
-            <ul class="nav-menu">
-                <li class="nav-item dropdown">
-                    <a href="#" class="nav-link">
-                        Tax & Budgeting <i class="fas fa-chevron-down"></i>
-                    </a>
-                    <ul class="dropdown-menu">
-                        <li><a href="../income-tax-calculator.html">Income Tax Calculator</a></li>
-                        <li><a href="../budget-planner.html">Budget Planner</a></li>
-                    </ul>
-                </li>
-
-                <li class="nav-item dropdown">
-                    <a href="#" class="nav-link">
-                        Mortgages & Property <i class="fas fa-chevron-down"></i>
-                    </a>
-                    <ul class="dropdown-menu">
-                        <li><a href="../mortgage-calculator.html">Mortgage Calculator</a></li>
-                        <li><a href="../mortgage-affordability.html">Mortgage Affordability</a></li>
-                        <li><a href="../stamp-duty-calculator.html">Stamp Duty Calculator</a></li>
-                        <li><a href="../find-mortgage-deals.html">Mortgage Rate Comparison</a></li>
-                        <li><a href="../mortgage-overpayment.html">Mortgage Overpayment Calculator</a></li>
-                        <li><a href="../buy-or-rent.html">Buy vs Rent Estimate</a></li>
-                    </ul>
-                </li>
-
-                <li class="nav-item">
-                    <a href="../blogs.html" class="nav-link">Blog</a>
-                </li>
-            </ul>
-
-            <button class="mobile-menu-toggle" aria-label="Toggle menu">
-                <span></span>
-                <span></span>
-                <span></span>
-            </button>
-        </div>
-    </nav>
+{nav('../')}
 
     <div class="container">
         <div class="calculator-header">
@@ -287,8 +249,17 @@ def generate_page_content(property_price, calculations):
                         </div>
 """
 
+    loan = property_price * (1 - ILLUSTRATIVE_DEPOSIT)
     html_content += f"""                    </div>
                 </div>
+
+                <div class="static-charts">
+                    {band_chart([(band['label'], band['tax']) for band in calculations['bands'] if band['tax'] > 0], "Stamp duty by band")}
+                    {split_chart([('Property price', property_price, 'net'), ('Stamp duty', calculations['total_stamp_duty'], 'tax')], "Upfront cost")}
+                    <h3>Repaying a {format_currency(loan)} Mortgage</h3>
+                    <p>Illustration: {ILLUSTRATIVE_DEPOSIT:.0%} deposit, {ILLUSTRATIVE_RATE * 100:.1f}% interest over {ILLUSTRATIVE_TERM} years. Green is the balance left, red the interest paid so far.</p>
+                    {amortization_chart(loan, ILLUSTRATIVE_RATE, ILLUSTRATIVE_TERM)}
+                </div>
             </div>
 
             <div class="calculator-info">
@@ -323,6 +294,14 @@ def generate_page_content(property_price, calculations):
                         <i class="fas fa-calculator"></i> Use Full Calculator
                     </a>
                 </div>
+
+                <div class="related-pages" data-nosearch>
+                    <h3>Related Pages</h3>
+                    <div class="related-links">
+                        <!-- related:start limit="6" -->
+                        <!-- related:end -->
+                    </div>
+                </div>
             </div>
         </div>
 
@@ -372,35 +351,38 @@ def generate_property_prices():
 
     return sorted(list(set(prices)))  # Remove duplicates and sort
 
+def pages(output_dir="stamp-duty-calculator"):
+    """(path, input data, render) for every property price page"""
+    # Assume standard main residence purchase (not FTB, not additional)
+    # Could be enhanced to generate different types, but for now using standard
+    return [
+        (os.path.join(output_dir, f"{price}.html"), price,
+         lambda price=price: generate_page_content(price, calculate_stamp_duty(price, is_first_time_buyer=False, is_additional_property=False)))
+        for price in generate_property_prices()
+    ]
+
 def main():
     """Generate all stamp duty calculator pages"""
-    prices = generate_property_prices()
+    output_dir = "stamp-duty-calculator"
+    price_pages = pages(output_dir)
 
-    print(f"Generating {len(prices)} stamp duty calculator pages...")
+    print(f"Generating {len(price_pages)} stamp duty calculator pages...")
 
     # Create output directory if it doesn't exist
-    output_dir = "stamp-duty-calculator"
     os.makedirs(output_dir, exist_ok=True)
 
     # Generate each page
-    for price in prices:
-        # Assume standard main residence purchase (not FTB, not additional)
-        # Could be enhanced to generate different types, but for now using standard
-        calculations = calculate_stamp_duty(price, is_first_time_buyer=False, is_additional_property=False)
-
-        # Generate page content
-        content = generate_page_content(price, calculations)
-
-        # Write to file
-        filename = f"{price}.html"
-        filepath = os.path.join(output_dir, filename)
-
+    for filepath, price, render in price_pages:
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+            f.write(render())
 
-        print(f"Generated: {filename} - Stamp Duty: £{calculations['total_stamp_duty']:,.0f}")
+        print(f"Generated: {os.path.basename(filepath)}")
 
-    print(f"\nSuccessfully generated {len(prices)} stamp duty calculator pages!")
+    apply_related_links([output_dir])
+    apply_to_directory(output_dir)
+    stats = cache_stats()
+    print(f"\nSuccessfully generated {len(price_pages)} stamp duty calculator pages!")
+    print(f"Charts: {stats['rendered']} rendered, {stats['reused']} reused from the cache")
     print(f"Pages saved in: {output_dir}/")
     print(f"URL format: quidwise.co.uk/stamp-duty-calculator/[price]")
 
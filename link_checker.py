@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Internal link checker for the built site.
+Indexes every output path once, then scans the HTML pages in a process pool (each worker
+gets the index when it starts) and reports links to files that don't exist, pages
+nothing links to, and sitemap.xml entries with no matching file.
+Exits 1 if there are dangling links or missing sitemap entries.
+"""
+
+import argparse
+import json
+import os
+import posixpath
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+from site_files import site_files
+
+SITE_URL = 'https://www.quidwise.co.uk'
+SITEMAP = 'sitemap.xml'
+
+LINK_ATTR = re.compile(r'\b(?:href|src)\s*=\s*"([^"]*)"')
+SRCSET_ATTR = re.compile(r'\bsrcset\s*=\s*"([^"]*)"')
+SITEMAP_LOC = re.compile(r'<loc>\s*([^<\s]+)\s*</loc>')
+
+SKIPPED_SCHEMES = ('mailto:', 'tel:', 'javascript:', 'data:', 'sms:')
+
+_index = frozenset()
+
+
+def build_index(root='.'):
+    """Every published file under root as a '/'-separated path relative to root"""
+    return frozenset(site_files(root))
+
+
+def resolve(url, page):
+    """
+    Site path a link on `page` points to, or None for links off the site.
+    Links to the site's own absolute URLs count as internal.
+    """
+    url = url.strip()
+    if not url or url.startswith('#') or url.lower().startswith(SKIPPED_SCHEMES) or '${' in url:
+        return None
+    if url.startswith(SITE_URL):
+        url = url[len(SITE_URL):] or '/'
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc:
+        return None
+
+    path = unquote(parts.path)
+    if not path:
+        return None   # Query-only link to the same page
+    if path.startswith('/'):
+        target = path.lstrip('/')
+    else:
+        target = posixpath.join(posixpath.dirname(page), path)
+    target = posixpath.normpath(target) if target else '.'
+    if target == '.':
+        return 'index.html'
+    if path.endswith('/'):
+        target += '/index.html'
+    return target
+
+
+def exists(target, index):
+    """Whether a site path is served: the file itself, its clean-URL .html, or a directory index"""
+    return target in index or f"{target}.html" in index or f"{target}/index.html" in index
+
+
+def served_page(target, index):
+    """The file a site path is served from"""
+    for candidate in (target, f"{target}.html", f"{target}/index.html"):
+        if candidate in index:
+            return candidate
+    return target
+
+
+def page_links(markup):
+    """Every href/src/srcset URL in a page"""
+    urls = LINK_ATTR.findall(markup)
+    for srcset in SRCSET_ATTR.findall(markup):
+        urls.extend(candidate.split()[0] for candidate in srcset.split(',') if candidate.strip())
+    return urls
+
+
+def _init_worker(index):
+    global _index
+    _index = index
+
+
+def check_pages(args):
+    """Worker: (dangling links, pages linked to) for a slice of pages"""
+    pages, root = args
+    dangling = []
+    linked = set()
+    for page in pages:
+        with open(os.path.join(root, page), encoding='utf-8', errors='replace') as f:
+            markup = f.read()
+        for url in set(page_links(markup)):
+            target = resolve(url, page)
+            if target is None:
+                continue
+            if exists(target, _index):
+                served = served_page(target, _index)
+                if served != page:
+                    linked.add(served)
+            else:
+                dangling.append((page, url))
+    return dangling, linked
+
+
+def sitemap_paths(path=SITEMAP):
+    """(url, site path) for every <loc> in the sitemap"""
+    with open(path, encoding='utf-8') as f:
+        locs = SITEMAP_LOC.findall(f.read())
+    return [(loc, resolve(loc, '')) for loc in locs]
+
+
+def check_site(root='.', sitemap=SITEMAP, workers=None):
+    """Dangling links, orphan pages and missing sitemap entries for the site under root"""
+    index = build_index(root)
+    pages = sorted(p for p in index if p.endswith('.html'))
+
+    workers = workers or os.cpu_count() or 1
+    size = max(1, len(pages) // (workers * 4))
+    slices = [(pages[i:i + size], root) for i in range(0, len(pages), size)]
+    dangling = []
+    linked = set()
+    if workers == 1:
+        _init_worker(index)
+        results = map(check_pages, slices)
+        for page_dangling, page_linked in results:
+            dangling.extend(page_dangling)
+            linked |= page_linked
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(index,)) as pool:
+            for page_dangling, page_linked in pool.map(check_pages, slices):
+                dangling.extend(page_dangling)
+                linked |= page_linked
+
+    in_sitemap = set()
+    missing = []
+    duplicates = set()
+    sitemap_file = os.path.join(root, sitemap)
+    if os.path.exists(sitemap_file):
+        for loc, target in sitemap_paths(sitemap_file):
+            if target is None or not exists(target, index):
+                missing.append(loc)
+            elif served_page(target, index) in in_sitemap:
+                duplicates.add(loc)
+            else:
+                in_sitemap.add(served_page(target, index))
+
+    orphans = [p for p in pages if p not in linked and p != 'index.html']
+    return {
+        'pages': len(pages),
+        'files': len(index),
+        'dangling': sorted(dangling),
+        'orphans': [{'page': p, 'in_sitemap': p in in_sitemap} for p in orphans],
+        'missing_from_site': sorted(missing),
+        'duplicate_sitemap_entries': sorted(duplicates)
+    }
+
+
+def main():
+    """Check the site's internal links and sitemap"""
+    parser = argparse.ArgumentParser(description="Check internal links, orphan pages and sitemap entries")
+    parser.add_argument('--root', default='.')
+    parser.add_argument('--sitemap', default=SITEMAP)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--json', action='store_true', help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = check_site(args.root, args.sitemap, args.workers)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for page, url in report['dangling']:
+            print(f"DANGLING {page}: {url}")
+        for url in report['missing_from_site']:
+            print(f"SITEMAP  {url} has no matching file")
+        for url in report['duplicate_sitemap_entries']:
+            print(f"SITEMAP  {url} is listed more than once")
+        for orphan in report['orphans']:
+            print(f"ORPHAN   {orphan['page']}" + (" (in sitemap)" if orphan['in_sitemap'] else ""))
+        print(f"{report['pages']} pages, {report['files']} files checked in {elapsed:.2f}s: "
+              f"{len(report['dangling'])} dangling links, {len(report['missing_from_site'])} missing sitemap "
+              f"entries, {len(report['orphans'])} orphan pages")
+
+    sys.exit(1 if report['dangling'] or report['missing_from_site'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Mileage allowance engine for the quidwise-pro mileage log.
+Applies HMRC simplified mileage rates (45p for the first 10,000 business miles in a
+tax year, 25p after) cumulatively per user and tax year, in one sorted pass over all
+trips, and keeps running per-user totals so new trips update a total in O(1).
+"""
+
+import argparse
+import os
+import sqlite3
+from functools import lru_cache
+from itertools import accumulate, groupby
+from urllib.request import pathname2url
+
+# HMRC approved mileage rates for cars and vans (pence per mile)
+FIRST_RATE_PENCE = 45
+SECOND_RATE_PENCE = 25
+RATE_THRESHOLD_MILES = 10000
+
+# Miles are stored to one decimal place, so work in whole tenths of a mile.
+# Claims are exact integers in "tenth-mile pence" until rounded to whole pence.
+TENTHS = 10
+THRESHOLD_TENTHS = RATE_THRESHOLD_MILES * TENTHS
+
+# Local SQLite copy of public.mileage from supabase-schema.sql
+SQLITE_SCHEMA = """
+create table if not exists mileage (
+  id text primary key,
+  user_id text not null,
+  date text not null,
+  from_location text not null,
+  to_location text not null,
+  miles numeric(8,1) not null,
+  purpose text not null,
+  is_return_trip integer default 0,
+  rate_pence numeric(5,1) not null default 45.0,
+  amount numeric(10,2) generated always as (round(miles * rate_pence / 100, 2)) stored,
+  created_at text default current_timestamp
+);
+create index if not exists idx_mileage_user_date on mileage(user_id, date desc);
+"""
+
+
+@lru_cache(maxsize=4096)
+def tax_year_label(date):
+    """UK tax year for an ISO date string, e.g. '2025-04-05' -> '2024/25'"""
+    year = int(date[:4])
+    if date[5:10] < '04-06':
+        year -= 1
+    return f"{year}/{str(year + 1)[-2:]}"
+
+
+def trip_tenths(miles, is_return_trip=False):
+    """Business miles for a trip in tenths of a mile (return trips count both ways)"""
+    return round(float(miles) * TENTHS) * (2 if is_return_trip else 1)
+
+
+def claim_units(tenths_before, tenths_after):
+    """Claim in tenth-mile pence for miles driven between two cumulative totals"""
+    first = min(tenths_after, THRESHOLD_TENTHS) - min(tenths_before, THRESHOLD_TENTHS)
+    second = max(tenths_after, THRESHOLD_TENTHS) - max(tenths_before, THRESHOLD_TENTHS)
+    return first * FIRST_RATE_PENCE + second * SECOND_RATE_PENCE
+
+
+def claim_pence(tenths):
+    """Whole-pence claim for a cumulative mileage total, rounded half up"""
+    return (claim_units(0, tenths) + 5) // TENTHS
+
+
+def compute_claims(trips):
+    """
+    Claimable amount for every trip.
+    trips: iterable of (trip_id, user_id, date, miles, is_return_trip).
+    Trips are sorted and grouped by user and tax year once, then each group gets a
+    running mileage total so the 45p/25p split falls on the right trip.
+    Returns (per-trip claims, per user/tax-year totals).
+    """
+    keyed = sorted(
+        (user_id, tax_year_label(date), date, trip_id, trip_tenths(miles, is_return))
+        for trip_id, user_id, date, miles, is_return in trips
+    )
+
+    claims = {}
+    totals = {}
+    for (user_id, tax_year), group in groupby(keyed, key=lambda t: (t[0], t[1])):
+        group = list(group)
+        running = list(accumulate(t[4] for t in group))
+
+        # Differences of the running claim in whole pence, so trip claims add up to the total
+        running_pence = [claim_pence(tenths) for tenths in running]
+        previous_pence = 0
+        for trip, pence in zip(group, running_pence):
+            claims[trip[3]] = (pence - previous_pence) / 100
+            previous_pence = pence
+
+        total_tenths = running[-1]
+        totals[(user_id, tax_year)] = {
+            'trips': len(group),
+            'miles': total_tenths / TENTHS,
+            'miles_at_first_rate': min(total_tenths, THRESHOLD_TENTHS) / TENTHS,
+            'miles_at_second_rate': max(0, total_tenths - THRESHOLD_TENTHS) / TENTHS,
+            'claimable': running_pence[-1] / 100
+        }
+
+    return claims, totals
+
+
+class MileageLedger:
+    """
+    Running per-user, per-tax-year mileage totals.
+    The claim for a tax year depends only on its total miles, so adding or removing a
+    trip is O(1) whatever order trips arrive in.
+    """
+
+    def __init__(self):
+        self.totals = {}
+
+    @classmethod
+    def from_trips(cls, trips):
+        """Build a ledger from (trip_id, user_id, date, miles, is_return_trip) rows"""
+        ledger = cls()
+        _, totals = compute_claims(trips)
+        for key, summary in totals.items():
+            ledger.totals[key] = [summary['trips'], round(summary['miles'] * TENTHS)]
+        return ledger
+
+    def add_trip(self, user_id, date, miles, is_return_trip=False):
+        """Record a trip and return its claimable amount and the rate it was paid at"""
+        key = (user_id, tax_year_label(date))
+        entry = self.totals.setdefault(key, [0, 0])
+        before = entry[1]
+        entry[0] += 1
+        entry[1] += trip_tenths(miles, is_return_trip)
+
+        return {
+            'claimable': (claim_pence(entry[1]) - claim_pence(before)) / 100,
+            'rate_pence': FIRST_RATE_PENCE if entry[1] <= THRESHOLD_TENTHS else SECOND_RATE_PENCE
+        }
+
+    def remove_trip(self, user_id, date, miles, is_return_trip=False):
+        """Reverse a previously recorded trip; ValueError if the ledger never had it"""
+        tax_year = tax_year_label(date)
+        entry = self.totals.get((user_id, tax_year))
+        tenths = trip_tenths(miles, is_return_trip)
+        if entry is None or entry[0] < 1 or entry[1] < tenths:
+            trips, recorded = entry or (0, 0)
+            raise ValueError(f"{user_id} {tax_year}: cannot remove a {tenths / TENTHS:,.1f} mile trip, "
+                             f"only {trips} trips and {recorded / TENTHS:,.1f} miles are recorded")
+        entry[0] -= 1
+        entry[1] -= tenths
+
+    def summary(self, user_id, tax_year):
+        """Dashboard totals for one user and tax year"""
+        trips, tenths = self.totals.get((user_id, tax_year), (0, 0))
+        return {
+            'trips': trips,
+            'miles': tenths / TENTHS,
+            'miles_at_first_rate': min(tenths, THRESHOLD_TENTHS) / TENTHS,
+            'miles_at_second_rate': max(0, tenths - THRESHOLD_TENTHS) / TENTHS,
+            'claimable': claim_pence(tenths) / 100,
+            'current_rate_pence': FIRST_RATE_PENCE if tenths < THRESHOLD_TENTHS else SECOND_RATE_PENCE
+        }
+
+
+def create_sqlite_schema(conn):
+    """Create the local SQLite copy of the mileage table"""
+    conn.executescript(SQLITE_SCHEMA)
+
+
+def load_trips(conn):
+    """Read (trip_id, user_id, date, miles, is_return_trip) rows from a mileage table"""
+    return conn.execute(
+        "select id, user_id, date, miles, is_return_trip from mileage"
+    ).fetchall()
+
+
+def main():
+    """Print per-user, per-tax-year mileage claims from a local SQLite copy"""
+    parser = argparse.ArgumentParser(description="Compute mileage allowance claims per user and tax year")
+    parser.add_argument('database', help="SQLite database containing a mileage table")
+    parser.add_argument('--create-schema', action='store_true',
+                        help="Create the mileage table (and its index) first if it does not exist")
+    args = parser.parse_args()
+
+    if args.create_schema:
+        conn = sqlite3.connect(args.database)
+        create_sqlite_schema(conn)
+    else:
+        # Read-only, so a mistyped path is not created as an empty database
+        try:
+            conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(args.database))}?mode=ro", uri=True)
+        except sqlite3.OperationalError as error:
+            parser.error(f"{args.database}: {error}")
+    if not conn.execute("select 1 from sqlite_master where type = 'table' and name = 'mileage'").fetchone():
+        parser.error(f"{args.database} has no mileage table (pass --create-schema to create one)")
+    trips = load_trips(conn)
+    claims, totals = compute_claims(trips)
+
+    print(f"Computed claims for {len(claims):,} trips across {len(totals):,} user tax years")
+    for (user_id, tax_year), summary in sorted(totals.items()):
+        print(f"{user_id} {tax_year}: {summary['miles']:,.1f} miles "
+              f"({summary['miles_at_second_rate']:,.1f} at {SECOND_RATE_PENCE}p) "
+              f"= £{summary['claimable']:,.2f}")
+
+
+if __name__ == "__main__":
+    main()
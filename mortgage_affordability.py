@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Mortgage affordability engine.
+Finds the maximum loan that passes both the lender income-multiple cap and an
+affordability stress test (monthly payment at the product rate plus a buffer),
+for single and joint incomes across a grid of product rates and terms.
+"""
+
+from functools import lru_cache
+
+from regenerate_income_tax_pages import calculate_net_pay
+
+# Lender assumptions (multiples match mortgage-affordability.js)
+LOW_INCOME_MULTIPLE = 4.0
+HIGH_INCOME_MULTIPLE = 5.5
+STRESS_BUFFER = 0.03          # Stress rate = product rate + 3 percentage points
+MAX_PAYMENT_SHARE = 0.40      # Stressed payment may use up to 40% of net monthly pay
+
+# Default grid used by the affordability pages
+DEFAULT_INCOMES = tuple(range(20000, 150001, 5000))
+DEFAULT_RATES = (0.035, 0.04, 0.045, 0.05, 0.055, 0.06)
+DEFAULT_TERMS = (25, 30, 35)
+
+
+@lru_cache(maxsize=None)
+def net_monthly_pay(income):
+    """Monthly take-home pay for one earner, from calculate_net_pay"""
+    if income <= 0:
+        return 0.0
+    return calculate_net_pay(income)['net'] / 12
+
+
+@lru_cache(maxsize=None)
+def annuity_factor(annual_rate, term_years):
+    """Loan supported by £1/month of repayment (closed-form annuity)"""
+    n = term_years * 12
+    r = annual_rate / 12
+    if r == 0:
+        return float(n)
+    return (1 - (1 + r) ** -n) / r
+
+
+def monthly_payment(loan, annual_rate, term_years):
+    """Monthly repayment on a capital-and-interest mortgage"""
+    return loan / annuity_factor(annual_rate, term_years)
+
+
+@lru_cache(maxsize=None)
+def _evaluate_grid(incomes, partner_incomes, rates, terms, income_multiple, stress_buffer, payment_share):
+    """Evaluate the income x rate x term grid once and return it as nested tuples"""
+
+    # Household gross and net pay - tax is per person, so each earner is taxed separately
+    gross = [a + b for a, b in zip(incomes, partner_incomes)]
+    net = [net_monthly_pay(a) + net_monthly_pay(b) for a, b in zip(incomes, partner_incomes)]
+
+    # Stressed annuity factors depend only on rate and term
+    factors = [[annuity_factor(rate + stress_buffer, term) for term in terms] for rate in rates]
+
+    income_caps = tuple(g * income_multiple for g in gross)
+    stress_caps = []
+    max_loans = []
+    for cap, net_pay in zip(income_caps, net):
+        budget = net_pay * payment_share
+        stress_row = tuple(tuple(budget * f for f in row) for row in factors)
+        stress_caps.append(stress_row)
+        max_loans.append(tuple(tuple(min(cap, loan) for loan in row) for row in stress_row))
+
+    return income_caps, tuple(net), tuple(stress_caps), tuple(max_loans)
+
+
+def affordability_grid(incomes, rates=DEFAULT_RATES, terms=DEFAULT_TERMS, partner_incomes=None,
+                       income_multiple=HIGH_INCOME_MULTIPLE, stress_buffer=STRESS_BUFFER,
+                       payment_share=MAX_PAYMENT_SHARE):
+    """
+    Maximum loan for every income x rate x term combination.
+    max_loan[i][r][t] is the smaller of the income-multiple cap and the loan whose
+    payment at (rate + stress_buffer) fits within payment_share of net monthly pay.
+    Results are cached, so repeated calls for the same grid cost nothing.
+    """
+    incomes = tuple(incomes)
+    partner_incomes = tuple(partner_incomes) if partner_incomes is not None else (0,) * len(incomes)
+    if len(partner_incomes) != len(incomes):
+        raise ValueError("partner_incomes must be the same length as incomes")
+
+    income_caps, net, stress_caps, max_loans = _evaluate_grid(
+        incomes, partner_incomes, tuple(rates), tuple(terms),
+        income_multiple, stress_buffer, payment_share
+    )
+
+    return {
+        'incomes': incomes,
+        'partner_incomes': partner_incomes,
+        'rates': tuple(rates),
+        'terms': tuple(terms),
+        'net_monthly': net,
+        'income_cap': income_caps,
+        'stress_cap': stress_caps,
+        'max_loan': max_loans
+    }
+
+
+def calculate_affordability(income, partner_income=0, rate=0.045, term_years=25):
+    """Maximum loan for a single household, with the limiting test identified"""
+    grid = affordability_grid((income,), (rate,), (term_years,), partner_incomes=(partner_income,))
+
+    income_cap = grid['income_cap'][0]
+    stress_cap = grid['stress_cap'][0][0][0]
+    max_loan = grid['max_loan'][0][0][0]
+
+    return {
+        'total_income': income + partner_income,
+        'net_monthly': round(grid['net_monthly'][0], 2),
+        'low_estimate': round((income + partner_income) * LOW_INCOME_MULTIPLE, 2),
+        'income_cap': round(income_cap, 2),
+        'stress_cap': round(stress_cap, 2),
+        'max_loan': round(max_loan, 2),
+        'limited_by': 'income_multiple' if income_cap <= stress_cap else 'stress_test',
+        'monthly_payment': round(monthly_payment(max_loan, rate, term_years), 2),
+        'stressed_payment': round(monthly_payment(max_loan, rate + STRESS_BUFFER, term_years), 2)
+    }
+
+
+def default_table():
+    """The full default grid used by the affordability pages and APIs"""
+    return affordability_grid(DEFAULT_INCOMES)
+
+
+def main():
+    """Print a summary of the default affordability grid"""
+    table = default_table()
+
+    print(f"Affordability grid: {len(table['incomes'])} incomes x {len(table['rates'])} rates x {len(table['terms'])} terms")
+    print("=" * 60)
+
+    term_index = table['terms'].index(25)
+    for i, income in enumerate(table['incomes']):
+        if income % 20000:
+            continue
+        loans = [table['max_loan'][i][r][term_index] for r in range(len(table['rates']))]
+        print(f"£{income:,}: " + ", ".join(f"{rate * 100:.1f}% £{loan:,.0f}" for rate, loan in zip(table['rates'], loans)))
+
+
+if __name__ == "__main__":
+    main()
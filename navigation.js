@@ -97,6 +97,92 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
     
+    // Site search: a box at the end of the menu. site-search.js and the index shards
+    // are only fetched once someone starts typing.
+    if (navMenu) {
+        const searchItem = document.createElement('li');
+        searchItem.className = 'nav-item nav-search';
+        searchItem.innerHTML = `
+            <form class="nav-search-form" role="search">
+                <input type="search" class="nav-search-input" placeholder="Search" aria-label="Search the site" autocomplete="off">
+                <ul class="nav-search-results" hidden></ul>
+            </form>
+        `;
+        navMenu.appendChild(searchItem);
+
+        const searchForm = searchItem.querySelector('.nav-search-form');
+        const searchInput = searchItem.querySelector('.nav-search-input');
+        const searchResults = searchItem.querySelector('.nav-search-results');
+        let searchLoaded = null;
+        let searchTimer = null;
+        let latestQuery = 0;
+
+        function loadSearch() {
+            if (!searchLoaded) {
+                searchLoaded = new Promise(function(resolve, reject) {
+                    const script = document.createElement('script');
+                    script.src = '/site-search.js';
+                    script.onload = function() { resolve(window.siteSearch); };
+                    script.onerror = reject;
+                    document.body.appendChild(script);
+                });
+            }
+            return searchLoaded;
+        }
+
+        function showResults(results, query) {
+            searchResults.innerHTML = '';
+            if (!results.length) {
+                const empty = document.createElement('li');
+                empty.className = 'nav-search-empty';
+                empty.textContent = 'No pages match "' + query + '"';
+                searchResults.appendChild(empty);
+            }
+            results.forEach(result => {
+                const item = document.createElement('li');
+                const link = document.createElement('a');
+                link.href = result.url;
+                link.textContent = result.title;
+                item.appendChild(link);
+                searchResults.appendChild(item);
+            });
+            searchResults.hidden = false;
+        }
+
+        searchInput.addEventListener('input', function() {
+            clearTimeout(searchTimer);
+            const query = searchInput.value.trim();
+            if (!query) {
+                searchResults.hidden = true;
+                return;
+            }
+            searchTimer = setTimeout(function() {
+                const queryId = ++latestQuery;
+                loadSearch()
+                    .then(siteSearch => siteSearch(query, 8))
+                    .then(results => {
+                        if (queryId === latestQuery) showResults(results, query);
+                    })
+                    .catch(() => {
+                        searchResults.hidden = true;
+                    });
+            }, 150);
+        });
+
+        // Enter goes to the best match
+        searchForm.addEventListener('submit', function(e) {
+            e.preventDefault();
+            const first = searchResults.querySelector('a');
+            if (first) window.location.href = first.href;
+        });
+
+        document.addEventListener('click', function(e) {
+            if (!e.target.closest('.nav-search')) {
+                searchResults.hidden = true;
+            }
+        });
+    }
+
     // Email Signup Modal
     const emailSignupBtn = document.getElementById('emailSignupBtn');
     if (emailSignupBtn) {
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Page-weight and request-count budgets for the built site.
+Streams every HTML page through a parser (in parallel), totals the page's own bytes,
+its inline <script>/<style> bytes and the bytes of the local assets it references,
+counts requests to other hosts and reports pages over budget. Exits 1 on any violation,
+so it can gate a build.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from site_files import site_pages
+
+# Defaults for --max-weight (KB), --max-requests and --max-inline (KB)
+BUDGETS = {'weight': 500, 'requests': 20, 'inline': 150}
+
+# <link rel> values that make the browser fetch the href
+FETCHED_RELS = {'stylesheet', 'preload', 'modulepreload', 'icon', 'shortcut', 'apple-touch-icon', 'manifest'}
+
+READ_SIZE = 1 << 16
+
+
+class PageScanner(HTMLParser):
+    """Collects a page's inline bytes and the URLs it makes the browser fetch"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.urls = []
+        self.images = []
+        self.inline = 0
+        self._picture = None
+        self._inline_tag = None
+        self._noscript = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'noscript':
+            # Fallbacks for when scripts are off; normally never fetched
+            self._noscript += 1
+            return
+        if self._noscript:
+            return
+        attrs = dict(attrs)
+        url = None
+        if tag == 'picture':
+            self._picture = []
+            return
+        if tag == 'img' or (tag == 'source' and self._picture is not None):
+            # The browser fetches one candidate per <img>/<picture>; each is a group
+            candidates = srcset_urls(attrs.get('srcset') or '')
+            if tag == 'img' and attrs.get('src'):
+                candidates.append(attrs['src'])
+            if self._picture is not None:
+                self._picture.extend(candidates)
+            elif candidates:
+                self.images.append(candidates)
+            return
+        if tag in ('script', 'iframe', 'embed') or (tag == 'source' and 'src' in attrs):
+            url = attrs.get('src')
+        elif tag == 'link' and FETCHED_RELS & set((attrs.get('rel') or '').lower().split()):
+            url = attrs.get('href')
+        if url:
+            self.urls.append(url)
+        elif tag in ('script', 'style'):
+            self._inline_tag = tag
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag == 'noscript' and self._noscript:
+            self._noscript -= 1
+        elif tag == 'picture' and self._picture is not None:
+            if self._picture:
+                self.images.append(self._picture)
+            self._picture = None
+        elif tag == self._inline_tag:
+            self._inline_tag = None
+
+    def handle_data(self, data):
+        if self._inline_tag:
+            self.inline += len(data.encode('utf-8'))
+
+
+def srcset_urls(srcset):
+    """The candidate URLs of a srcset attribute, without their width/density descriptors"""
+    return [candidate.split()[0] for candidate in srcset.split(',') if candidate.strip()]
+
+
+def _is_external(url):
+    parts = urlsplit(url)
+    return bool(parts.scheme in ('http', 'https') or url.startswith('//'))
+
+
+@lru_cache(maxsize=None)
+def _asset_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def scan_page(path, root='.'):
+    """Weight and request summary for one page"""
+    scanner = PageScanner()
+    html_bytes = 0
+    with open(path, encoding='utf-8') as f:
+        for chunk in iter(lambda: f.read(READ_SIZE), ''):
+            html_bytes += len(chunk.encode('utf-8'))
+            scanner.feed(chunk)
+    scanner.close()
+
+    page_dir = os.path.dirname(path)
+    external = set()
+    assets = {}
+    missing = set()
+
+    def resolve(url):
+        local = urlsplit(url).path
+        return os.path.normpath(os.path.join(root, local.lstrip('/')) if local.startswith('/')
+                                else os.path.join(page_dir, local))
+
+    for url in scanner.urls:
+        if url.startswith(('data:', 'javascript:', '#')):
+            continue
+        if _is_external(url):
+            external.add(url)
+            continue
+        resolved = resolve(url)
+        size = _asset_size(resolved)
+        if size is None:
+            missing.add(url)
+        else:
+            assets[resolved] = size
+
+    # Count the largest candidate of each image: the worst case of what it costs to fetch
+    for candidates in scanner.images:
+        largest = None
+        remote = None
+        for url in candidates:
+            if url.startswith(('data:', 'javascript:', '#')):
+                continue
+            if _is_external(url):
+                remote = remote or url
+                continue
+            resolved = resolve(url)
+            size = _asset_size(resolved)
+            if size is None:
+                missing.add(url)
+            elif largest is None or size > largest[1]:
+                largest = (resolved, size)
+        if largest:
+            assets[largest[0]] = largest[1]
+        elif remote:
+            external.add(remote)
+
+    asset_bytes = sum(assets.values())
+    return {
+        'page': os.path.relpath(path, root).replace(os.sep, '/'),
+        'html_bytes': html_bytes,
+        'inline_bytes': scanner.inline,
+        'asset_bytes': asset_bytes,
+        'weight': html_bytes + asset_bytes,
+        'local_requests': len(assets),
+        'external_requests': len(external),
+        'missing': sorted(missing)
+    }
+
+
+def _scan_chunk(args):
+    paths, root = args
+    return [scan_page(path, root) for path in paths]
+
+
+def scan_site(pages, root='.', workers=None):
+    """Scan pages in a process pool, a slice of pages per task"""
+    workers = workers or os.cpu_count() or 1
+    size = max(1, len(pages) // (workers * 4))
+    slices = [(pages[i:i + size], root) for i in range(0, len(pages), size)]
+    if workers == 1:
+        return [row for args in slices for row in _scan_chunk(args)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [row for rows in pool.map(_scan_chunk, slices) for row in rows]
+
+
+def violations(row, budgets):
+    """Budgets a page breaks, as human-readable strings"""
+    broken = []
+    if row['weight'] > budgets['weight'] * 1024:
+        broken.append(f"weight {row['weight'] / 1024:,.0f}KB > {budgets['weight']}KB")
+    if row['external_requests'] > budgets['requests']:
+        broken.append(f"{row['external_requests']} external requests > {budgets['requests']}")
+    if row['inline_bytes'] > budgets['inline'] * 1024:
+        broken.append(f"inline {row['inline_bytes'] / 1024:,.0f}KB > {budgets['inline']}KB")
+    if row['missing']:
+        broken.append(f"{len(row['missing'])} missing assets: {', '.join(row['missing'][:3])}")
+    return broken
+
+
+def main():
+    """Check every page of the site against the page-weight budgets"""
+    parser = argparse.ArgumentParser(description="Check page weight and request budgets")
+    parser.add_argument('pages', nargs='*', help="Pages or globs (default: the whole site)")
+    parser.add_argument('--max-weight', type=int, default=BUDGETS['weight'], help="KB of HTML plus local assets")
+    parser.add_argument('--max-requests', type=int, default=BUDGETS['requests'], help="Requests to other hosts")
+    parser.add_argument('--max-inline', type=int, default=BUDGETS['inline'], help="KB of inline script and style")
+    parser.add_argument('--top', type=int, default=10, help="Heaviest pages to list")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--json', action='store_true', help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    budgets = {'weight': args.max_weight, 'requests': args.max_requests, 'inline': args.max_inline}
+    pages = sorted({p for pattern in args.pages for p in glob.glob(pattern)}) if args.pages else site_pages()
+
+    start = time.perf_counter()
+    report = sorted(scan_site(pages, workers=args.workers), key=lambda r: (-r['weight'], r['page']))
+    failing = [(row, violations(row, budgets)) for row in report]
+    failing = [(row, broken) for row, broken in failing if broken]
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        for row in report:
+            row['violations'] = violations(row, budgets)
+        print(json.dumps({'budgets': budgets, 'pages': report}, indent=2))
+    else:
+        print(f"{'Page':<50} {'Weight':>9} {'HTML':>8} {'Inline':>8} {'Local':>6} {'External':>9}")
+        for row in report[:args.top]:
+            print(f"{row['page']:<50} {row['weight'] / 1024:>7,.0f}KB {row['html_bytes'] / 1024:>6,.0f}KB "
+                  f"{row['inline_bytes'] / 1024:>6,.0f}KB {row['local_requests']:>6} {row['external_requests']:>9}")
+        print()
+        for row, broken in failing:
+            print(f"OVER BUDGET {row['page']}: {'; '.join(broken)}")
+        print(f"{len(report)} pages checked in {elapsed:.2f}s, {len(failing)} over budget")
+
+    sys.exit(1 if failing else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Period-by-period PAYE payroll engine.
+Parses tax codes once (cached), then works out cumulative income tax and per-period
+Class 1 NI for a whole pay run at a time: employees are grouped by pay period so each
+group is one batch through a compiled period schedule. Weekly (weeks 1-52, plus week 53
+taxed on the week 1 basis) and monthly (months 1-12) pay, K codes, BR/D0/D1/NT and
+emergency W1/M1/X codes are handled using the exact percentage method.
+"""
+
+import argparse
+import csv
+import math
+import re
+import sys
+from functools import lru_cache
+
+from tax_schedules import TAX_YEARS, DEFAULT_TAX_YEAR, Schedule, class1_ni_schedule
+
+WEEKLY = 'weekly'
+MONTHLY = 'monthly'
+PERIODS = {WEEKLY: 52, MONTHLY: 12}
+
+# A weekly payroll with 53 paydays in the year taxes the last one on the week 1 basis
+EXTRA_PERIODS = {WEEKLY: 1, MONTHLY: 0}
+
+# Per-period Class 1 primary threshold and upper earnings limit (HMRC rates and thresholds)
+NI_PERIOD_THRESHOLDS = {
+    '2024/25': {WEEKLY: (242, 967), MONTHLY: (1048, 4189)},
+    '2025/26': {WEEKLY: (242, 967), MONTHLY: (1048, 4189)}
+}
+
+# K code tax in a period can't be more than half the pay for that period
+K_CODE_LIMIT = 0.5
+
+TAX_CODE_PATTERN = re.compile(
+    r'^(?P<region>[SC]?)(?:(?P<fixed>BR|D0|D1|NT)|K(?P<k>\d+)|(?P<number>\d+)(?P<suffix>[LMNT]))'
+    r'\s*(?P<basis>W1|M1|X)?$'
+)
+
+PAYSLIP_FIELDS = [
+    'employee_id', 'tax_code', 'basis', 'frequency', 'period', 'gross_pay', 'tax', 'ni', 'net_pay',
+    'pay_to_date', 'tax_to_date', 'ni_to_date'
+]
+
+
+class TaxCode:
+    """A parsed tax code"""
+
+    __slots__ = ('code', 'allowance', 'fixed_rate', 'cumulative', 'k_code')
+
+    def __init__(self, code, allowance, fixed_rate, cumulative, k_code):
+        self.code = code
+        self.allowance = allowance      # Annual tax-free pay (negative for K codes)
+        self.fixed_rate = fixed_rate    # 'BR', 'D0', 'D1', 'NT' or None for banded codes
+        self.cumulative = cumulative    # False for emergency W1/M1/X codes
+        self.k_code = k_code
+
+
+@lru_cache(maxsize=None)
+def parse_tax_code(code):
+    """Parse a tax code such as '1257L', 'K475', 'BR' or '1257L W1'"""
+    normalised = ' '.join(code.upper().split())
+    match = TAX_CODE_PATTERN.match(normalised)
+    if not match:
+        raise ValueError(f"Invalid tax code '{code}'")
+    if match['region'] == 'S':
+        raise ValueError(f"Scottish tax code '{code}' is not supported (Scottish bands are not modelled)")
+
+    if match['k']:
+        allowance = -(int(match['k']) * 10 + 9)
+    elif match['number']:
+        number = int(match['number'])
+        allowance = number * 10 + 9 if number else 0
+    else:
+        allowance = 0
+
+    return TaxCode(normalised, allowance, match['fixed'], match['basis'] is None, bool(match['k']))
+
+
+def _floor_pence(amount):
+    return math.floor(amount * 100 + 1e-6) / 100
+
+
+def _ceil_pence(amount):
+    return math.ceil(amount * 100 - 1e-6) / 100
+
+
+@lru_cache(maxsize=None)
+def period_tax_schedule(tax_year, periods, period, fixed_rate=None):
+    """Tax due to date on taxable pay to date, with the bands scaled to `period` of `periods`"""
+    rules = TAX_YEARS[tax_year]
+    if fixed_rate == 'NT':
+        return Schedule((0,), (0,), (0,))
+    if fixed_rate:
+        rate = {'BR': rules['basic_rate'], 'D0': rules['higher_rate'], 'D1': rules['additional_rate']}[fixed_rate]
+        return Schedule((0,), (0,), (rate,))
+
+    basic = math.ceil(rules['basic_rate_band'] * period / periods)
+    additional = math.ceil(rules['additional_rate_threshold'] * period / periods)
+    rates = (rules['basic_rate'], rules['higher_rate'], rules['additional_rate'])
+    return Schedule(
+        (0, basic, additional),
+        (0, basic * rates[0], basic * rates[0] + (additional - basic) * rates[1]),
+        rates
+    )
+
+
+@lru_cache(maxsize=None)
+def period_ni_schedule(tax_year, frequency):
+    """Employee Class 1 NI on one period's earnings"""
+    rules = TAX_YEARS[tax_year]
+    primary, upper = NI_PERIOD_THRESHOLDS[tax_year][frequency]
+    main_rate, upper_rate = rules['ni_main_rate'], rules['ni_upper_rate']
+    return Schedule((0, primary, upper), (0, 0, (upper - primary) * main_rate), (0, main_rate, upper_rate))
+
+
+def pay_run(run, tax_year=DEFAULT_TAX_YEAR):
+    """
+    Work out tax and NI for a pay run given as columns (a dict of equal-length lists):
+    employee_id, tax_code, frequency, period, gross_pay, and the figures to date before
+    this period: pay_to_date, tax_to_date, ni_to_date (optional, only used for directors)
+    and director (optional; directors pay NI on the annual earnings period).
+    Returns the payslip columns listed in PAYSLIP_FIELDS. Raises ValueError for an unknown
+    frequency or a period outside the tax year (weeks 1-53, months 1-12).
+    """
+    n = len(run['employee_id'])
+    codes = [parse_tax_code(code) for code in run['tax_code']]
+    frequencies = run['frequency']
+    periods = [int(p) for p in run['period']]
+    gross = [float(g) for g in run['gross_pay']]
+    pay_before = [float(p) for p in run['pay_to_date']]
+    tax_before = [float(t) for t in run['tax_to_date']]
+    ni_before = [float(x) for x in run.get('ni_to_date', [0] * n)]
+    directors = [str(d).lower() in ('1', 'true', 'yes') for d in run.get('director', [False] * n)]
+
+    for employee_id, frequency, period in zip(run['employee_id'], frequencies, periods):
+        if frequency not in PERIODS:
+            raise ValueError(f"{employee_id}: unknown pay frequency '{frequency}'")
+        last = PERIODS[frequency] + EXTRA_PERIODS[frequency]
+        if not 1 <= period <= last:
+            raise ValueError(f"{employee_id}: {frequency} period {period} is outside 1-{last}")
+
+    # Week 53 is always non-cumulative, whatever the code's basis
+    cumulative = [code.cumulative and period <= PERIODS[frequency]
+                  for code, frequency, period in zip(codes, frequencies, periods)]
+    pay_to_date = [p + g for p, g in zip(pay_before, gross)]
+
+    # Taxable pay to date (whole pounds, rounded down) and the schedule each row uses
+    taxable = []
+    keys = []
+    for i in range(n):
+        code = codes[i]
+        per_year = PERIODS[frequencies[i]]
+        if cumulative[i]:
+            period, pay = periods[i], pay_to_date[i]
+        else:
+            period, pay = 1, gross[i]
+        free_pay = _ceil_pence(code.allowance * period / per_year) if code.allowance > 0 else \
+            _floor_pence(code.allowance * period / per_year)
+        taxable.append(max(0, math.floor(pay - free_pay)) if not code.fixed_rate else math.floor(pay))
+        keys.append((per_year, period, code.fixed_rate))
+
+    # One batch per distinct period schedule
+    tax_due = [0.0] * n
+    groups = {}
+    for i, key in enumerate(keys):
+        groups.setdefault(key, []).append(i)
+    for (per_year, period, fixed_rate), rows in groups.items():
+        values = period_tax_schedule(tax_year, per_year, period, fixed_rate).batch([taxable[i] for i in rows])
+        for i, value in zip(rows, values):
+            tax_due[i] = _floor_pence(value)
+
+    tax = []
+    for i in range(n):
+        due = tax_due[i] - tax_before[i] if cumulative[i] else tax_due[i]
+        if codes[i].k_code:
+            due = min(due, _floor_pence(gross[i] * K_CODE_LIMIT))
+        tax.append(round(due, 2))
+
+    # NI: per period for employees, cumulative on the annual thresholds for directors
+    ni = [0.0] * n
+    by_frequency = {}
+    for i in range(n):
+        if directors[i]:
+            due = class1_ni_schedule(tax_year)(pay_to_date[i]) - ni_before[i]
+            ni[i] = round(max(0.0, _floor_pence(due)), 2)
+        else:
+            by_frequency.setdefault(frequencies[i], []).append(i)
+    for frequency, rows in by_frequency.items():
+        values = period_ni_schedule(tax_year, frequency).batch([gross[i] for i in rows])
+        for i, value in zip(rows, values):
+            ni[i] = _floor_pence(value)
+
+    return {
+        'employee_id': list(run['employee_id']),
+        'tax_code': [code.code for code in codes],
+        'basis': ['cumulative' if basis else 'non-cumulative' for basis in cumulative],
+        'frequency': list(frequencies),
+        'period': periods,
+        'gross_pay': gross,
+        'tax': tax,
+        'ni': ni,
+        'net_pay': [round(g - t - x, 2) for g, t, x in zip(gross, tax, ni)],
+        'pay_to_date': [round(p, 2) for p in pay_to_date],
+        'tax_to_date': [round(b + t, 2) for b, t in zip(tax_before, tax)],
+        'ni_to_date': [round(b + x, 2) for b, x in zip(ni_before, ni)]
+    }
+
+
+def payslips(result):
+    """Payslip records (one dict per employee) from pay_run columns"""
+    columns = [result[field] for field in PAYSLIP_FIELDS]
+    for row in zip(*columns):
+        yield dict(zip(PAYSLIP_FIELDS, row))
+
+
+def read_pay_run(path):
+    """Read a pay run CSV into columns"""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        columns = {field: [] for field in reader.fieldnames}
+        for row in reader:
+            for field, value in row.items():
+                columns[field].append(value)
+    return columns
+
+
+def write_payslips(result, out):
+    """Write payslip records as CSV in one pass"""
+    writer = csv.writer(out)
+    writer.writerow(PAYSLIP_FIELDS)
+    writer.writerows(zip(*(result[field] for field in PAYSLIP_FIELDS)))
+
+
+def main():
+    """Run a pay run CSV through PAYE and write payslip records"""
+    parser = argparse.ArgumentParser(description="Cumulative PAYE and NI for a pay run")
+    parser.add_argument('pay_run', help="CSV with employee_id, tax_code, frequency, period, gross_pay, "
+                                        "pay_to_date, tax_to_date[, ni_to_date, director]")
+    parser.add_argument('--tax-year', default=DEFAULT_TAX_YEAR, choices=sorted(TAX_YEARS))
+    parser.add_argument('--output', help="Payslip CSV to write (default: stdout)")
+    args = parser.parse_args()
+
+    result = pay_run(read_pay_run(args.pay_run), args.tax_year)
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            write_payslips(result, f)
+    else:
+        write_payslips(result, sys.stdout)
+
+    print(f"{len(result['employee_id']):,} payslips: £{sum(result['tax']):,.2f} tax, "
+          f"£{sum(result['ni']):,.2f} NI", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
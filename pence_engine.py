@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Exact integer-pence take-home pay engine.
+Every amount is a whole number of pence and every rate a whole number of basis points,
+so results are exact and repeatable (safe for cache keys and hashes). HMRC rounding is
+applied at each step rather than once at the end:
+  - pension contributions round to the nearest penny, halves up
+  - the personal allowance taper removes £1 for every whole £2 over the limit
+  - taxable income is rounded down to whole pounds, tax on each band down to the penny
+  - National Insurance rounds to the nearest penny, halves down
+Batches run over array('q') columns (signed 64-bit) without Decimal or floats.
+"""
+
+import argparse
+import time
+from array import array
+from functools import lru_cache
+
+from tax_schedules import TAX_YEARS, DEFAULT_TAX_YEAR
+
+BASIS_POINTS = 10000
+
+RESULT_FIELDS = ('gross', 'pension', 'adjusted_gross', 'tax', 'ni', 'net', 'monthly', 'weekly')
+
+
+def to_pence(amount):
+    """Pounds (int, float or string such as '1,234.56') as whole pence"""
+    if isinstance(amount, int):
+        return amount * 100
+    if isinstance(amount, str):
+        text = amount.replace(',', '').replace('£', '').strip()
+        negative = text.startswith('-')
+        pounds, _, pence = text.lstrip('-').partition('.')
+        value = int(pounds or 0) * 100 + int((pence + '00')[:2])
+        if len(pence) > 2 and pence[2] >= '5':
+            value += 1
+        return -value if negative else value
+    return int(round(amount * 100))
+
+
+def format_pounds(pence, decimals=0):
+    """
+    £1,234 (or £1,234.56) from pence. Whole pounds round half away from zero rather than
+    to even (150 is £2, -150 is -£2), and an amount that rounds to £0 has no sign.
+    """
+    pence_abs = abs(pence)
+    if decimals:
+        sign = '-' if pence < 0 else ''
+        return f"{sign}£{pence_abs // 100:,}.{pence_abs % 100:02d}"
+    pounds = (pence_abs + 50) // 100
+    sign = '-' if pence < 0 and pounds else ''
+    return f"{sign}£{pounds:,}"
+
+
+def _bps(rate):
+    return int(round(rate * BASIS_POINTS))
+
+
+@lru_cache(maxsize=None)
+def pence_rules(tax_year=DEFAULT_TAX_YEAR):
+    """A tax year's thresholds in pence and rates in basis points"""
+    rules = TAX_YEARS[tax_year]
+    return {
+        'personal_allowance': rules['personal_allowance'] * 100,
+        'personal_allowance_limit': rules['personal_allowance_limit'] * 100,
+        'basic_rate_band': rules['basic_rate_band'],                   # Whole pounds
+        'additional_rate_threshold': rules['additional_rate_threshold'],
+        'basic_rate': _bps(rules['basic_rate']),
+        'higher_rate': _bps(rules['higher_rate']),
+        'additional_rate': _bps(rules['additional_rate']),
+        'ni_primary_threshold': rules['ni_primary_threshold'] * 100,
+        'ni_upper_earnings_limit': rules['ni_upper_earnings_limit'] * 100,
+        'ni_main_rate': _bps(rules['ni_main_rate']),
+        'ni_upper_rate': _bps(rules['ni_upper_rate'])
+    }
+
+
+def _divide_half_up(numerator, denominator):
+    return (numerator + denominator // 2) // denominator
+
+
+def net_pay_pence(gross, tax_year=DEFAULT_TAX_YEAR, pension_bps=0):
+    """
+    Take-home pay for a gross salary in pence, with a pension contribution in basis
+    points of salary (5% = 500). Returns a dict of whole-pence amounts.
+    """
+    r = pence_rules(tax_year)
+    pension = _divide_half_up(gross * pension_bps, BASIS_POINTS)
+    adjusted = gross - pension
+
+    # Allowance taper in whole pounds: £1 off for every full £2 over the limit
+    allowance = r['personal_allowance']
+    excess = adjusted - r['personal_allowance_limit']
+    if excess > 0:
+        allowance = max(0, allowance - (excess // 200) * 100)
+
+    taxable = max(0, adjusted - allowance) // 100
+    basic = min(taxable, r['basic_rate_band'])
+    higher = max(0, min(taxable, r['additional_rate_threshold']) - r['basic_rate_band'])
+    additional = max(0, taxable - r['additional_rate_threshold'])
+    tax = (basic * r['basic_rate'] // 100 + higher * r['higher_rate'] // 100
+           + additional * r['additional_rate'] // 100)
+
+    main = max(0, min(adjusted, r['ni_upper_earnings_limit']) - r['ni_primary_threshold'])
+    upper = max(0, adjusted - r['ni_upper_earnings_limit'])
+    ni = (main * r['ni_main_rate'] + upper * r['ni_upper_rate'] + BASIS_POINTS // 2 - 1) // BASIS_POINTS
+
+    net = adjusted - tax - ni
+    return {
+        'gross': gross,
+        'pension': pension,
+        'adjusted_gross': adjusted,
+        'tax': tax,
+        'ni': ni,
+        'net': net,
+        'monthly': _divide_half_up(net, 12),
+        'weekly': _divide_half_up(net, 52)
+    }
+
+
+def net_pay_pence_batch(gross, tax_year=DEFAULT_TAX_YEAR, pension_bps=0):
+    """
+    Batch net_pay_pence over a column of gross salaries in pence.
+    Returns a dict of array('q') columns named as in RESULT_FIELDS.
+    """
+    r = pence_rules(tax_year)
+    pa, limit = r['personal_allowance'], r['personal_allowance_limit']
+    band, top = r['basic_rate_band'], r['additional_rate_threshold']
+    basic_rate, higher_rate, additional_rate = r['basic_rate'], r['higher_rate'], r['additional_rate']
+    pt, uel = r['ni_primary_threshold'], r['ni_upper_earnings_limit']
+    ni_main, ni_upper = r['ni_main_rate'], r['ni_upper_rate']
+    half = BASIS_POINTS // 2
+
+    columns = {field: array('q') for field in RESULT_FIELDS}
+    out = [columns[field].append for field in RESULT_FIELDS]
+    pensions = pension_bps if not isinstance(pension_bps, int) else None
+
+    for i, g in enumerate(gross):
+        bps = pensions[i] if pensions is not None else pension_bps
+        pension = (g * bps + half) // BASIS_POINTS if bps else 0
+        adjusted = g - pension
+
+        allowance = pa
+        if adjusted > limit:
+            allowance = pa - ((adjusted - limit) // 200) * 100
+            if allowance < 0:
+                allowance = 0
+        taxable = (adjusted - allowance) // 100 if adjusted > allowance else 0
+        if taxable <= band:
+            tax = taxable * basic_rate // 100
+        elif taxable <= top:
+            tax = band * basic_rate // 100 + (taxable - band) * higher_rate // 100
+        else:
+            tax = band * basic_rate // 100 + (top - band) * higher_rate // 100 + (taxable - top) * additional_rate // 100
+
+        if adjusted <= pt:
+            ni = 0
+        elif adjusted <= uel:
+            ni = ((adjusted - pt) * ni_main + half - 1) // BASIS_POINTS
+        else:
+            ni = ((uel - pt) * ni_main + (adjusted - uel) * ni_upper + half - 1) // BASIS_POINTS
+
+        net = adjusted - tax - ni
+        out[0](g)
+        out[1](pension)
+        out[2](adjusted)
+        out[3](tax)
+        out[4](ni)
+        out[5](net)
+        out[6]((net + 6) // 12)
+        out[7]((net + 26) // 52)
+
+    return columns
+
+
+def main():
+    """Print an exact breakdown, or time a batch"""
+    parser = argparse.ArgumentParser(description="Exact integer-pence take-home pay")
+    parser.add_argument('salary', nargs='?', default='50000', help="Gross salary in pounds")
+    parser.add_argument('--pension', type=float, default=0, help="Pension contribution percentage")
+    parser.add_argument('--tax-year', default=DEFAULT_TAX_YEAR, choices=sorted(TAX_YEARS))
+    parser.add_argument('--benchmark', type=int, metavar='N', help="Time a batch of N salaries")
+    args = parser.parse_args()
+
+    pension_bps = _bps(args.pension / 100)
+    if args.benchmark:
+        gross = array('q', range(0, args.benchmark * 1537, 1537))
+        start = time.perf_counter()
+        net_pay_pence_batch(gross, args.tax_year, pension_bps)
+        print(f"{len(gross):,} salaries in {time.perf_counter() - start:.2f}s")
+        return
+
+    result = net_pay_pence(to_pence(args.salary), args.tax_year, pension_bps)
+    for field in RESULT_FIELDS:
+        print(f"{field:<15} {format_pounds(result[field], 2):>14}")
+
+
+if __name__ == "__main__":
+    main()
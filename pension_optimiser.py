@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Pension salary sacrifice optimiser.
+Evaluates take-home pay for every pension percentage from 0% to 100% in 0.1% steps in
+one batch, then works out how much take-home each extra pound in the pension costs.
+Near £100k the allowance taper makes the first slice of sacrifice very cheap; the
+efficient frontier shows where that stops. Contributions stop at the pension annual
+allowance (tapered for high earners), since anything above it is taxed back as an
+annual allowance charge.
+"""
+
+import argparse
+import math
+from functools import lru_cache
+
+from tax_schedules import DEFAULT_TAX_YEAR, TAX_YEARS, net_pay_batch
+
+STEP = 0.1   # Percentage points between evaluated contributions
+
+# Relative difference in pension-per-pound treated as the same rate
+SLOPE_TOLERANCE = 0.002
+
+
+def annual_allowance(salary, rules):
+    """
+    Most a salary can sacrifice without an annual allowance charge.
+    Sacrificed salary counts towards adjusted income but not threshold income, so the
+    full allowance applies if sacrificing it brings threshold income down to the taper
+    threshold; otherwise the allowance tapers £1 per £2 of salary over the adjusted limit.
+    """
+    full = rules['pension_annual_allowance']
+    if salary - full <= rules['pension_taper_threshold_income']:
+        return full
+    excess = max(0, salary - rules['pension_taper_adjusted_income'])
+    return max(rules['pension_minimum_allowance'], full - excess / 2)
+
+
+@lru_cache(maxsize=1024)
+def sacrifice_curve(salary, tax_year=DEFAULT_TAX_YEAR, step=STEP):
+    """
+    Pension and take-home pay at every contribution percentage up to the annual allowance.
+    Returns tuples (percentages, pension, net, cost) where cost is the take-home given up
+    compared with no sacrifice.
+    """
+    limit = min(100.0, annual_allowance(salary, TAX_YEARS[tax_year]) / salary * 100) if salary > 0 else 100.0
+    steps = math.floor(limit / step + 1e-9)
+    percentages = tuple(round(i * step, 4) for i in range(steps + 1))
+    result = net_pay_batch([salary] * len(percentages), tax_year, pension_percentage=percentages)
+    net0 = result['net'][0]
+    return percentages, tuple(result['pension']), tuple(result['net']), tuple(round(net0 - n, 2) for n in result['net'])
+
+
+def efficient_frontier(pension, cost):
+    """
+    Indices of the upper convex hull of (cost, pension) starting from no sacrifice:
+    each segment is the best pension-per-pound-of-take-home available from the last.
+    """
+    hull = [0]
+    for i in range(1, len(pension)):
+        while len(hull) >= 2:
+            a, b = hull[-2], hull[-1]
+            # Drop b if the chord a -> i is at least as steep as a -> b
+            if (pension[b] - pension[a]) * (cost[i] - cost[a]) <= (pension[i] - pension[a]) * (cost[b] - cost[a]):
+                hull.pop()
+            else:
+                break
+        hull.append(i)
+
+    # Penny rounding can split one band into several segments with almost the same
+    # rate; merge each into the segment before it (hull rates only ever fall)
+    merged = hull[:2]
+    for i in hull[2:]:
+        a, b = merged[-2], merged[-1]
+        # Cross-multiplied: rate(b -> i) >= rate(a -> b) less the tolerance
+        if (pension[i] - pension[b]) * (cost[b] - cost[a]) >= \
+                (pension[b] - pension[a]) * (cost[i] - cost[b]) * (1 - SLOPE_TOLERANCE):
+            merged[-1] = i
+        else:
+            merged.append(i)
+    return merged
+
+
+def optimise(salary, tax_year=DEFAULT_TAX_YEAR, step=STEP):
+    """
+    Best-value pension sacrifice for a salary.
+    Returns the efficient frontier (percentage, pension, take-home cost and the
+    pension per £1 of take-home along each segment) and the percentage at the end of the
+    best-returning segment. Nothing beyond the annual allowance is considered.
+    """
+    percentages, pension, net, cost = sacrifice_curve(salary, tax_year, step)
+    hull = efficient_frontier(pension, cost)
+
+    frontier = []
+    for a, b in zip(hull, hull[1:]):
+        gained = pension[b] - pension[a]
+        given_up = cost[b] - cost[a]
+        frontier.append({
+            'from_percentage': percentages[a],
+            'to_percentage': percentages[b],
+            'pension': pension[b],
+            'net': net[b],
+            'take_home_cost': cost[b],
+            'pension_per_pound': round(gained / given_up, 4) if given_up > 0 else None
+        })
+
+    best = frontier[0] if frontier else None
+    return {
+        'salary': salary,
+        'tax_year': tax_year,
+        'annual_allowance': annual_allowance(salary, TAX_YEARS[tax_year]),
+        'best_percentage': best['to_percentage'] if best else 0.0,
+        'best_pension_per_pound': best['pension_per_pound'] if best else None,
+        'best_pension': best['pension'] if best else 0.0,
+        'best_take_home_cost': best['take_home_cost'] if best else 0.0,
+        'frontier': frontier
+    }
+
+
+def main():
+    """Print the cheapest pension sacrifice for salaries around the taper"""
+    parser = argparse.ArgumentParser(description="Find the pension sacrifice with the best return")
+    parser.add_argument('salaries', nargs='*', type=float, default=[60000, 100000, 110000, 125140, 150000])
+    parser.add_argument('--tax-year', default=DEFAULT_TAX_YEAR, choices=sorted(TAX_YEARS))
+    args = parser.parse_args()
+
+    for salary in args.salaries:
+        result = optimise(salary, args.tax_year)
+        print(f"£{salary:,.0f}: sacrifice {result['best_percentage']}% "
+              f"(£{result['best_pension']:,.0f} into the pension for £{result['best_take_home_cost']:,.0f} "
+              f"take-home, £{result['best_pension_per_pound'] or 0:.2f} per £1)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Policy-change impact engine.
+Runs a weighted synthetic population of taxpayers through two rule sets (two tax years,
+or a tax year with proposed changes) using the compiled schedules, in chunks, and
+reports who gains and who loses by income decile and by tax band, plus the change in
+income tax and National Insurance revenue. Employer NI counts towards revenue but not
+towards what employees gain or lose, so a change to it moves only the revenue figures.
+"""
+
+import argparse
+import json
+import math
+import time
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import accumulate
+from statistics import NormalDist
+
+from tax_schedules import (TAX_YEARS, DEFAULT_TAX_YEAR, combine, compile_class1_ni, compile_employer_ni,
+                           compile_income_tax)
+
+# Synthetic employee population, roughly matching the HMRC survey of personal incomes
+TAXPAYERS = 30_000_000
+MEDIAN_SALARY = 37_000
+SALARY_SPREAD = 0.62     # Standard deviation of log salary
+POPULATION_SIZE = 1_000_000
+
+CHUNK_SIZE = 250_000
+
+
+def rule_set(tax_year=DEFAULT_TAX_YEAR, **changes):
+    """A copy of a tax year's rules with proposed changes applied"""
+    rules = dict(TAX_YEARS[tax_year])
+    for key, value in changes.items():
+        if key not in rules:
+            raise KeyError(f"Unknown rule '{key}'")
+        rules[key] = value
+    return rules
+
+
+def deductions_schedule(rules):
+    """Income tax plus Class 1 NI as one compiled schedule"""
+    return combine((1, compile_income_tax(rules)), (1, compile_class1_ni(rules)))
+
+
+@lru_cache(maxsize=4)
+def synthetic_population(size=POPULATION_SIZE, taxpayers=TAXPAYERS, median=MEDIAN_SALARY, spread=SALARY_SPREAD):
+    """
+    Log-normal salaries at evenly spaced quantiles, so the population is already sorted
+    and every sample stands for the same number of taxpayers.
+    Returns (salaries, weights) as tuples, cached for repeated comparisons.
+    """
+    inv_cdf = NormalDist(math.log(median), spread).inv_cdf
+    salaries = tuple(round(math.exp(inv_cdf((i + 0.5) / size)), 2) for i in range(size))
+    return salaries, (taxpayers / size,) * size
+
+
+def band_edges(rules):
+    """
+    (label, lowest gross salary) for each income tax band under a rule set, lowest first.
+    Higher rate with no allowance left only exists when the additional rate starts above
+    the end of the taper (under the 2025/26 rules both are £125,140, so it is left out).
+    """
+    pa = rules['personal_allowance']
+    limit = rules['personal_allowance_limit']
+    taper_end = limit + 2 * pa
+    additional = rules['additional_rate_threshold']
+    edges = [
+        ('Below personal allowance', 0),
+        ('Basic rate', pa),
+        ('Higher rate', pa + rules['basic_rate_band']),
+        ('Allowance taper', limit)
+    ]
+    if additional > taper_end:
+        edges.append(('Higher rate (no allowance)', taper_end))
+    edges.append(('Additional rate', additional))
+    return sorted(edges, key=lambda edge: edge[1])
+
+
+def _summarise(label, salaries, weights, paid_before, paid_after, employer_before, employer_after, lo, hi):
+    """Figures for the taxpayers in rows lo:hi"""
+    rows = range(lo, hi)
+    taxpayers = sum(weights[lo:hi])
+    employee_before = sum(weights[i] * paid_before[i] for i in rows)
+    employee_after = sum(weights[i] * paid_after[i] for i in rows)
+    employer_change = sum(weights[i] * (employer_after[i] - employer_before[i]) for i in rows)
+    revenue_before = employee_before + sum(weights[i] * employer_before[i] for i in rows)
+    revenue_after = revenue_before + employee_after - employee_before + employer_change
+    net_change = employee_before - employee_after
+    return {
+        'label': label,
+        'lower': salaries[lo] if hi > lo else 0.0,
+        'upper': salaries[hi - 1] if hi > lo else 0.0,
+        'taxpayers': round(taxpayers),
+        'mean_net_change': round(net_change / taxpayers, 2) if taxpayers else 0.0,
+        'total_net_change': round(net_change),
+        'revenue_before': round(revenue_before),
+        'revenue_after': round(revenue_after),
+        'revenue_change': round(revenue_after - revenue_before),
+        'employer_ni_change': round(employer_change),
+        'gainers': round(sum(weights[i] for i in rows if paid_after[i] < paid_before[i] - 0.005)),
+        'losers': round(sum(weights[i] for i in rows if paid_after[i] > paid_before[i] + 0.005))
+    }
+
+
+def compare(before, after, salaries, weights, chunk_size=CHUNK_SIZE):
+    """
+    Compare two rule sets over a weighted population.
+    salaries must be sorted ascending (synthetic_population already is), so every
+    decile and every band is a contiguous run of rows found by bisection.
+    Returns totals, per-decile and per-band results.
+    """
+    schedules = (deductions_schedule(before), deductions_schedule(after),
+                 compile_employer_ni(before), compile_employer_ni(after))
+
+    columns = tuple(array('d') for _ in schedules)
+    for start in range(0, len(salaries), chunk_size):
+        chunk = salaries[start:start + chunk_size]
+        for column, schedule in zip(columns, schedules):
+            column.extend(schedule.batch(chunk))
+
+    def summary(label, lo, hi):
+        return _summarise(label, salaries, weights, *columns, lo, hi)
+
+    cumulative = list(accumulate(weights))
+    total_weight = cumulative[-1] if cumulative else 0
+    decile_edges = [0] + [bisect_left(cumulative, total_weight * d / 10) + 1 for d in range(1, 10)] + [len(salaries)]
+    deciles = [summary(f"Decile {d + 1}", decile_edges[d], decile_edges[d + 1]) for d in range(10)]
+
+    edges = band_edges(before)
+    band_rows = [bisect_left(salaries, lower) for _, lower in edges] + [len(salaries)]
+    bands = [summary(label, band_rows[b], band_rows[b + 1])
+             for b, (label, _) in enumerate(edges) if band_rows[b + 1] > band_rows[b]]
+
+    return {
+        'total': summary('All taxpayers', 0, len(salaries)),
+        'deciles': deciles,
+        'bands': bands
+    }
+
+
+def parse_change(text):
+    """'basic_rate=0.22' -> ('basic_rate', 0.22)"""
+    key, _, value = text.partition('=')
+    number = float(value)
+    return key.strip(), int(number) if number.is_integer() and '.' not in value else number
+
+
+def main():
+    """Compare two rule sets and print the winners and losers"""
+    parser = argparse.ArgumentParser(description="Who gains and who loses from a tax change")
+    parser.add_argument('--before', default='2024/25', choices=sorted(TAX_YEARS), help="Baseline tax year")
+    parser.add_argument('--after', default=DEFAULT_TAX_YEAR, choices=sorted(TAX_YEARS), help="Reform tax year")
+    parser.add_argument('--set', dest='changes', action='append', default=[], metavar='RULE=VALUE',
+                        help="Proposed change to the reform rules, e.g. basic_rate=0.22 (repeatable)")
+    parser.add_argument('--size', type=int, default=POPULATION_SIZE, help="Synthetic population samples")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    salaries, weights = synthetic_population(args.size)
+    before = rule_set(args.before)
+    after = rule_set(args.after, **dict(parse_change(change) for change in args.changes))
+    results = compare(before, after, salaries, weights)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    total = results['total']
+    reform = args.after + (f" with {', '.join(args.changes)}" if args.changes else "")
+    print(f"{args.before} -> {reform}: {args.size:,} samples in {elapsed:.2f}s")
+    print(f"Revenue change: £{total['revenue_change'] / 1e9:+,.2f}bn, of which employer NI "
+          f"£{total['employer_ni_change'] / 1e9:+,.2f}bn ({total['gainers']:,} gain, {total['losers']:,} lose)")
+    print("=" * 78)
+    for section in ('deciles', 'bands'):
+        for row in results[section]:
+            print(f"{row['label']:<28} £{row['lower']:>9,.0f}-£{row['upper']:>9,.0f}  "
+                  f"{row['mean_net_change']:>+9,.2f}/yr  revenue £{row['revenue_change'] / 1e6:>+9,.1f}m")
+        print("-" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,21 @@ Uses the same logic as the JavaScript calculator (with 5% pension by default).
 import os
 import math
 
+from results import NetPayResult
+from tax_schedules import TAX_YEARS, income_tax_bands
+from critical_css import apply_to_directory
+from related_pages import apply_related_links
+from site_template import nav
+from svg_charts import band_chart, cache_stats, split_chart
+
+# Chart labels for the tax_schedules.income_tax_bands bands
+BAND_LABELS = {'basic': 'Basic rate', 'higher': 'Higher rate', 'additional': 'Additional rate'}
+
 def calculate_net_pay(salary, tax_year='2025/26', has_pension=False, pension_percentage=0):
-    """Calculate net pay using the same logic as the JavaScript calculator (NO pension by default)"""
+    """
+    Calculate net pay using the same logic as the JavaScript calculator (NO pension by default):
+    the personal allowance taper above £100,000 and the 45% rate on taxable income above £125,140.
+    """
 
     # Personal allowance
     personal_allowance = 12570
@@ -21,6 +34,10 @@ def calculate_net_pay(salary, tax_year='2025/26', has_pension=False, pension_per
     # Adjusted gross salary (after pension deduction if any)
     adjusted_gross = salary - annual_pension_contribution
 
+    # Personal allowance tapers by £1 for every £2 over £100,000
+    if adjusted_gross > 100000:
+        personal_allowance = max(0, personal_allowance - (adjusted_gross - 100000) / 2)
+
     # Calculate taxable income
     taxable_income = max(0, adjusted_gross - personal_allowance)
 
@@ -31,10 +48,14 @@ def calculate_net_pay(salary, tax_year='2025/26', has_pension=False, pension_per
         basic_rate_amount = min(taxable_income, 37700)
         tax += basic_rate_amount * 0.20
 
-        # Higher rate: 40% on remaining taxable income
-        higher_rate_amount = max(0, taxable_income - 37700)
+        # Higher rate: 40% on taxable income up to £125,140
+        higher_rate_amount = max(0, min(taxable_income, 125140) - 37700)
         tax += higher_rate_amount * 0.40
 
+        # Additional rate: 45% on taxable income above £125,140
+        additional_rate_amount = max(0, taxable_income - 125140)
+        tax += additional_rate_amount * 0.45
+
     # Calculate National Insurance (8% between £12,570 and £50,270, then 2% above)
     ni_threshold = 12570
     ni_upper_limit = 50270
@@ -53,16 +74,23 @@ def calculate_net_pay(salary, tax_year='2025/26', has_pension=False, pension_per
     # Calculate net pay
     net_pay = adjusted_gross - tax - ni
 
-    return {
-        'gross': salary,
-        'pension': round(annual_pension_contribution, 2),
-        'adjusted_gross': round(adjusted_gross, 2),
-        'tax': round(tax, 2),
-        'ni': round(ni, 2),
-        'net': round(net_pay, 2),
-        'monthly': round(net_pay / 12, 2),
-        'weekly': round(net_pay / 52, 2)
-    }
+    return NetPayResult(
+        gross=salary,
+        pension=round(annual_pension_contribution, 2),
+        adjusted_gross=round(adjusted_gross, 2),
+        tax=round(tax, 2),
+        ni=round(ni, 2),
+        net=round(net_pay, 2),
+        monthly=round(net_pay / 12, 2),
+        weekly=round(net_pay / 52, 2)
+    )
+
+def tax_by_band(adjusted_gross, tax_year='2025/26'):
+    """Income tax paid in each band, for the band breakdown chart (bands from tax_schedules)"""
+    bands = income_tax_bands(adjusted_gross, TAX_YEARS[tax_year])
+    return [('Personal allowance (0%)', 0)] + [
+        (f"{BAND_LABELS[band]} ({rate:.0%})", amount * rate) for band, rate, amount in bands
+    ]
 
 def get_salary_short(salary):
     """Generate a short salary label like '30k' or '20.25k'"""
@@ -181,56 +209,7 @@ def generate_page_content(salary_amount, calculations):
     </script>
 </head>
 <body>
-    <!-- Navigation -->
-    <nav class="main-nav">
-        <div class="nav-container">
-            <a href="../index.html" class="logo-link">
-                <div class="quidwise-logo">
-                    <img src="../logo.svg" alt="QuidWise Logo" class="logo-image">
-                    <div class="logo-text-container">
-                        <span class="logo-text">QuidWise</span>
-                        <span class="logo-tagline">Make your pay go further</span>
-                    </div>
-                </div>
-            </a>
-
-            <ul class="nav-menu">
-                <li class="nav-item dropdown">
-                    <a href="#" class="nav-link">
-                        Tax & Budgeting <i class="fas fa-chevron-down"></i>
-                    </a>
-                    <ul class="dropdown-menu">
-                        <li><a href="../income-tax-calculator.html">Income Tax Calculator</a></li>
-                        <li><a href="../budget-planner.html">Budget Planner</a></li>
-                    </ul>
-                </li>
-
-                <li class="nav-item dropdown">
-                    <a href="#" class="nav-link">
-                        Mortgages & Property <i class="fas fa-chevron-down"></i>
-                    </a>
-                    <ul class="dropdown-menu">
-                        <li><a href="../mortgage-calculator.html">Mortgage Calculator</a></li>
-                        <li><a href="../mortgage-affordability.html">Mortgage Affordability</a></li>
-                        <li><a href="../stamp-duty-calculator.html">Stamp Duty Calculator</a></li>
-                        <li><a href="../find-mortgage-deals.html">Mortgage Rate Comparison</a></li>
-                        <li><a href="../mortgage-overpayment.html">Mortgage Overpayment Calculator</a></li>
-                        <li><a href="../buy-or-rent.html">Buy vs Rent Estimate</a></li>
-                    </ul>
-                </li>
-
-                <li class="nav-item">
-                    <a href="../blogs.html" class="nav-link">Blog</a>
-                </li>
-            </ul>
-
-            <button class="mobile-menu-toggle" aria-label="Toggle menu">
-                <span></span>
-                <span></span>
-                <span></span>
-            </button>
-        </div>
-    </nav>
+{nav('../')}
 
     <div class="container">
         <div class="calculator-header">
@@ -283,6 +262,12 @@ def generate_page_content(salary_amount, calculations):
                         <span class="freq-value">£{calculations['weekly']:,.0f}</span>
                     </div>
                 </div>
+
+                <div class="static-charts">
+                    {split_chart([('Income Tax', calculations['tax'], 'tax'), ('National Insurance', calculations['ni'], 'ni'), ('Take-home', calculations['net'], 'net')])}
+                    <h3>Income Tax by Band</h3>
+                    {band_chart([band for band in tax_by_band(calculations['adjusted_gross']) if band[1] > 0 or band[0].startswith('Personal')])}
+                </div>
             </div>
 
             <div class="calculator-info">
@@ -306,6 +291,14 @@ def generate_page_content(salary_amount, calculations):
                         <i class="fas fa-calculator"></i> Use Full Calculator
                     </a>
                 </div>
+
+                <div class="related-pages" data-nosearch>
+                    <h3>Related Pages</h3>
+                    <div class="related-links">
+                        <!-- related:start limit="6" -->
+                        <!-- related:end -->
+                    </div>
+                </div>
             </div>
         </div>
 
@@ -341,6 +334,15 @@ def format_currency(amount):
     """Format amount as currency"""
     return f"£{amount:,.0f}" if amount >= 100 else f"£{amount:,.2f}"
 
+def pages(output_dir="income-tax-calculator"):
+    """(path, input data, render) for every salary page, £20,000 to £70,000 in £250 intervals"""
+    # Calculated with NO pension (to match calculator default state)
+    return [
+        (os.path.join(output_dir, f"{salary}.html"), salary,
+         lambda salary=salary: generate_page_content(salary, calculate_net_pay(salary, has_pension=False, pension_percentage=0)))
+        for salary in range(20000, 70001, 250)
+    ]
+
 def main():
     """Regenerate all income tax calculator pages with correct calculations"""
 
@@ -350,29 +352,19 @@ def main():
     output_dir = "income-tax-calculator"
     os.makedirs(output_dir, exist_ok=True)
 
-    # Generate salary amounts from 20000 to 70000 in £250 intervals
-    salaries = []
-    for amount in range(20000, 70001, 250):
-        salaries.append(amount)
-
     # Regenerate each page
-    for salary in salaries:
-        # Calculate with NO pension (to match calculator default state)
-        calculations = calculate_net_pay(salary, has_pension=False, pension_percentage=0)
-
-        # Generate page content
-        content = generate_page_content(salary, calculations)
-
-        # Write to file
-        filename = f"{salary}.html"
-        filepath = os.path.join(output_dir, filename)
-
+    salary_pages = pages(output_dir)
+    for filepath, salary, render in salary_pages:
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+            f.write(render())
 
-        print(f"Regenerated: {filename} - Net: £{calculations['net']:,} (Monthly: £{calculations['monthly']:,})")
+        print(f"Regenerated: {os.path.basename(filepath)}")
 
-    print(f"\nSuccessfully regenerated {len(salaries)} income tax calculator pages!")
+    apply_related_links([output_dir])
+    apply_to_directory(output_dir)
+    stats = cache_stats()
+    print(f"\nSuccessfully regenerated {len(salary_pages)} income tax calculator pages!")
+    print(f"Charts: {stats['rendered']} rendered, {stats['reused']} reused from the cache")
     print(f"Pages saved in: {output_dir}/")
     print("All pages now calculated WITHOUT pension contributions (matching calculator default).")
 
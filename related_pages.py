@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Related links from content similarity.
+Each page is reduced to its top TF-IDF terms (from the search index's per-page term
+cache), with amounts also bucketed by magnitude so £30,000 and £30,250 pages look alike.
+A weighted one-permutation MinHash signature of those terms goes into LSH band buckets;
+only pages sharing a bucket are compared, by cosine similarity, so the work grows linearly
+with the number of pages.
+
+Templates mark where the links go:
+    <!-- related:start scope="expenses/" limit="4" --> ... <!-- related:end -->
+and apply_related_links fills the block in. Wrap it in an element with data-nosearch so
+the links don't feed back into the search index or the similarity scores.
+"""
+
+import argparse
+import hashlib
+import html
+import math
+import os
+import posixpath
+import re
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+
+from site_files import site_pages
+from search_index import load_cache, save_cache, update_pages
+
+FEATURES = 48          # Top TF-IDF terms per page
+BINS = 32              # MinHash signature length
+ROWS = 1               # Signature values per LSH band (32 bands)
+MAX_BUCKET = 32        # In bigger buckets a page is only paired with its neighbours in path order
+CANDIDATES = 64        # Candidates per page scored exactly (roughly)
+WEIGHT_COPIES = 10     # A term of weight w goes into the signature round(w * 10) times
+MAGNITUDE_STEP = 1.15  # Width of the buckets amounts are grouped into (15%)
+
+DEFAULT_LIMIT = 6
+DEFAULT_ICON = 'fa-arrow-right'
+
+RELATED_BLOCK = re.compile(r'(<!-- related:start(?P<options>[^>]*?)-->)(?P<body>.*?)([ \t]*<!-- related:end -->)', re.S)
+OPTION = re.compile(r'(\w+)="([^"]*)"')
+HEADING = re.compile(r'<h1[^>]*>(.*?)</h1>', re.S)
+TITLE = re.compile(r'<title>(.*?)</title>', re.S)
+ICON = re.compile(r'\b(fa-(?!solid\b|regular\b|brands\b)[a-z0-9-]+)')
+
+
+def features(terms):
+    """A page's term scores, plus a magnitude term for each amount"""
+    out = dict(terms)
+    for term, score in terms.items():
+        if term.isdigit() and int(term) >= 100:
+            bucket = f"~{round(math.log(int(term)) / math.log(MAGNITUDE_STEP))}"
+            out[bucket] = out.get(bucket, 0) + score
+    return out
+
+
+def tfidf_vectors(entries):
+    """{page: {term: weight}} with each page's top FEATURES terms, normalised to unit length"""
+    page_features = {page: features(entry['terms']) for page, entry in entries.items()}
+    df = defaultdict(int)
+    for terms in page_features.values():
+        for term in terms:
+            df[term] += 1
+
+    n = len(page_features)
+    vectors = {}
+    for page, terms in page_features.items():
+        weighted = sorted(((score * math.log(n / df[term]), term) for term, score in terms.items()), reverse=True)
+        top = [(term, weight) for weight, term in weighted[:FEATURES] if weight > 0]
+        norm = math.sqrt(sum(w * w for _, w in top)) or 1
+        vectors[page] = {term: w / norm for term, w in top}
+    return vectors
+
+
+@lru_cache(maxsize=None)
+def _term_hashes(term, copies):
+    return tuple(int.from_bytes(hashlib.blake2b(f"{term}#{copy}".encode('utf-8'), digest_size=8).digest(), 'little')
+                 for copy in range(copies))
+
+
+def signature(vector):
+    """
+    One-permutation MinHash of a {term: weight} vector: each term hash lands in one of
+    BINS bins and each bin keeps its minimum. Heavier terms are hashed several times, so
+    pages sharing their most distinctive terms collide more often. Empty bins borrow from
+    the next non-empty bin, offset by the distance.
+    """
+    mins = [None] * BINS
+    for term, weight in vector.items():
+        for h in _term_hashes(term, max(1, round(weight * WEIGHT_COPIES))):
+            b, value = h % BINS, h // BINS
+            if mins[b] is None or value < mins[b]:
+                mins[b] = value
+    if all(m is None for m in mins):
+        return tuple(range(BINS))
+    filled = []
+    for i in range(BINS):
+        distance = 0
+        while mins[(i + distance) % BINS] is None:
+            distance += 1
+        filled.append((mins[(i + distance) % BINS] << 5) + distance)
+    return tuple(filled)
+
+
+def lsh_buckets(signatures):
+    """{(band, values): [page ids]} with the ids in each bucket in ascending order"""
+    buckets = defaultdict(list)
+    for page_id, sig in enumerate(signatures):
+        for band in range(0, BINS, ROWS):
+            buckets[(band, sig[band:band + ROWS])].append(page_id)
+    return buckets
+
+
+def candidates(page_id, sig, buckets):
+    """
+    Pages sharing an LSH bucket with page_id. The smallest buckets (the rarest shared
+    features) are taken first until there are CANDIDATES; in buckets bigger than
+    MAX_BUCKET only the pages nearest in path order are taken.
+    """
+    keys = sorted(((band, sig[band:band + ROWS]) for band in range(0, BINS, ROWS)), key=lambda k: len(buckets[k]))
+    found = set()
+    half = MAX_BUCKET // 2
+    for key in keys:
+        members = buckets[key]
+        if len(members) > MAX_BUCKET:
+            i = bisect_left(members, page_id)
+            members = members[max(0, i - half):i + half + 1]
+        found.update(members)
+        if len(found) > CANDIDATES:
+            break
+    found.discard(page_id)
+    return found
+
+
+def cosine(a, b):
+    return sum(a[t] * b[t] for t in a.keys() & b.keys())
+
+
+def related_index(entries, pages=None):
+    """
+    {page: [similar pages, most similar first]} for `pages` (default: every page),
+    from LSH candidates re-ranked by cosine similarity.
+    """
+    names = sorted(entries)
+    vectors = tfidf_vectors(entries)
+    signatures = [signature(vectors[name]) for name in names]
+    buckets = lsh_buckets(signatures)
+    ids = {name: i for i, name in enumerate(names)}
+
+    index = {}
+    for page in (names if pages is None else pages):
+        vector = vectors[page]
+        scored = []
+        for other in candidates(ids[page], signatures[ids[page]], buckets):
+            score = cosine(vector, vectors[names[other]])
+            if score > 0:
+                scored.append((-score, names[other]))
+        index[page] = [name for _, name in sorted(scored)]
+    return index
+
+
+@lru_cache(maxsize=None)
+def page_label(path):
+    """(label, icon) for links to a page: its <h1> text and icon, falling back to the <title>"""
+    with open(path, encoding='utf-8') as f:
+        markup = f.read()
+    heading = HEADING.search(markup)
+    label = ' '.join(re.sub(r'<[^>]+>', '', heading.group(1)).split()) if heading else ''
+    if not label:
+        title = TITLE.search(markup)
+        label = title.group(1).split(' | ')[0].strip() if title else os.path.basename(path)
+    icon = ICON.search(heading.group(1)) if heading else None
+    return html.unescape(label), icon.group(1) if icon else DEFAULT_ICON
+
+
+def render_links(page, targets, root='.'):
+    """Related link markup for a page, with hrefs relative to it"""
+    lines = []
+    for target in targets:
+        label, icon = page_label(os.path.join(root, target))
+        href = posixpath.relpath(target, posixpath.dirname(page) or '.')
+        lines.append(f'<a href="{href}" class="related-link"><i class="fas {icon}"></i> {html.escape(label)}</a>')
+    return lines
+
+
+def choose(page, ranked, scope, limit, site):
+    """Up to `limit` related pages within scope, topped up in path order if similarity finds too few"""
+    chosen = [p for p in ranked if p.startswith(scope)][:limit]
+    if len(chosen) < limit:
+        extra = [p for p in site if p.startswith(scope) and p != page and p not in chosen]
+        chosen.extend(extra[:limit - len(chosen)])
+    return chosen
+
+
+def fill_blocks(page, markup, ranked, site, root='.'):
+    """Replace the contents of every related block in a page"""
+    def fill(match):
+        options = dict(OPTION.findall(match.group('options')))
+        limit = int(options.get('limit', DEFAULT_LIMIT))
+        targets = choose(page, ranked, options.get('scope', ''), limit, site)
+        indent = re.match(r'[ \t]*', match.group(4)).group(0)
+        body = ''.join(f"\n{indent}{line}" for line in render_links(page, targets, root))
+        return f"{match.group(1)}{body}\n{match.group(4)}"
+
+    return RELATED_BLOCK.sub(fill, markup)
+
+
+def apply_related_links(directories=None, root='.'):
+    """
+    Fill the related blocks in the site's pages (or only those under `directories`).
+    Returns (pages with a related block, pages updated).
+    """
+    entries, reindexed = update_pages(site_pages(root), load_cache(), root)
+    if reindexed:
+        save_cache(entries)
+
+    prefixes = tuple(d.rstrip('/') + '/' for d in directories) if directories else ('',)
+    targets = {}
+    for page in entries:
+        if page.startswith(prefixes):
+            with open(os.path.join(root, page), encoding='utf-8') as f:
+                markup = f.read()
+            if '<!-- related:start' in markup:
+                targets[page] = markup
+
+    index = related_index(entries, targets)
+    site = sorted(entries)
+    updated = 0
+    for page, markup in targets.items():
+        filled = fill_blocks(page, markup, index[page], site, root)
+        if filled != markup:
+            with open(os.path.join(root, page), 'w', encoding='utf-8') as f:
+                f.write(filled)
+            updated += 1
+    return len(targets), updated
+
+
+def main():
+    """Fill the related links blocks across the site"""
+    parser = argparse.ArgumentParser(description="Fill related links blocks from content similarity")
+    parser.add_argument('directories', nargs='*', help="Only update pages under these directories")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pages, updated = apply_related_links(args.directories or None)
+    print(f"{updated} of {pages} pages with related links updated in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Responsive image build stage.
+Resizes the photos in images/ to several widths in WebP and optimised JPEG (in parallel,
+one process per image) and rewrites the <img> tags on the site's pages to <picture>
+elements with srcset, sizes, width and height. Images whose source hash and settings
+haven't changed since the last build are skipped.
+
+Resizing needs Pillow, a build dependency (pip install -r requirements-build.txt); the
+stage stops rather than writing a manifest without variants when it is missing.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SOURCE_DIR = 'images'
+OUTPUT_DIR = os.path.join('images', 'responsive')
+MANIFEST = os.path.join(OUTPUT_DIR, 'manifest.json')
+
+WIDTHS = (400, 800, 1200)
+FORMATS = (('webp', 'WEBP'), ('jpg', 'JPEG'))
+QUALITY = 78
+
+# sizes for images without a max-width in their style (the blog card grid)
+DEFAULT_SIZES = '(max-width: 700px) 100vw, 400px'
+
+IMG_TAG = re.compile(r'<img\b[^>]*>')
+
+# JPEG start-of-frame markers (everything from 0xC0 to 0xCF except DHT, JPG and DAC)
+SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+APP1_MARKER = 0xE1
+EXIF_HEADER = b'Exif\x00\x00'
+ORIENTATION_TAG = 0x0112
+
+# EXIF orientations that turn the image a quarter turn, so it displays height x width
+ROTATED = {5, 6, 7, 8}
+
+
+def exif_orientation(segment):
+    """Orientation (1-8) from the body of an APP1 segment; 1 if it isn't EXIF or has no tag"""
+    if not segment.startswith(EXIF_HEADER):
+        return 1
+    tiff = segment[len(EXIF_HEADER):]
+    order = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if order is None or len(tiff) < 8:
+        return 1
+    offset = struct.unpack(order + 'I', tiff[4:8])[0]
+    if offset + 2 > len(tiff):
+        return 1
+    count = struct.unpack(order + 'H', tiff[offset:offset + 2])[0]
+    for entry in range(offset + 2, min(offset + 2 + count * 12, len(tiff) - 11), 12):
+        tag, _, _, value = struct.unpack(order + 'HHI4s', tiff[entry:entry + 12])
+        if tag == ORIENTATION_TAG:
+            return struct.unpack(order + 'H', value[:2])[0]
+    return 1
+
+
+def jpeg_size(path):
+    """
+    (width, height) of a JPEG as displayed: read from its start-of-frame segment, and
+    swapped when the EXIF orientation turns it a quarter turn (as render_variants does)
+    """
+    orientation = 1
+    with open(path, 'rb') as f:
+        if f.read(2) != b'\xff\xd8':
+            raise ValueError(f"{path} is not a JPEG")
+        while True:
+            byte = f.read(1)
+            while byte and byte != b'\xff':
+                byte = f.read(1)
+            while byte == b'\xff':
+                byte = f.read(1)
+            if not byte:
+                raise ValueError(f"{path}: no start-of-frame segment")
+            marker = byte[0]
+            if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+                continue   # Markers without a length
+            length = struct.unpack('>H', f.read(2))[0]
+            if marker in SOF_MARKERS:
+                height, width = struct.unpack('>xHH', f.read(5))
+                return (height, width) if orientation in ROTATED else (width, height)
+            if marker == APP1_MARKER:
+                segment = f.read(length - 2)
+                if segment.startswith(EXIF_HEADER):   # Not an XMP APP1 that follows it
+                    orientation = exif_orientation(segment)
+                continue
+            f.seek(length - 2, 1)
+
+
+def source_hash(path):
+    """Hash of an image's bytes and the settings its variants are made with"""
+    digest = hashlib.sha1(repr((WIDTHS, FORMATS, QUALITY)).encode('utf-8'))
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def require_pillow():
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        raise SystemExit("responsive_images.py needs Pillow: pip install -r requirements-build.txt") from None
+
+
+def target_widths(width):
+    """Variant widths for a source image: every WIDTHS entry it is wider than, plus its own width up to the largest"""
+    widths = [w for w in WIDTHS if w < width]
+    widths.append(min(width, WIDTHS[-1]))
+    return sorted(set(widths))
+
+
+def render_variants(job):
+    """
+    Worker: resize one image to every target width and format.
+    Returns (source, {extension: [[width, path], ...]}).
+    """
+    from PIL import Image, ImageOps
+
+    source, out_dir = job
+    stem = os.path.splitext(os.path.basename(source))[0]
+    variants = {ext: [] for ext, _ in FORMATS}
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        for width in target_widths(image.width):
+            height = round(image.height * width / image.width)
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for ext, fmt in FORMATS:
+                path = os.path.join(out_dir, f"{stem}-{width}w.{ext}")
+                if fmt == 'JPEG':
+                    resized.save(path, fmt, quality=QUALITY, optimize=True, progressive=True)
+                else:
+                    resized.save(path, fmt, quality=QUALITY, method=6)
+                variants[ext].append([width, path.replace(os.sep, '/')])
+    return source, variants
+
+
+def load_manifest(path=MANIFEST):
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def _up_to_date(entry, digest):
+    return (entry and entry.get('hash') == digest and entry.get('variants')
+            and all(os.path.exists(p) for paths in entry['variants'].values() for _, p in paths))
+
+
+def build_variants(source_dir=SOURCE_DIR, out_dir=OUTPUT_DIR, workers=None):
+    """
+    Bring the manifest up to date with source_dir, resizing changed images in a process pool.
+    Returns (manifest, number of images resized).
+    """
+    require_pillow()
+    manifest_path = os.path.join(out_dir, 'manifest.json')
+    previous = load_manifest(manifest_path)
+    manifest = {}
+    jobs = []
+    for source in sorted(glob.glob(os.path.join(source_dir, '*.jp*g'))):
+        key = source.replace(os.sep, '/')
+        digest = source_hash(source)
+        width, height = jpeg_size(source)
+        entry = previous.get(key)
+        if _up_to_date(entry, digest):
+            manifest[key] = dict(entry, width=width, height=height)   # Sizes from before orientation was read
+            continue
+        manifest[key] = {'hash': digest, 'width': width, 'height': height, 'variants': {}}
+        jobs.append((source, out_dir))
+
+    if jobs:
+        os.makedirs(out_dir, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for source, variants in pool.map(render_variants, jobs):
+                manifest[source.replace(os.sep, '/')]['variants'] = variants
+
+    if manifest != previous:
+        os.makedirs(out_dir, exist_ok=True)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest, len(jobs)
+
+
+def _attr(tag, name):
+    match = re.search(rf'\s{name}="([^"]*)"', tag)
+    return match.group(1) if match else None
+
+
+def _set_attr(tag, name, value):
+    if _attr(tag, name) is not None:
+        return re.sub(rf'(\s{name}=")[^"]*(")', lambda m: m.group(1) + value + m.group(2), tag, count=1)
+    end = len(tag) - (2 if tag.endswith('/>') else 1)
+    return f'{tag[:end].rstrip()} {name}="{value}"{tag[end:]}'
+
+
+def _sizes(tag):
+    """sizes attribute from the image's CSS max-width, or the card grid default"""
+    match = re.search(r'max-width:\s*(\d+)px', _attr(tag, 'style') or '')
+    if match:
+        return f"(max-width: {match.group(1)}px) 100vw, {match.group(1)}px"
+    return DEFAULT_SIZES
+
+
+def _srcset(paths, page_dir):
+    return ', '.join(f"{os.path.relpath(p, page_dir or '.').replace(os.sep, '/')} {w}w" for w, p in paths)
+
+
+def rewrite_img_tags(markup, manifest, page_dir=''):
+    """
+    Add width/height to <img> tags for images in the manifest and, where variants exist,
+    wrap them in a <picture> with a WebP source and a JPEG srcset.
+    Tags that already have a srcset are left alone.
+    """
+    def rewrite(match):
+        tag = match.group(0)
+        src = _attr(tag, 'src')
+        if not src or '://' in src or _attr(tag, 'srcset') is not None:
+            return tag
+        entry = manifest.get(os.path.normpath(os.path.join(page_dir, src)).replace(os.sep, '/'))
+        if not entry:
+            return tag
+
+        if _attr(tag, 'width') is None:
+            tag = _set_attr(tag, 'width', str(entry['width']))
+        if _attr(tag, 'height') is None:
+            tag = _set_attr(tag, 'height', str(entry['height']))
+
+        variants = entry.get('variants') or {}
+        jpegs, webps = variants.get('jpg'), variants.get('webp')
+        if not jpegs:
+            return tag
+        sizes = _sizes(tag)
+        tag = _set_attr(tag, 'src', os.path.relpath(jpegs[-1][1], page_dir or '.').replace(os.sep, '/'))
+        tag = _set_attr(tag, 'srcset', _srcset(jpegs, page_dir))
+        tag = _set_attr(tag, 'sizes', sizes)
+        if not webps:
+            return tag
+        return (f'<picture><source type="image/webp" srcset="{_srcset(webps, page_dir)}" sizes="{sizes}">'
+                f'{tag}</picture>')
+
+    return IMG_TAG.sub(rewrite, markup)
+
+
+def rewrite_pages(pages, manifest):
+    """Rewrite <img> tags in each page, returning how many pages changed"""
+    updated = 0
+    for page in pages:
+        with open(page, encoding='utf-8') as f:
+            markup = f.read()
+        rewritten = rewrite_img_tags(markup, manifest, os.path.dirname(page))
+        if rewritten != markup:
+            with open(page, 'w', encoding='utf-8') as f:
+                f.write(rewritten)
+            updated += 1
+    return updated
+
+
+def main():
+    """Build responsive image variants and point the site's pages at them"""
+    parser = argparse.ArgumentParser(description="Build responsive image variants")
+    parser.add_argument('--pages', nargs='*', default=['*.html'], help="Page globs to rewrite")
+    parser.add_argument('--workers', type=int, help="Resize processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest, resized = build_variants(workers=args.workers)
+    pages = sorted({page for pattern in args.pages for page in glob.glob(pattern)})
+    updated = rewrite_pages(pages, manifest)
+    print(f"{len(manifest)} images, {resized} resized, {updated} of {len(pages)} pages updated "
+          f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
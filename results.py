@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Compact result types for the calculators.
+Each result is a __slots__ object rather than a dict, but is also a read-only Mapping,
+so template code written against the old dicts (calculations['net'], band['tax'],
+dict(result), **result) keeps working. Results are not dicts, so json.dumps and item
+assignment need result._asdict(): a plain, nested dict copy. Batch calls return a struct-of-arrays NetPayBatch:
+one array('d') per field instead of a dict per salary.
+"""
+
+from array import array
+from collections.abc import Mapping
+
+
+class SlotsMapping(Mapping):
+    """Read-only mapping view over a class's __slots__ fields; fields can't be reassigned"""
+
+    __slots__ = ()
+    _fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # The slot descriptors' setters: __init__ is the only writer
+        cls._setters = {field: getattr(cls, field).__set__ for field in cls._fields}
+        cls._positional_setters = tuple(cls._setters.values())
+
+    def __init__(self, *values, **named):
+        for set_field, value in zip(self._positional_setters, values):
+            set_field(self, value)
+        setters = self._setters
+        for field, value in named.items():
+            if field not in setters:
+                raise TypeError(f"{type(self).__name__} has no field '{field}'")
+            setters[field](self, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{f}={getattr(self, f)!r}' for f in self._fields)})"
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, f) for f in self._fields)
+
+    def _asdict(self):
+        """Plain dict copy, with nested results (such as stamp duty bands) as dicts in lists"""
+        return {field: _plain(getattr(self, field)) for field in self._fields}
+
+
+def _plain(value):
+    if isinstance(value, SlotsMapping):
+        return value._asdict()
+    if isinstance(value, (tuple, list)):
+        return [_plain(item) for item in value]
+    return value
+
+
+class NetPayResult(SlotsMapping):
+    """Result of calculate_net_pay"""
+
+    _fields = ('gross', 'pension', 'adjusted_gross', 'tax', 'ni', 'net', 'monthly', 'weekly')
+    __slots__ = _fields
+
+
+class StampDutyBand(SlotsMapping):
+    """One band of a stamp duty breakdown"""
+
+    _fields = ('label', 'taxable_amount', 'rate', 'tax')
+    __slots__ = _fields
+
+
+class StampDutyResult(SlotsMapping):
+    """Result of calculate_stamp_duty (bands is a tuple of StampDutyBand)"""
+
+    _fields = ('property_price', 'total_stamp_duty', 'effective_rate', 'bands',
+               'is_first_time_buyer', 'is_additional_property')
+    __slots__ = _fields
+
+
+class NetPayBatch(Mapping):
+    """
+    Struct-of-arrays result for many salaries.
+    batch['net'] is the whole net pay column; batch.row(i) is a NetPayResult for one salary.
+    """
+
+    __slots__ = ('columns',)
+
+    def __init__(self, columns):
+        object.__setattr__(self, 'columns', {field: array('d', columns[field]) for field in NetPayResult._fields})
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getitem__(self, field):
+        return self.columns[field]
+
+    def __iter__(self):
+        return iter(NetPayResult._fields)
+
+    def __len__(self):
+        return len(NetPayResult._fields)
+
+    @property
+    def size(self):
+        """Number of salaries in the batch"""
+        return len(self.columns['gross'])
+
+    def row(self, i):
+        """NetPayResult for one salary"""
+        return NetPayResult(*(self.columns[field][i] for field in NetPayResult._fields))
+
+    def _asdict(self):
+        """Plain dict of lists, one per field"""
+        return {field: self.columns[field].tolist() for field in NetPayResult._fields}
+
+    def rows(self):
+        """NetPayResult for every salary, in order"""
+        return (NetPayResult(*values) for values in zip(*(self.columns[f] for f in NetPayResult._fields)))
@@ -154,14 +154,18 @@ function calculateIncomeTax(adjustedGrossSalary, taxYear, isScotland = false) {
     // Bands are defined by their gross income thresholds (assuming standard PA of £12,570)
     // We need to convert these to taxable income bands
     const standardPA = 12570;
+    // From here the allowance has fully tapered away, so gross and taxable income are
+    // the same and thresholds (the £125,140 additional rate) are already taxable income
+    const taperEnd = config.personalAllowanceLimit + 2 * standardPA;
+    const toTaxable = threshold => threshold >= taperEnd ? threshold : Math.max(0, threshold - standardPA);
     
     for (let i = 0; i < config.taxBands.length; i++) {
         const band = config.taxBands[i];
         
         // Convert gross income thresholds to taxable income thresholds
         // (using standard PA, not the individual's PA)
-        const bandStartTaxable = Math.max(0, band.threshold - standardPA);
-        const bandEndTaxable = band.limit === Infinity ? Infinity : band.limit - standardPA;
+        const bandStartTaxable = toTaxable(band.threshold);
+        const bandEndTaxable = band.limit === Infinity ? Infinity : toTaxable(band.limit);
         
         // Check if any of the taxable income falls in this band
         if (taxableIncome > bandStartTaxable) {
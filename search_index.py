@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Static site search index.
+Tokenizes every page's title, headings, description and body text into an inverted
+index: a sorted term dictionary with delta-encoded posting lists, split into small JSON
+shards by term prefix so the browser only fetches the shards a query needs (see
+site-search.js). Pages are only re-tokenized when their content hash changes.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from html.parser import HTMLParser
+
+from site_files import site_pages
+
+OUTPUT_DIR = 'search'
+CACHE_FILE = os.path.join('.build-cache', 'search', 'pages.json')
+PREFIX_LENGTH = 2
+INDEX_VERSION = 1
+
+# Score for each occurrence of a term, by where it appears
+FIELD_WEIGHTS = {'title': 5, 'heading': 3, 'description': 2, 'body': 1}
+
+# Elements whose text isn't page content (the nav and footer are the same on every page)
+SKIPPED_TAGS = {'script', 'style', 'noscript', 'nav', 'footer', 'svg', 'template', 'select'}
+HEADING_TAGS = {'h1', 'h2', 'h3'}
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do for from has have how i if in into is it its me my no
+not of on or our so than that the their them then there these they this to up us was we
+what when where which who will with you your
+""".split())
+
+TOKEN = re.compile(r'[a-z0-9]+')
+THOUSANDS = re.compile(r'(?<=\d),(?=\d{3})')
+
+
+def tokenize(text):
+    """Lower-case search terms in text: '£30,000 salary' -> ['30000', 'salary']"""
+    text = THOUSANDS.sub('', text.lower())
+    return [t for t in TOKEN.findall(text) if len(t) > 1 and t not in STOPWORDS]
+
+
+class PageText(HTMLParser):
+    """
+    Collects the title, headings, meta description and body text of a page.
+    Elements marked data-nosearch (e.g. the related links block) are left out.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.fields = {field: [] for field in FIELD_WEIGHTS}
+        self._skip = 0
+        self._field = 'body'
+        self._nosearch_tag = None
+        self._nosearch_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._nosearch_tag:
+            if tag == self._nosearch_tag:
+                self._nosearch_depth += 1
+            return
+        if any(name == 'data-nosearch' for name, _ in attrs):
+            self._nosearch_tag = tag
+            self._nosearch_depth = 1
+        elif tag in SKIPPED_TAGS:
+            self._skip += 1
+        elif tag == 'title':
+            self._field = 'title'
+        elif tag in HEADING_TAGS:
+            self._field = 'heading'
+        elif tag == 'meta':
+            attrs = dict(attrs)
+            if attrs.get('name') == 'description':
+                self.fields['description'].append(attrs.get('content') or '')
+
+    def handle_endtag(self, tag):
+        if self._nosearch_tag:
+            if tag == self._nosearch_tag:
+                self._nosearch_depth -= 1
+                if not self._nosearch_depth:
+                    self._nosearch_tag = None
+            return
+        if tag in SKIPPED_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == 'title' or tag in HEADING_TAGS:
+            self._field = 'body'
+
+    def handle_data(self, data):
+        if not self._skip and not self._nosearch_tag:
+            self.fields[self._field].append(data)
+
+
+def index_page(path):
+    """(title, {term: score}) for one page"""
+    parser = PageText()
+    with open(path, encoding='utf-8') as f:
+        parser.feed(f.read())
+    parser.close()
+
+    scores = defaultdict(int)
+    for field, chunks in parser.fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for term in tokenize(' '.join(chunks)):
+            scores[term] += weight
+    title = ' '.join(' '.join(parser.fields['title']).split())
+    return title, dict(scores)
+
+
+def content_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:16]
+
+
+def load_cache(path=CACHE_FILE):
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == INDEX_VERSION:
+            return cache['pages']
+    return {}
+
+
+def save_cache(entries, path=CACHE_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'version': INDEX_VERSION, 'pages': entries}, separators=(',', ':')))
+
+
+def update_pages(pages, cache, root='.'):
+    """
+    Bring the per-page term cache up to date, re-tokenizing only changed pages.
+    Entries are keyed by the page's '/'-separated path relative to root.
+    Returns (entries by page, number of pages re-indexed).
+    """
+    entries = {}
+    reindexed = 0
+    for page in pages:
+        key = os.path.relpath(page, root).replace(os.sep, '/')
+        digest = content_hash(page)
+        entry = cache.get(key)
+        if not entry or entry['hash'] != digest:
+            title, terms = index_page(page)
+            entry = {'hash': digest, 'title': title, 'terms': terms}
+            reindexed += 1
+        entries[key] = entry
+    return entries, reindexed
+
+
+def build_postings(entries):
+    """
+    Documents and the inverted index: (docs, {term: [doc delta, score, doc delta, score, ...]}).
+    Document ids are positions in the sorted page list; each posting list is in id order,
+    storing the gap from the previous id.
+    """
+    docs = sorted(entries)
+    postings = defaultdict(list)
+    last = {}
+    for doc_id, page in enumerate(docs):
+        for term, score in entries[page]['terms'].items():
+            postings[term].extend((doc_id - last.get(term, 0), score))
+            last[term] = doc_id
+    return [[page, entries[page]['title']] for page in docs], postings
+
+
+def shard_key(term, prefix_length=PREFIX_LENGTH):
+    return term[:prefix_length]
+
+
+def build_shards(postings, prefix_length=PREFIX_LENGTH):
+    """{prefix: {'terms': [...sorted], 'postings': [...]}}"""
+    shards = defaultdict(lambda: {'terms': [], 'postings': []})
+    for term in sorted(postings):
+        shard = shards[shard_key(term, prefix_length)]
+        shard['terms'].append(term)
+        shard['postings'].append(postings[term])
+    return dict(shards)
+
+
+def _write_if_changed(path, payload):
+    text = json.dumps(payload, separators=(',', ':'))
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return True
+
+
+def write_index(docs, shards, out_dir=OUTPUT_DIR, prefix_length=PREFIX_LENGTH):
+    """Write docs.json, one terms-<prefix>.json per shard and manifest.json, removing stale shards"""
+    os.makedirs(out_dir, exist_ok=True)
+    written = 0
+    files = {}
+    for prefix, shard in shards.items():
+        name = f"terms-{prefix}.json"
+        files[prefix] = name
+        written += _write_if_changed(os.path.join(out_dir, name), shard)
+    for name in os.listdir(out_dir):
+        if name.startswith('terms-') and name not in files.values():
+            os.remove(os.path.join(out_dir, name))
+
+    written += _write_if_changed(os.path.join(out_dir, 'docs.json'), docs)
+    written += _write_if_changed(os.path.join(out_dir, 'manifest.json'), {
+        'version': INDEX_VERSION,
+        'prefix_length': prefix_length,
+        'docs': len(docs),
+        'shards': files
+    })
+    return written
+
+
+def build(out_dir=OUTPUT_DIR, cache_file=CACHE_FILE, prefix_length=PREFIX_LENGTH):
+    """Incrementally rebuild the search index for the whole site"""
+    entries, reindexed = update_pages(site_pages(), load_cache(cache_file))
+    docs, postings = build_postings(entries)
+    shards = build_shards(postings, prefix_length)
+    written = write_index(docs, shards, out_dir, prefix_length)
+    save_cache(entries, cache_file)
+    return {'pages': len(docs), 'reindexed': reindexed, 'terms': len(postings),
+            'shards': len(shards), 'files_written': written}
+
+
+def main():
+    """Build the site search index"""
+    parser = argparse.ArgumentParser(description="Build the static site search index")
+    parser.add_argument('--out', default=OUTPUT_DIR)
+    parser.add_argument('--prefix-length', type=int, default=PREFIX_LENGTH, help="Characters of term prefix per shard")
+    parser.add_argument('--full', action='store_true', help="Re-index every page, ignoring the cache")
+    args = parser.parse_args()
+
+    if args.full and os.path.exists(CACHE_FILE):
+        os.remove(CACHE_FILE)
+    start = time.perf_counter()
+    stats = build(args.out, prefix_length=args.prefix_length)
+    print(f"{stats['pages']} pages ({stats['reindexed']} re-indexed), {stats['terms']:,} terms in "
+          f"{stats['shards']} shards, {stats['files_written']} files written in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Self-employment profit engine.
+Works out income tax plus Class 4 National Insurance on trading profit, and the real
+saving from claiming expenses, by evaluating the compiled schedules before and after
+the expenses are deducted. Whole grids of profits x expense totals are evaluated in
+one batch so each expense category page can show a savings table by income band.
+The savings estimator in expenses.js evaluates the same combined schedule, written into
+the script by update_savings_script().
+"""
+
+import json
+import re
+from functools import lru_cache
+
+from tax_schedules import DEFAULT_TAX_YEAR, class4_ni_schedule, income_tax_schedule
+
+# Representative profits for the savings table on the expense category pages
+PROFIT_BANDS = [
+    ('Basic rate', 25000),
+    ('Basic rate', 40000),
+    ('Higher rate', 60000),
+    ('Higher rate', 90000),
+    ('Allowance taper (60% band)', 110000),
+    ('Additional rate', 150000)
+]
+
+# Profit used for the single "at the basic rate" figure in each worked example
+BASIC_RATE_PROFIT = 35000
+
+# The script whose savings estimator evaluates profit_tax_schedule() in the browser
+SAVINGS_SCRIPT = 'expenses.js'
+SCHEDULE_BLOCK = re.compile(r'(/\* profit-tax-schedule:start \*/).*?(/\* profit-tax-schedule:end \*/)', re.S)
+
+
+@lru_cache(maxsize=None)
+def profit_tax_schedule(tax_year=DEFAULT_TAX_YEAR):
+    """Income tax plus Class 4 NI on a trading profit, as one compiled schedule"""
+    return income_tax_schedule(tax_year) + class4_ni_schedule(tax_year)
+
+
+def profit_tax(profit, tax_year=DEFAULT_TAX_YEAR):
+    """Income tax and Class 4 NI on one trading profit"""
+    tax = income_tax_schedule(tax_year)(profit)
+    ni = class4_ni_schedule(tax_year)(profit)
+    return {
+        'profit': profit,
+        'income_tax': round(tax, 2),
+        'class4_ni': round(ni, 2),
+        'total': round(tax + ni, 2),
+        'take_home': round(profit - tax - ni, 2)
+    }
+
+
+def expense_savings(profits, expense_totals, tax_year=DEFAULT_TAX_YEAR):
+    """
+    Tax and NI saved by claiming each expense total at each profit level.
+    Returns a dict of row-per-profit, column-per-expense matrices for
+    income_tax, class4_ni and total savings.
+    """
+    tax_schedule = income_tax_schedule(tax_year)
+    ni_schedule = class4_ni_schedule(tax_year)
+    profits = list(profits)
+    expense_totals = list(expense_totals)
+
+    # Evaluate every "before" and "after" profit in two flat batches
+    after = [max(0, p - e) for p in profits for e in expense_totals]
+    tax_before = tax_schedule.batch(profits)
+    ni_before = ni_schedule.batch(profits)
+    tax_after = tax_schedule.batch(after)
+    ni_after = ni_schedule.batch(after)
+
+    width = len(expense_totals)
+    tax_saved = []
+    ni_saved = []
+    total_saved = []
+    for i in range(len(profits)):
+        row = slice(i * width, (i + 1) * width)
+        tax_row = [round(tax_before[i] - t, 2) for t in tax_after[row]]
+        ni_row = [round(ni_before[i] - n, 2) for n in ni_after[row]]
+        tax_saved.append(tax_row)
+        ni_saved.append(ni_row)
+        total_saved.append([round(t + n, 2) for t, n in zip(tax_row, ni_row)])
+
+    return {
+        'profits': profits,
+        'expense_totals': expense_totals,
+        'income_tax': tax_saved,
+        'class4_ni': ni_saved,
+        'total': total_saved
+    }
+
+
+def savings_table(expense_total, tax_year=DEFAULT_TAX_YEAR, bands=PROFIT_BANDS):
+    """Rows for an expense page: the saving from one expense total at each income band"""
+    savings = expense_savings([profit for _, profit in bands], [expense_total], tax_year)
+
+    rows = []
+    for i, (label, profit) in enumerate(bands):
+        total = savings['total'][i][0]
+        rows.append({
+            'band': label,
+            'profit': profit,
+            'income_tax': savings['income_tax'][i][0],
+            'class4_ni': savings['class4_ni'][i][0],
+            'total': total,
+            'relief_rate': round(total / expense_total * 100, 1) if expense_total else 0
+        })
+    return rows
+
+
+def basic_rate_saving(expense_total, tax_year=DEFAULT_TAX_YEAR):
+    """Income tax saved by a basic-rate sole trader claiming the expense total"""
+    return expense_savings([BASIC_RATE_PROFIT], [expense_total], tax_year)['income_tax'][0][0]
+
+
+def update_savings_script(path=SAVINGS_SCRIPT, tax_year=DEFAULT_TAX_YEAR):
+    """
+    Write profit_tax_schedule() into the script's profit-tax-schedule block, so the
+    estimator cannot drift from the pages. Returns whether the script changed.
+    """
+    schedule = profit_tax_schedule(tax_year)
+    data = {
+        'taxYear': tax_year,
+        'breakpoints': [round(b, 6) for b in schedule.breakpoints],
+        'values': [round(v, 6) for v in schedule.values],
+        'slopes': [round(s, 6) for s in schedule.slopes]
+    }
+    line = f"var PROFIT_TAX_SCHEDULE = {json.dumps(data, separators=(',', ':'))};"
+
+    with open(path, encoding='utf-8') as f:
+        script = f.read()
+    if not SCHEDULE_BLOCK.search(script):
+        raise ValueError(f"{path}: no profit-tax-schedule block")
+    updated = SCHEDULE_BLOCK.sub(lambda m: f"{m.group(1)}\n{line}\n{m.group(2)}", script, count=1)
+    if updated == script:
+        return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(updated)
+    return True
+
+
+def main():
+    """Print the savings table for a sample expense total"""
+    expense_total = 2000
+    print(f"Tax and NI saved by claiming £{expense_total:,} of expenses ({DEFAULT_TAX_YEAR})")
+    print("=" * 60)
+    for row in savings_table(expense_total):
+        print(f"{row['band']:<28} £{row['profit']:>7,}: £{row['total']:,.2f} ({row['relief_rate']}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+// Site search over the static index built by search_index.py
+// Only the manifest, the shards for the query's term prefixes and the document list are fetched.
+(function() {
+    const SEARCH_ROOT = '/search/';
+    const STOPWORDS = new Set(('a an and are as at be but by can do for from has have how i if in into is it its me my no ' +
+        'not of on or our so than that the their them then there these they this to up us was we ' +
+        'what when where which who will with you your').split(' '));
+
+    const cache = {};
+
+    function fetchJson(name) {
+        if (!cache[name]) {
+            cache[name] = fetch(SEARCH_ROOT + name).then(response => {
+                if (!response.ok) throw new Error('Search index unavailable: ' + name);
+                return response.json();
+            });
+        }
+        return cache[name];
+    }
+
+    // Same rules as tokenize() in search_index.py
+    function tokenize(text) {
+        const cleaned = text.toLowerCase().replace(/(\d),(?=\d{3})/g, '$1');
+        return (cleaned.match(/[a-z0-9]+/g) || []).filter(t => t.length > 1 && !STOPWORDS.has(t));
+    }
+
+    // Posting lists are [doc gap, score, doc gap, score, ...]
+    function decode(postings, scores) {
+        let doc = 0;
+        for (let i = 0; i < postings.length; i += 2) {
+            doc += postings[i];
+            scores.set(doc, (scores.get(doc) || 0) + postings[i + 1]);
+        }
+    }
+
+    function lowerBound(terms, term) {
+        let lo = 0;
+        let hi = terms.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (terms[mid] < term) lo = mid + 1; else hi = mid;
+        }
+        return lo;
+    }
+
+    // Scores by document for one term; the last term of a query also matches as a prefix
+    async function termScores(manifest, term, asPrefix) {
+        const scores = new Map();
+        const shardName = manifest.shards[term.slice(0, manifest.prefix_length)];
+        if (!shardName) return scores;
+        const shard = await fetchJson(shardName);
+        for (let i = lowerBound(shard.terms, term); i < shard.terms.length; i++) {
+            const candidate = shard.terms[i];
+            if (candidate === term || (asPrefix && candidate.startsWith(term))) {
+                decode(shard.postings[i], scores);
+            } else {
+                break;
+            }
+        }
+        return scores;
+    }
+
+    // Pages containing every term of the query, best first: [{url, title, score}]
+    async function siteSearch(query, limit = 10) {
+        const terms = tokenize(query);
+        if (!terms.length) return [];
+        const manifest = await fetchJson('manifest.json');
+        const perTerm = await Promise.all(terms.map((term, i) => termScores(manifest, term, i === terms.length - 1)));
+
+        let totals = perTerm[0];
+        for (const scores of perTerm.slice(1)) {
+            const next = new Map();
+            totals.forEach((score, doc) => {
+                if (scores.has(doc)) next.set(doc, score + scores.get(doc));
+            });
+            totals = next;
+        }
+        if (!totals.size) return [];
+
+        const docs = await fetchJson('docs.json');
+        return Array.from(totals.entries())
+            .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+            .slice(0, limit)
+            .map(([doc, score]) => ({ url: '/' + docs[doc][0], title: docs[doc][1], score: score }));
+    }
+
+    window.siteSearch = siteSearch;
+})();
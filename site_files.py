@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Which files make up the published site.
+Render publishes the git tree: everything not matched by .gitignore. The site itself is
+that minus the build's own sources (generators, Markdown posts and docs) and the
+directories that belong to other projects. The page checkers, the search index and the
+deploy bundler all walk the tree through here, so they agree on what's published.
+"""
+
+import fnmatch
+import os
+
+# Never published, at any depth
+ALWAYS_EXCLUDED = {'.git'}
+
+# Directories that aren't part of the static site
+EXCLUDE_DIRS = {'.git', 'node_modules', 'quidwise-pro', 'exports', '.build-cache'}
+
+# Files in the tree that build the site rather than being served by it
+SOURCE_SUFFIXES = ('.py', '.md', '.jsonl', '.patch')
+SOURCE_FILES = {'.gitignore', 'requirements-build.txt'}
+
+
+def ignore_patterns(root='.'):
+    """The .gitignore patterns as (pattern, anchored to root, directories only)"""
+    path = os.path.join(root, '.gitignore')
+    if not os.path.exists(path):
+        return []
+    patterns = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith(('#', '!')):
+                continue
+            patterns.append((line.strip('/'), line.startswith('/'), line.endswith('/')))
+    return patterns
+
+
+def is_ignored(path, is_dir, patterns):
+    name = path.rsplit('/', 1)[-1]
+    for pattern, anchored, dir_only in patterns:
+        if dir_only and not is_dir:
+            continue
+        if fnmatch.fnmatchcase(path if anchored or '/' in pattern else name, pattern):
+            return True
+    return False
+
+
+def published_files(root='.', excluded=ALWAYS_EXCLUDED):
+    """(path, stat) for every file that gets deployed, paths relative to root with '/'"""
+    patterns = ignore_patterns(root)
+    stack = ['']
+    while stack:
+        prefix = stack.pop()
+        with os.scandir(os.path.join(root, prefix) if prefix else root) as entries:
+            for entry in entries:
+                path = f"{prefix}{entry.name}"
+                if entry.name in excluded:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if not is_ignored(path, True, patterns):
+                        stack.append(f"{path}/")
+                elif entry.is_file() and not is_ignored(path, False, patterns):
+                    yield path, entry.stat()
+
+
+def is_source(path):
+    return path.endswith(SOURCE_SUFFIXES) or path.rsplit('/', 1)[-1] in SOURCE_FILES
+
+
+def site_files(root='.'):
+    """Every file the site serves, as sorted '/'-separated paths relative to root"""
+    return sorted(path for path, _ in published_files(root, EXCLUDE_DIRS) if not is_source(path))
+
+
+def site_pages(root='.'):
+    """Every HTML page of the site, as paths under root"""
+    return [os.path.join(root, *path.split('/')) for path in site_files(root) if path.endswith('.html')]
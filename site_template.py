@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Shared page template.
+The document shell every templated page is rendered into: the analytics snippet, the
+common <head> tags, the site navigation, the footer and the scripts. Pages pass in their
+own <head> tags and <body> content; links are relative to the site root, so pages must
+live at the top level. The generated pages and the hand-written posts take their
+navigation from nav(), so the menu is edited here and nowhere else.
+"""
+
+import re
+
+ANALYTICS = """    <!-- Google tag (gtag.js) -->
+    <script async src="https://www.googletagmanager.com/gtag/js?id=G-W8KXMNYDCS"></script>
+    <script>
+      window.dataLayer = window.dataLayer || [];
+      function gtag(){dataLayer.push(arguments);}
+      gtag('js', new Date());
+      gtag('config', 'G-W8KXMNYDCS');
+    </script>
+"""
+
+STYLESHEETS = (
+    'styles.css',
+    'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css',
+)
+
+SCRIPTS = ('navigation.js',)
+
+NAV_TEMPLATE = """    <!-- Navigation -->
+    <nav class="main-nav">
+        <div class="nav-container">
+            <a href="{root}index.html" class="logo-link">
+                <div class="quidwise-logo">
+                    <img src="{root}logo.svg" alt="QuidWise Logo" class="logo-image">
+                    <div class="logo-text-container">
+                        <span class="logo-text">QuidWise</span>
+                        <span class="logo-tagline">Make your pay go further</span>
+                    </div>
+                </div>
+            </a>
+
+            <ul class="nav-menu">
+                <li class="nav-item dropdown">
+                    <a href="#" class="nav-link">
+                        Tax & Budgeting <i class="fas fa-chevron-down"></i>
+                    </a>
+                    <ul class="dropdown-menu">
+                        <li><a href="{root}income-tax-calculator.html">Income Tax Calculator</a></li>
+                        <li><a href="{root}budget-planner.html">Budget Planner</a></li>
+                        <li><a href="{root}expenses.html">Allowable Expenses Guide</a></li>
+                    </ul>
+                </li>
+
+                <li class="nav-item dropdown">
+                    <a href="#" class="nav-link">
+                        Mortgages & Property <i class="fas fa-chevron-down"></i>
+                    </a>
+                    <ul class="dropdown-menu">
+                        <li><a href="{root}mortgage-calculator.html">Mortgage Calculator</a></li>
+                        <li><a href="{root}mortgage-affordability.html">Mortgage Affordability</a></li>
+                        <li><a href="{root}stamp-duty-calculator.html">Stamp Duty Calculator</a></li>
+                        <li><a href="{root}find-mortgage-deals.html">Mortgage Rate Comparison</a></li>
+                        <li><a href="{root}mortgage-overpayment.html">Mortgage Overpayment Calculator</a></li>
+                        <li><a href="{root}buy-or-rent.html">Buy vs Rent Estimate</a></li>
+                    </ul>
+                </li>
+
+                <li class="nav-item">
+                    <a href="{root}blogs.html" class="nav-link">Blog</a>
+                </li>
+            </ul>
+
+            <button class="mobile-menu-toggle" aria-label="Toggle menu">
+                <span></span>
+                <span></span>
+                <span></span>
+            </button>
+        </div>
+    </nav>"""
+
+FOOTER = """<footer>
+        <div class="footer-content">
+            <p style="font-size: 0.85rem; opacity: 0.7; margin-bottom: 0.5rem;">
+                © 2025 QuidWise. All rights reserved..
+            </p>
+            <p style="font-size: 0.75rem; opacity: 0.6; line-height: 1.5; margin-top: 0.5rem;">
+                We aim to provide calculators and guides, but can't guarantee perfection. Use this information at your own risk. This is not financial advice—always research for your specific circumstances. While we link to other sites, we're not responsible for their content. Product prices and terms can change after publication, so always verify directly with providers. We can't investigate every company's financial stability, and there's always a risk of business failure.
+            </p>
+        </div>
+    </footer>"""
+
+# A page's navigation, with the comment before it if there is one
+NAV_BLOCK = re.compile(r'[ \t]*(?:<!-- Navigation -->\s*)?<nav class="main-nav">.*?</nav>', re.S)
+
+
+def nav(root=''):
+    """The site navigation; `root` is the path from the page to the site root ('../' one level down)"""
+    return NAV_TEMPLATE.format(root=root)
+
+
+def replace_nav(markup, root=''):
+    """A hand-written page with its navigation swapped for the shared one"""
+    return NAV_BLOCK.sub(lambda m: nav(root), markup, count=1)
+
+
+def page(head, body):
+    """
+    A complete HTML document. `head` is the page's own <head> markup (indented, without
+    a trailing newline); `body` is everything between the navigation and the footer.
+    """
+    stylesheets = ''.join(f'    <link rel="stylesheet" href="{href}">\n' for href in STYLESHEETS)
+    scripts = ''.join(f'    <script src="{src}"></script>\n' for src in SCRIPTS)
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+{ANALYTICS}<meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+{head}
+
+{stylesheets}</head>
+<body>
+{nav()}
+
+{body}
+{FOOTER}
+
+{scripts}</body>
+</html>
+"""
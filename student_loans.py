@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Lifetime student loan simulator.
+Projects balances year by year for Plan 1, 2, 4, 5 and Postgraduate loans with
+interest, salary growth and plan write-off dates. Scenarios are held as columns and
+stepped forward a year at a time together, so grids of 100k+ salary x growth x balance
+combinations run in a few seconds.
+"""
+
+import argparse
+import time
+from itertools import product
+
+# Repayment thresholds and rates match STUDENT_LOAN_CONFIG in script.js.
+# Interest is RPI-based; Plan 2 adds up to 3% more as income rises between its
+# interest thresholds, Postgraduate loans always add 3%.
+RPI = 0.032
+
+STUDENT_LOAN_PLANS = {
+    'plan1': {
+        'name': 'Plan 1',
+        'threshold': 22015,
+        'rate': 0.09,
+        'interest_premium': 0.0,
+        'write_off_years': 25
+    },
+    'plan2': {
+        'name': 'Plan 2',
+        'threshold': 27295,
+        'rate': 0.09,
+        'interest_premium': 0.03,
+        'interest_upper_threshold': 49130,   # Full RPI + 3% from here
+        'write_off_years': 30
+    },
+    'plan4': {
+        'name': 'Plan 4',
+        'threshold': 25000,
+        'rate': 0.09,
+        'interest_premium': 0.0,
+        'write_off_years': 30
+    },
+    'plan5': {
+        'name': 'Plan 5',
+        'threshold': 25000,
+        'rate': 0.09,
+        'interest_premium': 0.0,
+        'write_off_years': 40
+    },
+    'postgrad': {
+        'name': 'Postgraduate',
+        'threshold': 21000,
+        'rate': 0.06,
+        'interest_premium': 0.03,
+        'write_off_years': 30
+    }
+}
+
+
+def interest_rate(plan, salary, rpi=RPI):
+    """Annual interest rate for a plan at a salary"""
+    config = STUDENT_LOAN_PLANS[plan]
+    upper = config.get('interest_upper_threshold')
+    if upper is None:
+        return rpi + config['interest_premium']
+    lower = config['threshold']
+    share = min(1.0, max(0.0, (salary - lower) / (upper - lower)))
+    return rpi + config['interest_premium'] * share
+
+
+def simulate(plans, salaries, growth_rates, balances, rpi=RPI, threshold_growth=0.0, history=False):
+    """
+    Simulate many loans at once.
+    plans, salaries, growth_rates and balances are equal-length sequences, one entry per
+    scenario. Repayments start in year 1 on the starting salary. Returns columns of
+    total_repaid, interest_charged (all the interest added to the balance), written_off,
+    paid_off_year (None if written off), write_off_year (None if paid off), interest_cost
+    (what the borrower paid above the starting balance: the interest charged for a loan
+    that is paid off, never below 0 for one written off first) and, with history=True,
+    each scenario's year-end balances.
+    """
+    n = len(plans)
+    configs = [STUDENT_LOAN_PLANS[plan] for plan in plans]
+    thresholds = [c['threshold'] for c in configs]
+    rates = [c['rate'] for c in configs]
+    terms = [c['write_off_years'] for c in configs]
+    premiums = [c['interest_premium'] for c in configs]
+    upper = [c.get('interest_upper_threshold') for c in configs]
+
+    salary = [float(s) for s in salaries]
+    growth = [1 + g for g in growth_rates]
+    balance = [float(b) for b in balances]
+    repaid = [0.0] * n
+    interest_charged = [0.0] * n
+    paid_off_year = [None] * n
+    balances_by_year = [[b] for b in balance] if history else None
+
+    active = [i for i in range(n) if balance[i] > 0]
+    threshold_factor = 1.0
+    year = 0
+    while active:
+        year += 1
+        still_active = []
+        for i in active:
+            if year > terms[i]:
+                continue
+            threshold = thresholds[i] * threshold_factor
+            s = salary[i]
+            b = balance[i]
+
+            # Interest on the opening balance, Plan 2 tapering with income
+            if upper[i] is None:
+                rate = rpi + premiums[i]
+            else:
+                top = upper[i] * threshold_factor
+                share = (s - threshold) / (top - threshold)
+                rate = rpi + premiums[i] * (0.0 if share < 0 else 1.0 if share > 1 else share)
+            interest = b * rate
+            b += interest
+            interest_charged[i] += interest
+
+            payment = (s - threshold) * rates[i] if s > threshold else 0.0
+            if payment >= b:
+                payment = b
+                paid_off_year[i] = year
+            b -= payment
+            repaid[i] += payment
+            balance[i] = b
+            salary[i] = s * growth[i]
+
+            if history:
+                balances_by_year[i].append(round(b, 2))
+            if b > 0:
+                still_active.append(i)
+        active = still_active
+        threshold_factor *= 1 + threshold_growth
+
+    written_off = [round(b, 2) if paid_off_year[i] is None else 0.0 for i, b in enumerate(balance)]
+    result = {
+        'plan': list(plans),
+        'total_repaid': [round(r, 2) for r in repaid],
+        'interest_charged': [round(x, 2) for x in interest_charged],
+        'written_off': written_off,
+        'paid_off_year': paid_off_year,
+        'write_off_year': [terms[i] if paid_off_year[i] is None and balances[i] > 0 else None for i in range(n)],
+        'interest_cost': [round(max(0.0, r - b), 2) for r, b in zip(repaid, balances)]
+    }
+    if history:
+        result['balances'] = balances_by_year
+    return result
+
+
+def simulate_grid(plans, salaries, growth_rates, balances, **options):
+    """Simulate every combination of plan, starting salary, growth rate and balance"""
+    grid = list(product(plans, salaries, growth_rates, balances))
+    columns = list(zip(*grid)) if grid else [(), (), (), ()]
+    result = simulate(*columns, **options)
+    result.update({
+        'salary': list(columns[1]),
+        'growth_rate': list(columns[2]),
+        'balance': list(columns[3])
+    })
+    return result
+
+
+def main():
+    """Summarise lifetime repayments for a grid of graduates"""
+    parser = argparse.ArgumentParser(description="Simulate lifetime student loan repayments")
+    parser.add_argument('--plan', default='plan2', choices=sorted(STUDENT_LOAN_PLANS))
+    parser.add_argument('--balance', type=float, default=45000, help="Starting balance")
+    parser.add_argument('--growth', type=float, default=0.03, help="Annual salary growth")
+    parser.add_argument('--grid', action='store_true', help="Time a 100k+ scenario grid across every plan")
+    args = parser.parse_args()
+
+    if args.grid:
+        start = time.perf_counter()
+        result = simulate_grid(
+            sorted(STUDENT_LOAN_PLANS),
+            range(18000, 100001, 2000),
+            [g / 1000 for g in range(0, 61, 5)],
+            range(10000, 100001, 2500)
+        )
+        written_off = sum(1 for year in result['write_off_year'] if year)
+        print(f"{len(result['plan']):,} scenarios in {time.perf_counter() - start:.2f}s "
+              f"({written_off:,} written off)")
+        return
+
+    name = STUDENT_LOAN_PLANS[args.plan]['name']
+    print(f"{name}: £{args.balance:,.0f} balance, {args.growth:.1%} salary growth")
+    print("=" * 60)
+    salaries = list(range(25000, 100001, 5000))
+    result = simulate([args.plan] * len(salaries), salaries, [args.growth] * len(salaries),
+                      [args.balance] * len(salaries))
+    for i, salary in enumerate(salaries):
+        if result['paid_off_year'][i]:
+            outcome = f"paid off in year {result['paid_off_year'][i]}"
+        else:
+            outcome = f"£{result['written_off'][i]:,.0f} written off in year {result['write_off_year'][i]}"
+        print(f"£{salary:>7,}: repay £{result['total_repaid'][i]:>9,.0f}, {outcome}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Static inline SVG charts for generated pages.
+Renders the tax/NI/net split, band breakdowns and mortgage amortization curves at build
+time, so pages don't need Chart.js to show them. Each chart is cached by a hash of the
+values it is drawn from: identical charts on different pages are only rendered once.
+"""
+
+import hashlib
+import html
+import json
+
+# Palette from the :root variables in styles.css
+COLOURS = {
+    'net': '#1a6b5c',       # --primary-color
+    'tax': '#dc3545',       # --danger-color
+    'ni': '#e67e22',
+    'pension': '#2a8b7c',   # --primary-light
+    'band': '#2a8b7c',
+    'interest': '#dc3545',
+    'text': '#333333',      # --text-dark
+    'muted': '#666666',     # --text-medium
+    'grid': '#dee2e6'       # --border-color
+}
+
+FONT = "font-family=\"-apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif\""
+
+_cache = {}
+_stats = {'rendered': 0, 'reused': 0}
+
+
+def chart_key(kind, values):
+    """Stable hash of a chart's type and input values"""
+    payload = json.dumps([kind, values], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _cached(kind, values, render):
+    key = chart_key(kind, values)
+    svg = _cache.get(key)
+    if svg is None:
+        svg = render()
+        _cache[key] = svg
+        _stats['rendered'] += 1
+    else:
+        _stats['reused'] += 1
+    return svg
+
+
+def cache_stats():
+    """How many charts were rendered and how many were served from the cache"""
+    return dict(_stats, cached=len(_cache))
+
+
+def _money(amount):
+    return f"£{amount:,.0f}"
+
+
+def _svg(width, height, label, body):
+    label = html.escape(label, quote=True)
+    return (f'<svg class="static-chart" viewBox="0 0 {width} {height}" width="100%" role="img" '
+            f'aria-label="{label}" xmlns="http://www.w3.org/2000/svg" {FONT}>'
+            f'<title>{label}</title>{body}</svg>')
+
+
+def split_chart(segments, title="Where your salary goes"):
+    """
+    100% stacked bar with a legend, e.g. [('Income Tax', 4486, 'tax'), ('Take-home', 23000, 'net')].
+    The third item of each segment picks a colour from COLOURS.
+    """
+    values = [(label, round(amount, 2), colour) for label, amount, colour in segments]
+
+    def render():
+        total = sum(amount for _, amount, _ in values if amount > 0) or 1
+        width, bar_y, bar_h = 600, 10, 28
+        parts = []
+        x = 0.0
+        for label, amount, colour in values:
+            if amount <= 0:
+                continue
+            w = amount / total * width
+            parts.append(f'<rect x="{x:.1f}" y="{bar_y}" width="{w:.1f}" height="{bar_h}" fill="{COLOURS[colour]}"/>')
+            x += w
+
+        # Legend underneath, one entry per segment
+        column = width / max(1, len(values))
+        for i, (label, amount, colour) in enumerate(values):
+            lx = i * column
+            share = amount / total * 100 if amount > 0 else 0
+            parts.append(f'<rect x="{lx:.1f}" y="52" width="12" height="12" rx="2" fill="{COLOURS[colour]}"/>')
+            parts.append(f'<text x="{lx + 18:.1f}" y="62" font-size="13" fill="{COLOURS["text"]}">'
+                         f'{html.escape(label)}</text>')
+            parts.append(f'<text x="{lx + 18:.1f}" y="80" font-size="13" fill="{COLOURS["muted"]}">'
+                         f'{_money(amount)} ({share:.0f}%)</text>')
+
+        summary = ', '.join(f"{label} {_money(amount)}" for label, amount, _ in values)
+        return _svg(width, 90, f"{title}: {summary}", ''.join(parts))
+
+    return _cached('split', values, render)
+
+
+def band_chart(bands, title="Tax by band"):
+    """Horizontal bar per band: [(label, amount), ...], bars scaled to the largest amount"""
+    values = [(label, round(amount, 2)) for label, amount in bands]
+
+    def render():
+        width, label_w, row_h = 600, 230, 30
+        top = max((amount for _, amount in values), default=0) or 1
+        parts = []
+        for i, (label, amount) in enumerate(values):
+            y = i * row_h
+            w = amount / top * (width - label_w - 90)
+            parts.append(f'<text x="0" y="{y + 19}" font-size="13" fill="{COLOURS["text"]}">{html.escape(label)}</text>')
+            parts.append(f'<rect x="{label_w}" y="{y + 6}" width="{w:.1f}" height="18" rx="3" fill="{COLOURS["band"]}"/>')
+            parts.append(f'<text x="{label_w + w + 8:.1f}" y="{y + 19}" font-size="13" fill="{COLOURS["muted"]}">'
+                         f'{_money(amount)}</text>')
+
+        summary = ', '.join(f"{label} {_money(amount)}" for label, amount in values)
+        return _svg(width, max(1, len(values)) * row_h, f"{title}: {summary}", ''.join(parts))
+
+    return _cached('bands', values, render)
+
+
+def amortization_schedule(principal, annual_rate, years):
+    """Year-end balances and cumulative interest for a monthly repayment mortgage"""
+    monthly_rate = annual_rate / 12
+    months = years * 12
+    if monthly_rate:
+        payment = principal * monthly_rate / (1 - (1 + monthly_rate) ** -months)
+    else:
+        payment = principal / months
+
+    balances = [principal]
+    interest_paid = [0.0]
+    balance = principal
+    interest = 0.0
+    for month in range(1, months + 1):
+        charge = balance * monthly_rate
+        interest += charge
+        balance = max(0.0, balance + charge - payment)
+        if month % 12 == 0:
+            balances.append(balance)
+            interest_paid.append(interest)
+    return payment, balances, interest_paid
+
+
+def amortization_chart(principal, annual_rate, years, title="Mortgage balance over time"):
+    """Line chart of the outstanding balance and the cumulative interest paid, year by year"""
+    values = [round(principal, 2), round(annual_rate, 6), int(years)]
+
+    def render():
+        payment, balances, interest_paid = amortization_schedule(principal, annual_rate, years)
+        width, height, left, bottom = 600, 220, 70, 30
+        plot_w, plot_h = width - left - 10, height - bottom - 10
+        top = max(principal, interest_paid[-1]) or 1
+
+        def point(year, value):
+            return f"{left + year / years * plot_w:.1f},{10 + plot_h - value / top * plot_h:.1f}"
+
+        parts = []
+        for step in range(5):
+            value = top * step / 4
+            y = 10 + plot_h - plot_h * step / 4
+            parts.append(f'<line x1="{left}" y1="{y:.1f}" x2="{width - 10}" y2="{y:.1f}" stroke="{COLOURS["grid"]}"/>')
+            parts.append(f'<text x="{left - 6}" y="{y + 4:.1f}" font-size="11" text-anchor="end" '
+                         f'fill="{COLOURS["muted"]}">{_money(value)}</text>')
+        for year in range(0, years + 1, 5):
+            parts.append(f'<text x="{left + year / years * plot_w:.1f}" y="{height - 10}" font-size="11" '
+                         f'text-anchor="middle" fill="{COLOURS["muted"]}">{year}y</text>')
+
+        for series, colour in ((balances, 'net'), (interest_paid, 'interest')):
+            line = ' '.join(point(year, value) for year, value in enumerate(series))
+            parts.append(f'<polyline points="{line}" fill="none" stroke="{COLOURS[colour]}" stroke-width="2.5"/>')
+
+        label = (f"{title}: {_money(principal)} at {annual_rate * 100:.2f}% over {years} years, "
+                 f"{_money(payment)} a month, {_money(interest_paid[-1])} interest in total")
+        return _svg(width, height, label, ''.join(parts))
+
+    return _cached('amortization', values, render)
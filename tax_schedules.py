@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Precompiled UK tax schedules.
+Income tax (with the personal allowance taper), Class 1 and Class 4 National Insurance
+are piecewise-linear in income, so each is compiled once per tax year into breakpoints,
+values and slopes. Evaluating a schedule is then a bisect and a multiply-add, for one
+income or a whole batch.
+"""
+
+from bisect import bisect_right
+from functools import lru_cache
+
+from results import NetPayBatch
+
+# Rates and thresholds for England, Wales and Northern Ireland (see TAX_CONFIG in script.js)
+TAX_YEARS = {
+    '2024/25': {
+        'personal_allowance': 12570,
+        'personal_allowance_limit': 100000,   # Allowance tapers £1 per £2 above this
+        'basic_rate_band': 37700,             # Taxable income taxed at the basic rate
+        'additional_rate_threshold': 125140,  # Taxable income above this is taxed at 45%
+        'basic_rate': 0.20,
+        'higher_rate': 0.40,
+        'additional_rate': 0.45,
+        'ni_primary_threshold': 12570,
+        'ni_upper_earnings_limit': 50270,
+        'ni_main_rate': 0.08,
+        'ni_upper_rate': 0.02,
+        'class4_lower_profits_limit': 12570,
+        'class4_upper_profits_limit': 50270,
+        'class4_main_rate': 0.06,
+        'class4_upper_rate': 0.02,
+        'dividend_allowance': 500,
+        'dividend_basic_rate': 0.0875,
+        'dividend_higher_rate': 0.3375,
+        'dividend_additional_rate': 0.3935,
+        'employer_ni_threshold': 9100,
+        'employer_ni_rate': 0.138,
+        'pension_annual_allowance': 60000,
+        'pension_taper_threshold_income': 200000,   # Annual allowance tapers £1 per £2 of
+        'pension_taper_adjusted_income': 260000,    # adjusted income above this, when threshold
+        'pension_minimum_allowance': 10000,         # income is over that, down to this
+        'corporation_tax_lower_limit': 50000,    # Small profits rate up to here
+        'corporation_tax_upper_limit': 250000,   # Main rate from here, marginal relief between
+        'corporation_tax_small_rate': 0.19,
+        'corporation_tax_main_rate': 0.25
+    },
+    '2025/26': {
+        'personal_allowance': 12570,
+        'personal_allowance_limit': 100000,
+        'basic_rate_band': 37700,
+        'additional_rate_threshold': 125140,
+        'basic_rate': 0.20,
+        'higher_rate': 0.40,
+        'additional_rate': 0.45,
+        'ni_primary_threshold': 12570,
+        'ni_upper_earnings_limit': 50270,
+        'ni_main_rate': 0.08,
+        'ni_upper_rate': 0.02,
+        'class4_lower_profits_limit': 12570,
+        'class4_upper_profits_limit': 50270,
+        'class4_main_rate': 0.06,
+        'class4_upper_rate': 0.02,
+        'dividend_allowance': 500,
+        'dividend_basic_rate': 0.0875,
+        'dividend_higher_rate': 0.3375,
+        'dividend_additional_rate': 0.3935,
+        'employer_ni_threshold': 5000,
+        'employer_ni_rate': 0.15,
+        'pension_annual_allowance': 60000,
+        'pension_taper_threshold_income': 200000,
+        'pension_taper_adjusted_income': 260000,
+        'pension_minimum_allowance': 10000,
+        'corporation_tax_lower_limit': 50000,
+        'corporation_tax_upper_limit': 250000,
+        'corporation_tax_small_rate': 0.19,
+        'corporation_tax_main_rate': 0.25
+    }
+}
+
+DEFAULT_TAX_YEAR = '2025/26'
+
+
+def personal_allowance(income, rules):
+    """Personal allowance after the taper for adjusted net income over the limit"""
+    excess = income - rules['personal_allowance_limit']
+    if excess <= 0:
+        return rules['personal_allowance']
+    return max(0, rules['personal_allowance'] - excess / 2)
+
+
+def income_tax_bands(income, rules):
+    """(band, rate, taxable income in the band) for the basic, higher and additional rates"""
+    taxable = max(0, income - personal_allowance(income, rules))
+    return [
+        ('basic', rules['basic_rate'], min(taxable, rules['basic_rate_band'])),
+        ('higher', rules['higher_rate'],
+         max(0, min(taxable, rules['additional_rate_threshold']) - rules['basic_rate_band'])),
+        ('additional', rules['additional_rate'], max(0, taxable - rules['additional_rate_threshold']))
+    ]
+
+
+def income_tax(income, rules):
+    """Income tax on non-savings income (scalar reference for the compiled schedule)"""
+    return sum(amount * rate for _, rate, amount in income_tax_bands(income, rules))
+
+
+def class1_ni(earnings, rules):
+    """Employee Class 1 National Insurance on annual earnings"""
+    main = max(0, min(earnings, rules['ni_upper_earnings_limit']) - rules['ni_primary_threshold'])
+    upper = max(0, earnings - rules['ni_upper_earnings_limit'])
+    return main * rules['ni_main_rate'] + upper * rules['ni_upper_rate']
+
+
+def class4_ni(profit, rules):
+    """Self-employed Class 4 National Insurance on annual profit"""
+    main = max(0, min(profit, rules['class4_upper_profits_limit']) - rules['class4_lower_profits_limit'])
+    upper = max(0, profit - rules['class4_upper_profits_limit'])
+    return main * rules['class4_main_rate'] + upper * rules['class4_upper_rate']
+
+
+def employer_ni(earnings, rules):
+    """Employer secondary Class 1 National Insurance (no Employment Allowance)"""
+    return max(0, earnings - rules['employer_ni_threshold']) * rules['employer_ni_rate']
+
+
+def corporation_tax(profit, rules):
+    """Corporation tax on a company's taxable profit, with marginal relief between the limits"""
+    lower = rules['corporation_tax_lower_limit']
+    upper = rules['corporation_tax_upper_limit']
+    if profit <= 0:
+        return 0
+    if profit <= lower:
+        return profit * rules['corporation_tax_small_rate']
+    if profit >= upper:
+        return profit * rules['corporation_tax_main_rate']
+    # Marginal relief: main rate less a fraction of the amount below the upper limit
+    fraction = (rules['corporation_tax_main_rate'] - rules['corporation_tax_small_rate']) * lower / (upper - lower)
+    return profit * rules['corporation_tax_main_rate'] - (upper - profit) * fraction
+
+
+class Schedule:
+    """
+    A piecewise-linear function of income.
+    Between breakpoints[i] and breakpoints[i + 1] the value is values[i] + slopes[i] * (x - breakpoints[i]).
+    """
+
+    __slots__ = ('breakpoints', 'values', 'slopes')
+
+    def __init__(self, breakpoints, values, slopes):
+        self.breakpoints = tuple(breakpoints)
+        self.values = tuple(values)
+        self.slopes = tuple(slopes)
+
+    @classmethod
+    def compile(cls, func, breakpoints):
+        """
+        Compile a scalar function that is linear between the given breakpoints.
+        Extra breakpoints are harmless; missing ones make the schedule wrong.
+        """
+        points = sorted(set(b for b in breakpoints if b >= 0) | {0})
+        values = [func(b) for b in points]
+        slopes = [(values[i + 1] - values[i]) / (points[i + 1] - points[i]) for i in range(len(points) - 1)]
+        slopes.append(func(points[-1] + 1000) - values[-1])
+        slopes[-1] /= 1000
+        return cls(points, values, slopes)
+
+    def __call__(self, x):
+        """Value at a single income (incomes below zero are treated as zero)"""
+        if x <= 0:
+            return self.values[0]
+        i = bisect_right(self.breakpoints, x) - 1
+        return self.values[i] + self.slopes[i] * (x - self.breakpoints[i])
+
+    def batch(self, xs):
+        """Values for a sequence of incomes"""
+        bp, values, slopes = self.breakpoints, self.values, self.slopes
+        v0 = values[0]
+        out = []
+        append = out.append
+        for x in xs:
+            if x <= 0:
+                append(v0)
+            else:
+                i = bisect_right(bp, x) - 1
+                append(values[i] + slopes[i] * (x - bp[i]))
+        return out
+
+    def marginal_rate(self, x):
+        """Slope of the schedule just above x"""
+        i = max(0, bisect_right(self.breakpoints, x) - 1)
+        return self.slopes[i]
+
+    def __add__(self, other):
+        return combine((1, self), (1, other))
+
+    def __sub__(self, other):
+        return combine((1, self), (-1, other))
+
+
+def combine(*weighted):
+    """Weighted sum of schedules, e.g. combine((1, tax), (1, ni)), as a new schedule"""
+    points = sorted(set(b for _, schedule in weighted for b in schedule.breakpoints))
+    values = [sum(w * s(p) for w, s in weighted) for p in points]
+    slopes = [sum(w * s.marginal_rate(p) for w, s in weighted) for p in points]
+    return Schedule(points, values, slopes)
+
+
+def _income_tax_breakpoints(rules):
+    """Gross incomes at which the marginal income tax rate can change"""
+    pa = rules['personal_allowance']
+    limit = rules['personal_allowance_limit']
+    taper_end = limit + 2 * pa
+    points = {pa, limit, taper_end}
+
+    # Where taxable income crosses each band threshold, in each allowance region
+    for threshold in (rules['basic_rate_band'], rules['additional_rate_threshold']):
+        full = threshold + pa                          # Full allowance
+        tapered = (threshold + pa + limit / 2) / 1.5   # Allowance tapering
+        zero = threshold                               # No allowance left
+        if full <= limit:
+            points.add(full)
+        if limit < tapered < taper_end:
+            points.add(tapered)
+        if zero >= taper_end:
+            points.add(zero)
+    return points
+
+
+def compile_income_tax(rules):
+    """Compile the income tax schedule for a rules dict (a TAX_YEARS entry or a variant of one)"""
+    return Schedule.compile(lambda x: income_tax(x, rules), _income_tax_breakpoints(rules))
+
+
+def compile_class1_ni(rules):
+    """Compile the employee Class 1 NI schedule for a rules dict"""
+    return Schedule.compile(
+        lambda x: class1_ni(x, rules),
+        (rules['ni_primary_threshold'], rules['ni_upper_earnings_limit'])
+    )
+
+
+def compile_employer_ni(rules):
+    """Compile the employer secondary Class 1 NI schedule for a rules dict"""
+    return Schedule.compile(lambda x: employer_ni(x, rules), (rules['employer_ni_threshold'],))
+
+
+def compile_class4_ni(rules):
+    """Compile the self-employed Class 4 NI schedule for a rules dict"""
+    return Schedule.compile(
+        lambda x: class4_ni(x, rules),
+        (rules['class4_lower_profits_limit'], rules['class4_upper_profits_limit'])
+    )
+
+
+@lru_cache(maxsize=None)
+def income_tax_schedule(tax_year=DEFAULT_TAX_YEAR):
+    """Compiled income tax schedule for a tax year"""
+    return compile_income_tax(TAX_YEARS[tax_year])
+
+
+@lru_cache(maxsize=None)
+def class1_ni_schedule(tax_year=DEFAULT_TAX_YEAR):
+    """Compiled employee Class 1 NI schedule for a tax year"""
+    return compile_class1_ni(TAX_YEARS[tax_year])
+
+
+@lru_cache(maxsize=None)
+def class4_ni_schedule(tax_year=DEFAULT_TAX_YEAR):
+    """Compiled self-employed Class 4 NI schedule for a tax year"""
+    return compile_class4_ni(TAX_YEARS[tax_year])
+
+
+# f(x) = x, for building take-home schedules
+IDENTITY = Schedule((0,), (0,), (1,))
+
+
+@lru_cache(maxsize=None)
+def net_pay_schedule(tax_year=DEFAULT_TAX_YEAR):
+    """Employee take-home pay (gross minus income tax and Class 1 NI) as one schedule"""
+    return combine((1, IDENTITY), (-1, income_tax_schedule(tax_year)), (-1, class1_ni_schedule(tax_year)))
+
+
+def net_pay_batch(salaries, tax_year=DEFAULT_TAX_YEAR, pension_percentage=0):
+    """
+    Batch equivalent of calculate_net_pay, returned as a struct-of-arrays NetPayBatch
+    (batch['net'] is the net pay column).
+    pension_percentage may be one percentage for everyone or one per salary.
+    """
+    salaries = list(salaries)
+    if isinstance(pension_percentage, (int, float)):
+        pensions = [s * pension_percentage / 100 for s in salaries]
+    else:
+        pensions = [s * p / 100 for s, p in zip(salaries, pension_percentage)]
+    adjusted = [s - p for s, p in zip(salaries, pensions)]
+
+    tax = income_tax_schedule(tax_year).batch(adjusted)
+    ni = class1_ni_schedule(tax_year).batch(adjusted)
+    net = [a - t - n for a, t, n in zip(adjusted, tax, ni)]
+
+    return NetPayBatch({
+        'gross': salaries,
+        'pension': [round(p, 2) for p in pensions],
+        'adjusted_gross': [round(a, 2) for a in adjusted],
+        'tax': [round(t, 2) for t in tax],
+        'ni': [round(n, 2) for n in ni],
+        'net': [round(n, 2) for n in net],
+        'monthly': [round(n / 12, 2) for n in net],
+        'weekly': [round(n / 52, 2) for n in net]
+    })
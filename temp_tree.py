@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Throwaway file trees for the tests of the tools that walk the site.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def temp_tree(files):
+    """
+    A temporary directory holding files ({relative path: text or bytes}), removed with
+    everything in it when the with block ends.
+    """
+    with tempfile.TemporaryDirectory() as root:
+        for name, content in files.items():
+            path = os.path.join(root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if isinstance(content, bytes):
+                with open(path, 'wb') as f:
+                    f.write(content)
+            else:
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+        yield root
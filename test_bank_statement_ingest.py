@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the bank statement ingest: date formats, keyword matching and unmatched spending.
+"""
+
+import os
+import tempfile
+
+from bank_statement_ingest import BudgetAggregator, _month_key, ingest
+
+ROWS = [
+    # date, description, amount (date column first, as add_chunk is told below)
+    ('05/01/2024', 'TESCO STORES 2041', '-42.10'),
+    ('2024-01-09', 'UBER EATS LONDON', '-18.50'),
+    ('09 Jan 2024', 'UBER TRIP', '-7.25'),
+    ('12.01.24', 'ACME PAYROLL SALARY', '2500.00'),
+    ('15/01/2024', 'CURRENT ACCOUNT FEE', '-3.00'),
+    ('20/01/2024', 'MYSTERY SHOP LTD', '-30.00'),
+    ('21/01/2024', 'MYSTERY SHOP LTD', '-20.00'),
+    ('22/01/2024', 'TRANSFER TO SAVINGS', '-500.00'),
+    ('not a date', 'TESCO', '-1.00'),
+]
+
+
+def _january():
+    aggregator = BudgetAggregator()
+    aggregator.add_chunk(ROWS, 0, 1, amount_col=2)
+    return aggregator
+
+
+def test_day_first_and_iso_dates():
+    for text in ('05/01/2024', '5/1/2024', '05-01-2024', '05.01.24', '05 Jan 2024', '5 January 2024',
+                 '2024-01-05', '2024-01-05 13:45:00', '2024-01-05T13:45:00'):
+        assert _month_key(text) == '2024-01', text
+    try:
+        _month_key('01/13/2024')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("month-first date accepted")
+
+
+def test_keywords_match_whole_words_longest_first():
+    fields = _january().months['2024-01']
+    assert fields['foodGroceries'] == 42.10
+    # 'UBER EATS' beats 'UBER'; plain 'UBER' is a taxi
+    assert fields['foodTakeaways'] == 18.50
+    assert fields['transportPublic'] == 7.25
+    assert fields['incomeEmployment'] == 2500.00
+    # 'RENT' must not match inside 'CURRENT'
+    assert 'homeMortgageRent' not in fields
+
+
+def test_unmatched_spending_is_reported_not_filed():
+    aggregator = _january()
+    assert aggregator.skipped == 1
+    budget = aggregator.month_budget('2024-01')
+    assert 'otherHomeRefurb' not in budget['fields']
+    assert budget['unmatched'] == {
+        'total': 53.00,
+        'count': 2,
+        'largest': [{'description': 'MYSTERY SHOP LTD', 'amount': 50.00},
+                    {'description': 'CURRENT ACCOUNT FEE', 'amount': 3.00}]
+    }
+    # Still spending: 42.10 + 18.50 + 7.25 matched, 53.00 unmatched; the transfer is neither
+    assert budget['totalExpenses'] == 120.85
+    assert budget['netBalance'] == 2379.15
+
+
+def test_csv_with_paid_in_and_out_columns():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'statement.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("Date,Description,Paid out,Paid in\n"
+                    "01/02/2024,NETFLIX.COM,10.99,\n"
+                    "01/03/2024,NETFLIX.COM,10.99,\n"
+                    "02/03/2024,CORNER KIOSK,4.00,\n")
+        average = ingest([path]).average_budget()
+    assert average['fields']['homeTVSubs'] == 10.99
+    assert average['unmatched']['total'] == 2.00
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
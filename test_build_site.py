@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental build: what invalidates a family's pages, and what happens
+to the state and sitemap.xml when a data entry is removed.
+"""
+
+import copy
+import os
+import shutil
+import tempfile
+
+import build_site
+import generate_expense_pages
+from temp_tree import temp_tree
+
+GENERATOR = 'generate_expense_pages'
+
+
+def _source():
+    with open(f"{GENERATOR}.py", encoding='utf-8') as f:
+        return f.read()
+
+
+def _code_hash_of(source):
+    cwd = os.getcwd()
+    with temp_tree({f"{GENERATOR}.py": source}) as root:
+        os.chdir(root)
+        try:
+            return build_site.code_hash(GENERATOR, 'CATEGORIES')
+        finally:
+            os.chdir(cwd)
+
+
+def test_code_hash_ignores_the_data_table():
+    source = _source()
+    baseline = _code_hash_of(source)
+    assert '"name": "Office, Stationery & Software"' in source
+    assert _code_hash_of(source.replace('"name": "Office, Stationery & Software"',
+                                        '"name": "Office, Stationery, Phone & Software"')) == baseline
+    assert _code_hash_of(source.replace('def generate_category_page(cat):',
+                                        'def generate_category_page(cat, year="2025/26"):')) != baseline
+
+
+def test_page_signature_changes_only_for_the_edited_entry():
+    code = build_site.code_hash(GENERATOR, 'CATEGORIES')
+    categories = generate_expense_pages.CATEGORIES
+    before = [build_site.page_signature(code, cat) for cat in categories]
+
+    edited = copy.deepcopy(categories)
+    edited[1]['intro'] += ' Updated for 2025/26.'
+    after = [build_site.page_signature(code, cat) for cat in edited]
+
+    assert len(set(before)) == len(before)
+    assert [i for i, (a, b) in enumerate(zip(before, after)) if a != b] == [1]
+
+
+def test_removed_entry_dropped_from_state_and_sitemap():
+    # Build a copy of the site, so the real pages and sitemap.xml are left alone
+    cwd = os.getcwd()
+    categories = generate_expense_pages.CATEGORIES
+    removed = categories[-1]
+    key = f"expenses/{removed['id']}.html"
+    with tempfile.TemporaryDirectory() as scratch:
+        site = os.path.join(scratch, 'site')
+        shutil.copytree(cwd, site, ignore=shutil.ignore_patterns('.git', '__pycache__'))
+        os.chdir(site)
+        try:
+            state = build_site.load_state()
+            build_site.build(state)
+            assert key in state['pages']
+            with open('sitemap.xml', encoding='utf-8') as f:
+                assert f"/{key}</loc>" in f.read()
+
+            generate_expense_pages.CATEGORIES = categories[:-1]
+            rendered, changed, gone = build_site.build(state)
+            assert gone == [key]
+            assert not any(page.startswith('expenses/') for page in rendered)
+            assert key not in state['pages'] and key not in state['outputs']
+            assert build_site.load_state()['pages'] == state['pages']
+            assert not os.path.exists(key)
+            with open('sitemap.xml', encoding='utf-8') as f:
+                assert f"/{key}</loc>" not in f.read()
+        finally:
+            generate_expense_pages.CATEGORIES = categories
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
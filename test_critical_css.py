@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the critical CSS stage: finding a page's stylesheets and replacing them with
+the inlined block, whatever order the link attributes are written in, and one subset
+per template family.
+"""
+
+import os
+import tempfile
+
+from critical_css import (END_MARKER, INJECTED_BLOCK, START_MARKER, _stylesheet_hrefs, apply_to_directory,
+                          family_signature, inline_critical_css)
+
+PAGE = """<head>
+    <meta charset="utf-8">
+    <link href="styles.css" rel="stylesheet">
+    <link rel="icon" href="favicon.ico">
+    <link rel='stylesheet' type='text/css' href='https://cdn.example/fa.css' />
+    <link rel="preload" href="font.woff2" as="font">
+</head>"""
+
+
+def test_stylesheets_found_in_any_attribute_order():
+    assert _stylesheet_hrefs(PAGE) == ['styles.css', 'https://cdn.example/fa.css']
+
+
+def test_stylesheets_replaced_by_one_block():
+    markup = inline_critical_css(PAGE, 'body{margin:0}', _stylesheet_hrefs(PAGE))
+    assert markup.count(START_MARKER) == 1
+    assert '<link href="styles.css" rel="stylesheet">' not in markup
+    assert '<link rel="icon" href="favicon.ico">' in markup
+    assert '<link rel="preload" href="font.woff2" as="font">' in markup
+    assert markup.index(START_MARKER) < markup.index('<link rel="icon"')
+
+
+def test_reinjection_keeps_the_hrefs():
+    markup = inline_critical_css(PAGE, 'body{margin:0}', _stylesheet_hrefs(PAGE))
+    again = inline_critical_css(markup, 'body{margin:1px}', _stylesheet_hrefs(markup))
+    assert _stylesheet_hrefs(again) == ['styles.css', 'https://cdn.example/fa.css']
+    assert again.count(END_MARKER) == 1 and 'margin:1px' in again
+
+
+def test_family_signature_samples_first_to_last():
+    pages = {f"{i:03d}.html": f'<div class="page-{i}"></div>' for i in range(100)}
+    _, classes, _ = family_signature(pages, sample_size=5)
+    assert classes == {'page-0', 'page-25', 'page-50', 'page-74', 'page-99'}
+    _, classes, _ = family_signature(dict(list(pages.items())[:3]), sample_size=5)
+    assert classes == {'page-0', 'page-1', 'page-2'}
+
+
+def test_one_subset_inlined_into_every_page():
+    stylesheet = ".hero{color:red}.result{color:blue}.unused{color:green}"
+    with tempfile.TemporaryDirectory() as root:
+        with open(os.path.join(root, 'styles.css'), 'w', encoding='utf-8') as f:
+            f.write(stylesheet)
+        pages_dir = os.path.join(root, 'pages')
+        os.makedirs(pages_dir)
+        for name, body in (('a.html', '<div class="hero"></div>'), ('b.html', '<p class="result"></p>')):
+            with open(os.path.join(pages_dir, name), 'w', encoding='utf-8') as f:
+                f.write(f'<head>\n    <link rel="stylesheet" href="styles.css">\n</head>\n<body>{body}</body>')
+
+        pages, updated, _ = apply_to_directory(pages_dir, os.path.join(root, 'styles.css'),
+                                               os.path.join(root, 'cache'))
+        assert (pages, updated) == (2, 2)
+        blocks = set()
+        for name in ('a.html', 'b.html'):
+            with open(os.path.join(pages_dir, name), encoding='utf-8') as f:
+                blocks.add(INJECTED_BLOCK.search(f.read()).group(0))
+        assert len(blocks) == 1
+        block = blocks.pop()
+        assert '.hero{color:red}' in block and '.result{color:blue}' in block
+        assert '.unused' not in block
+
+        # A second run finds nothing to change
+        assert apply_to_directory(pages_dir, os.path.join(root, 'styles.css'), os.path.join(root, 'cache'))[1] == 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Tests for the delta deploy bundle's manifest: what gets published and what is left out.
+"""
+
+import os
+import tempfile
+
+from deploy_bundle import _tree_path, current_manifest, diff_manifests
+from temp_tree import temp_tree
+
+
+def test_bundle_and_deploy_metadata_are_not_published():
+    files = {name: name for name in ('index.html', 'styles.css', 'deploy.tar.gz', '.deploy/manifest.json')}
+    with temp_tree(files) as root, tempfile.TemporaryDirectory() as cache_dir:
+        out = os.path.join(root, 'deploy.tar.gz')
+        manifest, hashed = current_manifest(root, os.path.join(cache_dir, 'stat.json'), skip={_tree_path(out, root)})
+    assert sorted(manifest) == ['index.html', 'styles.css']
+    assert hashed == 2
+
+
+def test_bundle_outside_the_tree_skips_nothing():
+    with temp_tree({'index.html': ''}) as root:
+        assert _tree_path(os.path.join(tempfile.gettempdir(), 'elsewhere.tar.gz'), root) is None
+        assert _tree_path(os.path.join(root, 'out', 'b.tar.gz'), root) == 'out/b.tar.gz'
+
+
+def test_diff_manifests():
+    changed, deleted = diff_manifests({'a': '1', 'b': '2', 'c': '3'}, {'a': '1', 'b': '9', 'd': '4'})
+    assert changed == ['b', 'd']
+    assert deleted == ['c']
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for the director salary vs dividend optimiser, with a 2025/26 split worked by hand.
+"""
+
+from director_pay import director_take_home, optimise
+from tax_schedules import TAX_YEARS
+
+RULES = TAX_YEARS['2025/26']
+
+
+def test_take_home_at_the_personal_allowance():
+    # £50,000 profit, £12,570 salary: 15% employer NI above £5,000, 19% corporation tax,
+    # 8.75% dividend tax above the £500 dividend allowance, no employee NI or income tax
+    result = director_take_home(50000, 12570, RULES)
+    assert result['employer_ni'] == 1135.50
+    assert result['corporation_tax'] == 6895.95
+    assert result['dividends'] == 29398.54
+    assert result['dividend_tax'] == 2528.62
+    assert result['employee_ni'] == 0.0
+    assert result['take_home'] == 39439.92
+
+
+def test_breakpoints_beat_a_salary_sweep():
+    for profit in (30000, 50000, 120000, 250000):
+        exact = optimise(profit)
+        swept = optimise(profit, step=50)
+        assert exact['take_home'] >= swept['take_home'] - 0.005, profit
+
+
+def test_best_salary_is_the_personal_allowance():
+    assert optimise(50000)['salary'] == 12570
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
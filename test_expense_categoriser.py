@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the expense categoriser: the automaton, overlapping matches and the cached results.
+"""
+
+from expense_categoriser import AhoCorasick, classify, classify_batch, normalise
+
+
+def test_automaton_finds_overlapping_patterns():
+    # The textbook example: 'she' and 'he' end at the same character, 'hers' later
+    automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+    assert sorted(automaton.find('ushers')) == [(3, 0), (3, 1), (5, 3)]
+    assert automaton.find('xyz') == []
+
+
+def test_multi_keyword_description():
+    result = classify('Staples: printer ink, paper')
+    assert result['category_id'] == 'office-supplies'
+    assert result['matches'] == ('paper', 'printer', 'staples')
+    assert not result['needs_ai']
+
+
+def test_contained_match_only_counts_when_it_agrees():
+    # 'adobe stock' (stock) suppresses 'adobe' (office); 'adobe creative cloud' keeps it
+    assert classify('Adobe Stock')['matches'] == ('adobe stock',)
+    assert classify('Adobe Stock')['category_id'] == 'stock-materials'
+    assert classify('Adobe Creative Cloud')['matches'] == ('adobe', 'adobe creative cloud')
+
+
+def test_case_and_punctuation_are_normalised():
+    assert normalise('TRAINLINE.COM*TICKET') == 'trainline com ticket'
+    assert classify('TRAINLINE.COM*TICKET')['category_id'] == 'travel'
+    assert dict(classify('trainline com ticket')) == dict(classify('TRAINLINE.COM*TICKET'))
+
+
+def test_cached_result_is_read_only():
+    result = classify('Uber trip')
+    assert classify('Uber trip') is result
+    try:
+        result['category_id'] = 'marketing'
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("cached result was modified")
+    assert classify('Uber trip')['category_id'] == 'travel'
+
+
+def test_batch_splits_out_ai_fallbacks():
+    local, fallback = classify_batch(['Uber trip', 'Zzz unknown'])
+    assert [description for description, _ in local] == ['Uber trip']
+    assert fallback == [('Zzz unknown', classify('Zzz unknown'))]
+    assert fallback[0][1]['category_id'] is None
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
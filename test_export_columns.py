@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar export: the compiled stamp duty schedules must equal
+calculate_stamp_duty, and exported columns must read back unchanged.
+"""
+
+import os
+import tempfile
+
+from export_columns import (NET_PAY_COLUMNS, export_npy, net_pay_chunks, open_columns, parse_range,
+                            stamp_duty_chunks)
+from generate_stamp_duty_pages import calculate_stamp_duty
+
+PRICES = [0, 50000, 125000, 125001, 200000, 250000, 300000, 300001, 400000, 500000, 500001,
+          700000, 925000, 925001, 1200000, 1500000, 1500001, 3000000]
+
+
+def test_stamp_duty_schedule_matches_calculate_stamp_duty():
+    chunk = next(stamp_duty_chunks(PRICES))
+    for price, buyer, duty in zip(chunk['price'], chunk['buyer_type'], chunk['stamp_duty']):
+        expected = calculate_stamp_duty(price, is_first_time_buyer=buyer == 1,
+                                        is_additional_property=buyer == 2)['total_stamp_duty']
+        assert abs(duty - expected) < 0.005, (price, buyer)
+
+
+def test_stamp_duty_figures():
+    # 2025/26: £300,000 is £5,000 standard, nil for a first-time buyer, £20,000 with the 5% surcharge
+    chunk = next(stamp_duty_chunks([300000]))
+    assert list(chunk['stamp_duty']) == [5000.0, 0.0, 20000.0]
+
+
+def test_parse_range():
+    assert parse_range('20000:21000:250') == [20000, 20250, 20500, 20750, 21000]
+    assert parse_range('5') == [5.0]
+
+
+def test_npy_round_trip():
+    salaries = parse_range('10000:20000:1000')
+    with tempfile.TemporaryDirectory() as out_dir:
+        rows = export_npy(net_pay_chunks(salaries, [0, 5]), NET_PAY_COLUMNS, out_dir, {'engine': 'net-pay'})
+        assert rows == len(salaries) * 2
+        assert os.path.exists(os.path.join(out_dir, 'manifest.json'))
+        columns = open_columns(out_dir)
+        assert list(columns['salary'][:4]) == [10000.0, 10000.0, 11000.0, 11000.0]
+        assert list(columns['pension_percentage'][:2]) == [0.0, 5.0]
+        for column in columns.values():
+            column.release()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for the fiscal drag projection: threshold factors and one cell worked by hand.
+"""
+
+from fiscal_drag import project, threshold_factors
+
+
+def close(a, b, tolerance=1e-9):
+    return all(abs(x - y) < tolerance for x, y in zip(a, b)) and len(a) == len(b)
+
+
+def test_threshold_factors():
+    assert threshold_factors(3, 0.1, None) == [1.0, 1.0, 1.0, 1.0]
+    assert close(threshold_factors(3, 0.1, 0), [1.0, 1.1, 1.21, 1.331])
+    # Frozen for one year, then rising with inflation
+    assert close(threshold_factors(3, 0.1, 1), [1.0, 1.0, 1.1, 1.21])
+
+
+def test_two_frozen_years_at_30000():
+    # No wage growth, 10% inflation: indexed thresholds are 1.21x today's after two years,
+    # so the allowance and NI threshold are £15,209.70 instead of £12,570. At £30,000 that
+    # £2,639.70 is taxed at 20% plus 8% NI when frozen: £739.12 a year of drag.
+    cube = project(salaries=[30000], years=2, wage_growth=0.0, inflation=0.10)
+    assert cube['net']['frozen'][0] == [25119.60, 25119.60, 25119.60]
+    assert cube['deductions']['frozen'][0][2] == 4880.40
+    assert cube['fiscal_drag']['frozen'][0] == [0.0, round(0.28 * (13827 - 12570), 2), 739.12]
+    assert cube['fiscal_drag']['indexed'][0] == [0.0, 0.0, 0.0]
+    # In today's prices the frozen take-home falls with inflation
+    assert cube['real_net']['frozen'][0][2] == round(25119.60 / 1.21, 2)
+
+
+def test_cube_shape():
+    cube = project(salaries=[20000, 40000, 60000], years=4)
+    assert cube['years'] == [0, 1, 2, 3, 4]
+    assert cube['scenarios'] == ['frozen', 'indexed']
+    assert [len(row) for row in cube['net']['indexed']] == [5, 5, 5]
+    # Frozen thresholds never leave anyone better off
+    assert all(cell >= 0 for row in cube['fiscal_drag']['frozen'] for cell in row)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the mileage allowance engine: the 45p/25p split at 10,000 business miles,
+the running ledger and the one-pass claims.
+"""
+
+from mileage_engine import MileageLedger, compute_claims, tax_year_label
+
+
+def raises_value_error(func, *args, **kwargs):
+    try:
+        func(*args, **kwargs)
+    except ValueError:
+        return True
+    return False
+
+
+def test_tax_year_label():
+    assert tax_year_label('2025-04-05') == '2024/25'
+    assert tax_year_label('2025-04-06') == '2025/26'
+
+
+def test_trip_across_the_threshold_is_split():
+    ledger = MileageLedger()
+    # 9,900 miles at 45p = £4,455
+    assert ledger.add_trip('u1', '2025-05-01', 9900) == {'claimable': 4455.00, 'rate_pence': 45}
+    # 100 miles at 45p and 100 at 25p = £45 + £25
+    assert ledger.add_trip('u1', '2025-06-01', 200) == {'claimable': 70.00, 'rate_pence': 25}
+    assert ledger.summary('u1', '2025/26') == {
+        'trips': 2,
+        'miles': 10100.0,
+        'miles_at_first_rate': 10000.0,
+        'miles_at_second_rate': 100.0,
+        'claimable': 4525.00,
+        'current_rate_pence': 25
+    }
+    # A new tax year starts again at 45p
+    assert ledger.add_trip('u1', '2026-04-06', 10)['rate_pence'] == 45
+
+
+def test_return_trips_count_both_ways():
+    ledger = MileageLedger()
+    assert ledger.add_trip('u1', '2025-05-01', 12.5, is_return_trip=True)['claimable'] == 11.25
+
+
+def test_remove_and_re_add_round_trip():
+    ledger = MileageLedger()
+    ledger.add_trip('u1', '2025-05-01', 9900)
+    first = ledger.add_trip('u1', '2025-06-01', 200)
+    before = ledger.summary('u1', '2025/26')
+    ledger.remove_trip('u1', '2025-06-01', 200)
+    assert ledger.summary('u1', '2025/26')['claimable'] == 4455.00
+    assert ledger.add_trip('u1', '2025-06-01', 200) == first
+    assert ledger.summary('u1', '2025/26') == before
+
+
+def test_remove_unrecorded_trip_is_refused():
+    ledger = MileageLedger()
+    assert raises_value_error(ledger.remove_trip, 'u1', '2025-05-01', 10)
+    ledger.add_trip('u1', '2025-05-01', 10)
+    try:
+        ledger.remove_trip('u1', '2025-05-01', 25)
+    except ValueError as error:
+        assert 'u1 2025/26' in str(error)
+    else:
+        raise AssertionError("removed more miles than were recorded")
+    ledger.remove_trip('u1', '2025-05-01', 10)
+    assert raises_value_error(ledger.remove_trip, 'u1', '2025-05-01', 0)
+    assert ledger.summary('u1', '2025/26')['trips'] == 0
+
+
+def test_compute_claims_matches_the_ledger():
+    trips = [('t2', 'u1', '2025-06-01', 200, 0), ('t1', 'u1', '2025-05-01', 9900, 0),
+             ('t3', 'u2', '2025-05-01', 100, 1)]
+    claims, totals = compute_claims(trips)
+    assert claims == {'t1': 4455.00, 't2': 70.00, 't3': 90.00}
+    assert totals[('u1', '2025/26')]['claimable'] == MileageLedger.from_trips(trips).summary('u1', '2025/26')['claimable']
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
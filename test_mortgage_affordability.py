@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for the mortgage affordability engine: which cap binds, joint incomes and the grid inputs.
+Net pay comes from calculate_net_pay (2025/26): £20,000 takes home £17,919.60, £60,000 £45,357.40.
+"""
+
+from mortgage_affordability import affordability_grid, calculate_affordability
+
+
+def test_income_multiple_vs_stress_test_switchover():
+    # At 0% over 25 years £1/month supports £300, so the stressed cap is 0.2 * 300 = 60x
+    # net monthly pay (5x annual net) against a 4x gross income cap
+    grid = affordability_grid((20000, 60000), rates=(0.0,), terms=(25,), income_multiple=4.0,
+                              stress_buffer=0.0, payment_share=0.2)
+    low, high = grid['max_loan']
+    assert grid['income_cap'] == (80000.0, 240000.0)
+    # £20,000: 5 x £17,919.60 = £89,598 clears the £80,000 income cap, which binds
+    assert low[0][0] == 80000.0
+    assert abs(grid['stress_cap'][0][0][0] - 89598.0) < 0.01
+    # £60,000: 5 x £45,357.40 = £226,787 is under the £240,000 income cap
+    assert abs(high[0][0] - 226787.0) < 0.01
+
+
+def test_limited_by_names_the_smaller_cap():
+    result = calculate_affordability(60000)
+    assert result['limited_by'] == 'stress_test'
+    assert result['max_loan'] == result['stress_cap'] < result['income_cap'] == 330000.0
+
+
+def test_joint_income_is_taxed_per_person():
+    joint = calculate_affordability(60000, partner_income=60000)
+    single = calculate_affordability(120000)
+    assert joint['total_income'] == single['total_income'] == 120000
+    # Two basic/higher-rate earners, not one earner losing the personal allowance
+    assert joint['net_monthly'] == round(2 * 45357.40 / 12, 2) == 7559.57
+    assert joint['max_loan'] > single['max_loan']
+
+
+def test_partner_incomes_must_match_incomes():
+    try:
+        affordability_grid((30000, 40000), partner_incomes=(10000,))
+    except ValueError as error:
+        assert 'same length' in str(error)
+    else:
+        raise AssertionError("mismatched partner_incomes accepted")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the page-weight budget scanner: each image counts once, at its largest candidate.
+"""
+
+import os
+
+from page_budget import scan_page, srcset_urls
+from temp_tree import temp_tree
+
+
+def test_srcset_urls_drop_descriptors():
+    assert srcset_urls('a-400w.jpg 400w, a-800w.jpg 800w') == ['a-400w.jpg', 'a-800w.jpg']
+    assert srcset_urls('a.jpg, a@2x.jpg 2x') == ['a.jpg', 'a@2x.jpg']
+
+
+def test_picture_counts_largest_candidate_once():
+    page = ('<picture><source type="image/webp" srcset="img/a-400.webp 400w, img/a-800.webp 800w">'
+            '<img src="img/a.jpg" srcset="img/a.jpg 1200w"></picture>')
+    files = {'img/a-400.webp': b'x' * 100, 'img/a-800.webp': b'x' * 300, 'img/a.jpg': b'x' * 200}
+    with temp_tree({**files, 'page.html': page}) as root:
+        row = scan_page(os.path.join(root, 'page.html'), root)
+    assert row['asset_bytes'] == 300
+    assert row['local_requests'] == 1
+    assert row['missing'] == []
+
+
+def test_img_srcset_and_src_fallback():
+    page = '<img src="a-small.jpg" srcset="a-small.jpg 400w, a-big.jpg 1200w"><img src="b.jpg">'
+    files = {'a-small.jpg': b'x' * 50, 'a-big.jpg': b'x' * 500, 'b.jpg': b'x' * 70}
+    with temp_tree({**files, 'page.html': page}) as root:
+        row = scan_page(os.path.join(root, 'page.html'), root)
+    assert row['asset_bytes'] == 570
+    assert row['local_requests'] == 2
+
+
+def test_missing_srcset_candidate_is_reported():
+    page = '<img src="a.jpg" srcset="a.jpg 400w, gone.jpg 800w">'
+    with temp_tree({'a.jpg': b'x' * 50, 'page.html': page}) as root:
+        row = scan_page(os.path.join(root, 'page.html'), root)
+    assert row['asset_bytes'] == 50
+    assert row['missing'] == ['gone.jpg']
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the PAYE payroll engine against HMRC figures worked with the exact percentage
+method for 2025/26.
+"""
+
+from paye_engine import pay_run, parse_tax_code
+
+
+def run_one(tax_code, gross, period=1, frequency='monthly', pay_to_date=0, tax_to_date=0):
+    result = pay_run({
+        'employee_id': ['E1'],
+        'tax_code': [tax_code],
+        'frequency': [frequency],
+        'period': [period],
+        'gross_pay': [gross],
+        'pay_to_date': [pay_to_date],
+        'tax_to_date': [tax_to_date]
+    })
+    return {field: values[0] for field, values in result.items()}
+
+
+def raises_value_error(func, *args, **kwargs):
+    try:
+        func(*args, **kwargs)
+    except ValueError:
+        return True
+    return False
+
+
+def test_1257l_month_1():
+    # Free pay £1,047.50, taxable £1,952 at 20%; NI 8% of £3,000 - £1,048
+    payslip = run_one('1257L', 3000)
+    assert payslip['tax'] == 390.20
+    assert payslip['ni'] == 156.16
+    assert payslip['net_pay'] == 2453.64
+
+
+def test_cumulative_month_2():
+    # Free pay to date £2,096.50, so taxable pay to date rounds down to £3,903
+    payslip = run_one('1257L', 3000, period=2, pay_to_date=3000, tax_to_date=390.20)
+    assert payslip['tax'] == 390.40
+    assert payslip['tax_to_date'] == 780.60
+
+
+def test_fixed_rate_and_k_codes():
+    assert run_one('BR', 3000)['tax'] == 600.00
+    assert run_one('NT', 3000)['tax'] == 0.00
+    # K codes never take more than half the period's pay
+    assert run_one('K5000', 1000)['tax'] == 500.00
+    assert run_one('K1000', 1000)['tax'] == 366.80
+
+
+def test_tax_code_parsing():
+    assert parse_tax_code('1257L').allowance == 12579
+    assert parse_tax_code('K475').allowance == -4759
+    assert not parse_tax_code('1257L M1').cumulative
+    assert raises_value_error(parse_tax_code, 'S1257L')
+
+
+def test_week_53_is_taxed_on_the_week_1_basis():
+    week_1 = run_one('1257L', 700, period=1, frequency='weekly')
+    week_53 = run_one('1257L', 700, period=53, frequency='weekly', pay_to_date=36400, tax_to_date=5000)
+    assert week_53['basis'] == 'non-cumulative'
+    assert week_53['tax'] == week_1['tax']
+
+
+def test_periods_outside_the_year_are_rejected():
+    assert raises_value_error(run_one, '1257L', 3000, period=13)
+    assert raises_value_error(run_one, '1257L', 3000, period=0)
+    assert raises_value_error(run_one, '1257L', 700, period=54, frequency='weekly')
+    assert raises_value_error(run_one, '1257L', 700, frequency='fortnightly')
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
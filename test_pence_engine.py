@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the integer-pence engine: exact HMRC figures for 2025/26, agreement between the
+scalar and batch paths, and the parsing and formatting helpers.
+"""
+
+from array import array
+
+from differential_harness import check_pence_engine, generate_pensions, generate_points, reference_results
+from pence_engine import RESULT_FIELDS, format_pounds, net_pay_pence, net_pay_pence_batch, to_pence
+
+
+def test_basic_rate_salary():
+    # £50,000: 20% and 8% on the £37,430 above £12,570
+    result = net_pay_pence(to_pence(50000))
+    assert result['tax'] == 748600
+    assert result['ni'] == 299440
+    assert result['net'] == 3951960
+
+
+def test_higher_rate_salary():
+    # £60,000: 20% on £37,700 and 40% on £9,730; NI 8% to £50,270 and 2% above
+    result = net_pay_pence(to_pence(60000))
+    assert result['tax'] == 1143200
+    assert result['ni'] == 321060
+    assert result['net'] == 4535740
+
+
+def test_within_harness_tolerance():
+    # The harness allows for HMRC's step-by-step rounding against the float reference
+    salaries = generate_points(5000, 7, 300000)
+    pensions = generate_pensions(len(salaries), 7)
+    count, first = check_pence_engine(salaries, pensions, reference_results(salaries, pensions))
+    assert count == 0, first
+
+
+def test_taper_salary():
+    # £110,000: allowance £7,570, £7,540 basic + £25,892 higher; NI £3,016 + £1,194.60
+    result = net_pay_pence(to_pence(110000))
+    assert result['tax'] == 3343200
+    assert result['ni'] == 421060
+
+
+def test_taper_removes_whole_pounds():
+    # 40% on the extra income; £1 over the limit costs no allowance, £2 over costs £1 of it
+    assert net_pay_pence(to_pence(100001))['tax'] == net_pay_pence(to_pence(100000))['tax'] + 40
+    assert net_pay_pence(to_pence(100002))['tax'] == net_pay_pence(to_pence(100000))['tax'] + 120
+
+
+def test_pension_rounds_half_up():
+    # 5% of £100.10 is 500.5p
+    assert net_pay_pence(10010, pension_bps=500)['pension'] == 501
+
+
+def test_batch_matches_scalar():
+    gross = array('q', range(0, 30000000, 123457))
+    batch = net_pay_pence_batch(gross, pension_bps=350)
+    for i, g in enumerate(gross):
+        result = net_pay_pence(g, pension_bps=350)
+        assert all(batch[field][i] == result[field] for field in RESULT_FIELDS), g
+
+
+def test_to_pence():
+    assert to_pence(12) == 1200
+    assert to_pence('£1,234.56') == 123456
+    assert to_pence('30000.005') == 3000001
+    assert to_pence('-12.3') == -1230
+
+
+def test_format_pounds():
+    assert format_pounds(123456) == '£1,235'
+    assert format_pounds(123456, 2) == '£1,234.56'
+    assert format_pounds(150) == '£2'
+    assert format_pounds(-150) == '-£2'
+    assert format_pounds(-49) == '£0'
+    assert format_pounds(-49, 2) == '-£0.49'
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the pension salary sacrifice optimiser. Each pound sacrificed costs take-home
+pay less the tax and NI relief on it: 42% for a higher-rate earner, 62% in the allowance
+taper (60% income tax plus 2% NI).
+"""
+
+from pension_optimiser import annual_allowance, efficient_frontier, optimise
+from tax_schedules import TAX_YEARS
+
+
+def test_higher_rate_sacrifice_stops_at_the_basic_rate_band():
+    # £60,000: the cheapest slice runs down to £50,270, in 0.1% (£60) steps
+    result = optimise(60000)
+    assert result['best_percentage'] == 16.2
+    assert result['best_pension'] == 9720.00
+    assert abs(result['best_take_home_cost'] - 9720 * 0.58) < 0.02
+    assert abs(result['best_pension_per_pound'] - 1 / 0.58) < 0.001
+
+
+def test_taper_sacrifice_returns_263_per_pound():
+    result = optimise(110000)
+    assert abs(result['best_pension_per_pound'] - 1 / 0.38) < 0.001
+    assert 110000 - result['best_pension'] >= 100000
+
+
+def test_200k_sacrifice_stops_at_the_annual_allowance():
+    # Sacrificing £60,000 brings threshold income to £140,000, so the full allowance applies;
+    # every pound of it is relieved at 45% tax plus 2% NI
+    result = optimise(200000)
+    assert result['annual_allowance'] == 60000
+    assert result['best_percentage'] == 30.0
+    assert result['best_pension'] == 60000.00
+    assert abs(result['best_take_home_cost'] - 60000 * 0.53) < 0.02
+    assert max(segment['pension'] for segment in result['frontier']) <= 60000
+
+
+def test_300k_sacrifice_stops_at_the_tapered_allowance():
+    # Adjusted income £300,000 is £40,000 over £260,000: the allowance tapers to £40,000,
+    # reached in 0.1% (£300) steps at 13.3%
+    result = optimise(300000)
+    assert result['annual_allowance'] == 40000
+    assert result['best_percentage'] == 13.3
+    assert result['best_pension'] == 39900.00
+    assert abs(result['best_take_home_cost'] - 39900 * 0.53) < 0.02
+    assert max(segment['pension'] for segment in result['frontier']) <= 40000
+
+
+def test_annual_allowance_taper():
+    rules = TAX_YEARS['2025/26']
+    assert annual_allowance(60000, rules) == 60000
+    assert annual_allowance(260000, rules) == 60000
+    assert annual_allowance(280000, rules) == 50000
+    assert annual_allowance(400000, rules) == 10000
+
+
+def test_frontier_rates_only_fall():
+    frontier = optimise(125140)['frontier']
+    rates = [segment['pension_per_pound'] for segment in frontier]
+    assert rates == sorted(rates, reverse=True)
+
+
+def test_efficient_frontier_drops_points_under_the_hull():
+    pension = [0, 10, 15, 30]
+    cost = [0, 5, 10, 20]
+    assert efficient_frontier(pension, cost) == [0, 1, 3]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the policy impact engine on small hand-checkable populations.
+"""
+
+from policy_impact import band_edges, compare, parse_change, rule_set
+
+SALARIES = (12570, 30000, 60000)
+WEIGHTS = (1000, 1000, 1000)
+
+
+def test_basic_rate_rise_moves_revenue_by_hand_worked_amount():
+    # 1p more on basic-rate income: £17,430 at £30,000 and the full £37,700 band at £60,000
+    results = compare(rule_set('2025/26'), rule_set('2025/26', basic_rate=0.21), SALARIES, WEIGHTS)
+    total = results['total']
+    assert total['revenue_change'] == (174.30 + 377.00) * 1000
+    assert total['employer_ni_change'] == 0
+    assert total['losers'] == 2000 and total['gainers'] == 0
+    higher = next(band for band in results['bands'] if band['label'] == 'Higher rate')
+    assert higher['mean_net_change'] == -377.00
+
+
+def test_employer_ni_change_moves_revenue_only():
+    # £30,000: 13.8% above £9,100 is £2,884.20; 15% above £5,000 is £3,750
+    results = compare(rule_set('2024/25'), rule_set('2025/26'), (30000,), (1000,))
+    total = results['total']
+    assert total['employer_ni_change'] == round((3750.00 - 2884.20) * 1000)
+    assert total['revenue_change'] == total['employer_ni_change']
+    assert total['mean_net_change'] == 0.0
+    assert total['gainers'] == total['losers'] == 0
+
+
+def test_band_edges_without_a_separate_no_allowance_band():
+    labels = [label for label, _ in band_edges(rule_set('2025/26'))]
+    assert labels == ['Below personal allowance', 'Basic rate', 'Higher rate', 'Allowance taper', 'Additional rate']
+    widened = band_edges(rule_set('2025/26', additional_rate_threshold=150000))
+    assert ('Higher rate (no allowance)', 125140) in widened
+
+
+def test_parse_change():
+    assert parse_change('basic_rate=0.22') == ('basic_rate', 0.22)
+    assert parse_change('personal_allowance=13000') == ('personal_allowance', 13000)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for related links: similar pages find each other, and the related blocks are
+filled within their scope and limit, the same way every time.
+"""
+
+from related_pages import fill_blocks, related_index
+from search_index import update_pages
+from site_files import site_pages
+from temp_tree import temp_tree
+
+TEXTS = {
+    'guides/isa.html': ('ISA allowance', "Stocks and shares ISA allowance: save up to £20,000 tax-free "
+                                         "each year in a cash ISA or a stocks and shares ISA."),
+    'guides/isa-limits.html': ('ISA limits', "Cash ISA and stocks and shares ISA allowance limits: up to "
+                                             "£20,000 tax-free each year across every ISA."),
+    'guides/pension.html': ('Pension relief', "Pension contributions get tax relief at your marginal rate, "
+                                              "and employers add workplace pension contributions."),
+    'expenses/mileage.html': ('Mileage', "Claim 45p a mile for business journeys in your own car, "
+                                         "then 25p after 10,000 business miles."),
+    'expenses/home-office.html': ('Working from home', "Claim £6 a week for household costs when "
+                                                       "your employer requires you to work from home."),
+    'expenses/uniform.html': ('Uniforms', "Claim a flat rate expense for washing and repairing a "
+                                          "uniform your job requires you to wear."),
+}
+
+SITE = {
+    page: f"<html><head><title>{title} | Site</title></head><body><h1>{title}</h1><p>{text}</p></body></html>"
+    for page, (title, text) in TEXTS.items()
+}
+
+BLOCKS = """<div data-nosearch>
+    <!-- related:start scope="expenses/" limit="2" -->
+    <!-- related:end -->
+</div>
+<div data-nosearch>
+    <!-- related:start limit="1" -->
+    <!-- related:end -->
+</div>"""
+
+
+def _index(root):
+    entries, _ = update_pages(site_pages(root), {}, root)
+    return entries, related_index(entries)
+
+
+def test_near_identical_pages_pick_each_other():
+    with temp_tree(SITE) as root:
+        entries, index = _index(root)
+    assert sorted(index) == sorted(entries)
+    assert index['guides/isa.html'][0] == 'guides/isa-limits.html'
+    assert index['guides/isa-limits.html'][0] == 'guides/isa.html'
+    assert all(page not in ranked for page, ranked in index.items())
+
+
+def test_related_index_for_some_pages():
+    with temp_tree(SITE) as root:
+        entries, _ = update_pages(site_pages(root), {}, root)
+        index = related_index(entries, ['guides/isa.html'])
+    assert list(index) == ['guides/isa.html']
+
+
+def test_blocks_honour_scope_and_limit():
+    with temp_tree(SITE) as root:
+        entries, index = _index(root)
+        page = 'guides/isa.html'
+        filled = fill_blocks(page, BLOCKS, index[page], sorted(entries), root)
+    scoped, unscoped = filled.split('</div>')[:2]
+    assert scoped.count('class="related-link"') == 2
+    assert scoped.count('href="../expenses/') == 2
+    assert unscoped.count('class="related-link"') == 1
+    assert '<a href="isa-limits.html" class="related-link"><i class="fas fa-arrow-right"></i> ISA limits</a>' in unscoped
+
+
+def test_fill_blocks_is_idempotent():
+    with temp_tree(SITE) as root:
+        entries, index = _index(root)
+        site = sorted(entries)
+        page = 'expenses/mileage.html'
+        once = fill_blocks(page, BLOCKS, index[page], site, root)
+        twice = fill_blocks(page, once, index[page], site, root)
+    assert once != BLOCKS
+    assert twice == once
+    assert once.count('<!-- related:start') == 2 and once.count('<!-- related:end -->') == 2
+    assert 'href="mileage.html"' not in once
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the responsive image stage on tiny generated JPEGs: the displayed size read
+from the file, variant naming, and the <img> to <picture> rewrite.
+"""
+
+import os
+import tempfile
+
+from PIL import Image
+
+from responsive_images import build_variants, jpeg_size, rewrite_img_tags, target_widths
+
+
+def _jpeg(path, width, height, orientation=None):
+    image = Image.new('RGB', (width, height), (26, 107, 92))
+    if orientation is None:
+        image.save(path, 'JPEG')
+    else:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        image.save(path, 'JPEG', exif=exif)
+
+
+def test_jpeg_size_follows_exif_orientation():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'photo.jpg')
+        _jpeg(path, 30, 20)
+        assert jpeg_size(path) == (30, 20)
+        for orientation, size in ((1, (30, 20)), (3, (30, 20)), (6, (20, 30)), (8, (20, 30))):
+            _jpeg(path, 30, 20, orientation)
+            assert jpeg_size(path) == size, orientation
+
+
+def test_target_widths():
+    assert target_widths(30) == [30]
+    assert target_widths(500) == [400, 500]
+    assert target_widths(2000) == [400, 800, 1200]
+
+
+def test_variants_named_by_width_and_srcset_rewritten():
+    with tempfile.TemporaryDirectory() as root:
+        source_dir = os.path.join(root, 'images')
+        out_dir = os.path.join(source_dir, 'responsive')
+        os.makedirs(source_dir)
+        # Stored 20x500 and turned a quarter turn, so it displays 500 wide
+        _jpeg(os.path.join(source_dir, 'banner.jpg'), 20, 500, orientation=6)
+
+        manifest, resized = build_variants(source_dir, out_dir, workers=1)
+        assert resized == 1
+        entry = manifest[os.path.join(source_dir, 'banner.jpg').replace(os.sep, '/')]
+        assert (entry['width'], entry['height']) == (500, 20)
+        for ext in ('webp', 'jpg'):
+            names = [(width, os.path.basename(path)) for width, path in entry['variants'][ext]]
+            assert names == [(400, f'banner-400w.{ext}'), (500, f'banner-500w.{ext}')]
+        with Image.open(os.path.join(out_dir, 'banner-400w.jpg')) as variant:
+            assert variant.size == (400, 16)
+
+        markup = rewrite_img_tags('<p><img src="images/banner.jpg" alt="Banner" style="max-width: 600px"></p>',
+                                  manifest, root)
+        assert markup == (
+            '<p><picture><source type="image/webp" '
+            'srcset="images/responsive/banner-400w.webp 400w, images/responsive/banner-500w.webp 500w" '
+            'sizes="(max-width: 600px) 100vw, 600px">'
+            '<img src="images/responsive/banner-500w.jpg" alt="Banner" style="max-width: 600px" width="500" '
+            'height="20" srcset="images/responsive/banner-400w.jpg 400w, images/responsive/banner-500w.jpg 500w" '
+            'sizes="(max-width: 600px) 100vw, 600px"></picture></p>'
+        )
+        assert rewrite_img_tags(markup, manifest, root) == markup   # Tags with a srcset are left alone
+
+        # Nothing changed, so nothing is resized again
+        assert build_variants(source_dir, out_dir, workers=1) == (manifest, 0)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the result types: they read like the old dicts and can't be modified.
+"""
+
+import json
+import pickle
+
+from generate_stamp_duty_pages import calculate_stamp_duty
+from regenerate_income_tax_pages import calculate_net_pay
+from results import NetPayBatch, NetPayResult, StampDutyBand
+
+
+def raises(error, func):
+    try:
+        func()
+    except error:
+        return True
+    return False
+
+
+def test_results_read_like_dicts():
+    result = NetPayResult(gross=50000, pension=0, adjusted_gross=50000, tax=7486, ni=2994.4,
+                          net=39519.6, monthly=3293.3, weekly=759.99)
+    assert result['net'] == result.net == 39519.6
+    assert dict(result)['tax'] == 7486
+    assert list(result) == list(NetPayResult._fields)
+    assert pickle.loads(pickle.dumps(result)) == result
+
+
+def test_results_are_read_only():
+    band = StampDutyBand('Up to £125,000', 125000, 0.0, 0.0)
+    assert raises(AttributeError, lambda: setattr(band, 'tax', 1.0))
+    assert raises(AttributeError, lambda: setattr(band, 'extra', 1.0))
+    assert raises(AttributeError, lambda: delattr(band, 'tax'))
+    assert raises(TypeError, lambda: StampDutyBand(label='x', colour='red'))
+    assert band.tax == 0.0
+
+
+def test_batch_rows():
+    columns = {field: [float(i), float(i + 1)] for i, field in enumerate(NetPayResult._fields)}
+    batch = NetPayBatch(columns)
+    assert batch.size == 2
+    assert batch.row(1)['gross'] == 1.0
+    assert [row['weekly'] for row in batch.rows()] == [7.0, 8.0]
+    assert raises(AttributeError, lambda: setattr(batch, 'columns', {}))
+
+
+def test_results_round_trip_through_json():
+    result = calculate_net_pay(50000)
+    loaded = json.loads(json.dumps(result._asdict()))
+    assert loaded == dict(result)
+    loaded['net'] = 0                               # A plain dict, so callers can edit it
+    assert result['net'] != 0
+
+    duty = calculate_stamp_duty(300000, is_first_time_buyer=False, is_additional_property=False)
+    loaded = json.loads(json.dumps(duty._asdict()))
+    assert loaded['total_stamp_duty'] == duty['total_stamp_duty']
+    assert loaded['bands'] == [dict(band) for band in duty['bands']]
+
+
+def test_batch_round_trips_through_json():
+    columns = {field: [float(i), float(i + 1)] for i, field in enumerate(NetPayResult._fields)}
+    batch = NetPayBatch(columns)
+    assert json.loads(json.dumps(batch._asdict())) == columns
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
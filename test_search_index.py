@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for the site search index: page keys and the incremental re-index.
+"""
+
+from search_index import tokenize, update_pages
+from site_files import site_pages
+from temp_tree import temp_tree
+
+SITE = {
+    name: f"<html><head><title>{title}</title></head><body><p>Tax-free savings</p></body></html>"
+    for name, title in (('index.html', 'Home'), ('guides/isa.html', 'ISA guide'))
+}
+
+
+def test_tokenize_keeps_thousands_together():
+    assert tokenize("A salary of £50,000 and the ISA") == ['salary', '50000', 'isa']
+
+
+def test_pages_are_keyed_relative_to_root():
+    # Not relative to the working directory, so related_pages can index another root
+    with temp_tree(SITE) as root:
+        entries, reindexed = update_pages(site_pages(root), {}, root)
+    assert sorted(entries) == ['guides/isa.html', 'index.html']
+    assert reindexed == 2
+    assert entries['guides/isa.html']['title'] == 'ISA guide'
+
+
+def test_unchanged_pages_are_not_reindexed():
+    with temp_tree(SITE) as root:
+        entries, _ = update_pages(site_pages(root), {}, root)
+        again, reindexed = update_pages(site_pages(root), entries, root)
+    assert reindexed == 0
+    assert again == entries
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the self-employment profit engine and the savings estimator's schedule.
+Expected figures are worked by hand from the 2025/26 HMRC rates.
+"""
+
+import json
+import re
+
+from self_employment import SAVINGS_SCRIPT, expense_savings, profit_tax, profit_tax_schedule
+
+
+def test_basic_rate_profit():
+    # £30,000: 20% and 6% on the £17,430 above the £12,570 allowance
+    result = profit_tax(30000)
+    assert result['income_tax'] == 3486.00
+    assert result['class4_ni'] == 1045.80
+    assert result['total'] == 4531.80
+
+
+def test_higher_rate_profit():
+    # £60,000: £7,540 basic + £3,892 higher; Class 4 £2,262 main + £194.60 at 2%
+    result = profit_tax(60000)
+    assert result['income_tax'] == 11432.00
+    assert result['class4_ni'] == 2456.60
+
+
+def test_taper_saving_is_62_percent():
+    # Inside the allowance taper each £1 of expenses saves 60% tax plus 2% Class 4
+    savings = expense_savings([110000], [1000])
+    assert savings['income_tax'][0][0] == 600.00
+    assert savings['total'][0][0] == 620.00
+
+
+def test_savings_script_matches_schedule():
+    with open(SAVINGS_SCRIPT, encoding='utf-8') as f:
+        script = f.read()
+    data = json.loads(re.search(r'var PROFIT_TAX_SCHEDULE = (\{.*\});', script).group(1))
+    schedule = profit_tax_schedule()
+    for profit in (0, 12570, 30000, 60000, 110000, 150000, 300000):
+        i = max(0, sum(1 for b in data['breakpoints'] if b <= profit) - 1)
+        in_script = data['values'][i] + data['slopes'][i] * (profit - data['breakpoints'][i])
+        assert abs(in_script - schedule(profit)) < 0.01, profit
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Tests for the published-site walk shared by the checkers, the search index and the deploy bundler.
+"""
+
+import os
+
+from site_files import published_files, site_files, site_pages
+from temp_tree import temp_tree
+
+
+TREE = {
+    '.gitignore': '/REVIEW_DIFF.patch\n/.build-cache/\n__pycache__/\n',
+    'index.html': '', 'styles.css': '', 'robots.txt': '', 'images/a.webp': '',
+    'build_site.py': '', 'README.md': '', 'posts/a.md': '', 'REVIEW_DIFF.patch': '',
+    'requirements-build.txt': '', '.build-cache/state.json': '', '__pycache__/x.pyc': '',
+    'quidwise-pro/page.html': '', 'expenses/index.html': ''
+}
+
+
+def test_site_files_skip_sources_and_other_projects():
+    with temp_tree(TREE) as root:
+        assert site_files(root) == ['expenses/index.html', 'images/a.webp', 'index.html', 'robots.txt', 'styles.css']
+
+
+def test_published_files_follow_gitignore_only():
+    with temp_tree(TREE) as root:
+        published = {path for path, _ in published_files(root)}
+    assert 'build_site.py' in published and 'quidwise-pro/page.html' in published
+    assert not published & {'REVIEW_DIFF.patch', '.build-cache/state.json', '__pycache__/x.pyc'}
+
+
+def test_site_pages_are_paths_under_root():
+    with temp_tree(TREE) as root:
+        assert site_pages(root) == [os.path.join(root, 'expenses', 'index.html'), os.path.join(root, 'index.html')]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared navigation: one copy, used by the generators and the hand-written posts.
+"""
+
+import re
+
+from generate_expense_pages import CATEGORIES, generate_category_page
+from site_template import nav, replace_nav
+
+DRIFTED = """<body>
+    <nav class="main-nav">
+        <div class="nav-container">
+            <button class="mobile-menu-toggle"><i class="fas fa-bars"></i></button>
+            <ul class="nav-menu"><li class="nav-item"><a href="blogs.html" class="nav-link">Blog</a></li></ul>
+        </div>
+    </nav>
+    <main>Post</main>
+</body>"""
+
+
+def test_nav_links_are_relative_to_the_page():
+    links = re.findall(r'(?:href|src)="([^"#]+)"', nav('../'))
+    assert links and all(link.startswith('../') for link in links)
+    assert 'href="index.html"' in nav()
+
+
+def test_replace_nav_swaps_a_drifted_copy():
+    updated = replace_nav(DRIFTED)
+    assert nav() in updated
+    assert 'fa-bars' not in updated
+    assert updated.endswith("    </nav>\n    <main>Post</main>\n</body>")
+    assert replace_nav(updated) == updated
+
+
+def test_generated_pages_use_the_shared_nav():
+    assert nav('../') in generate_category_page(CATEGORIES[0])
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for the lifetime student loan simulator, with figures worked by hand at the
+simulator's 3.2% RPI.
+"""
+
+from student_loans import interest_rate, simulate, simulate_grid
+
+
+def test_loan_paid_off_in_year_2():
+    # Plan 1 at £32,015: 9% of £10,000 a year against £1,000 plus 3.2% interest
+    result = simulate(['plan1'], [32015], [0.0], [1000])
+    assert result['paid_off_year'] == [2]
+    assert result['write_off_year'] == [None]
+    assert result['total_repaid'] == [1036.22]
+    assert result['interest_charged'] == [36.22]
+    assert result['interest_cost'] == [36.22]
+    assert result['written_off'] == [0.0]
+
+
+def test_written_off_loan_has_no_interest_cost():
+    # Below the Plan 2 threshold nothing is repaid and the balance is written off at 30 years
+    result = simulate(['plan2'], [25000], [0.0], [45000])
+    assert result['total_repaid'] == [0.0]
+    assert result['write_off_year'] == [30]
+    assert result['interest_cost'] == [0.0]
+    assert result['interest_charged'][0] > 0
+    assert result['written_off'][0] == round(45000 + result['interest_charged'][0], 2)
+
+
+def test_plan2_interest_tapers_with_income():
+    assert interest_rate('plan2', 27295) == 0.032
+    assert round(interest_rate('plan2', 49130), 4) == 0.062
+    assert round(interest_rate('postgrad', 20000), 4) == 0.062
+
+
+def test_grid_matches_single_scenarios():
+    grid = simulate_grid(['plan1', 'plan5'], [30000, 60000], [0.02], [20000])
+    for i in range(len(grid['plan'])):
+        single = simulate([grid['plan'][i]], [grid['salary'][i]], [0.02], [20000])
+        assert single['total_repaid'][0] == grid['total_repaid'][i]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
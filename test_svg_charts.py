@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the static SVG charts: bars drawn to scale from the tax bands, stacked bars
+that fill the width, and the render cache.
+"""
+
+import re
+
+from regenerate_income_tax_pages import tax_by_band
+from svg_charts import amortization_schedule, band_chart, cache_stats, split_chart
+from tax_schedules import TAX_YEARS, income_tax, income_tax_bands
+
+RULES = TAX_YEARS['2025/26']
+
+# band_chart's drawing area for the bars: width - label column - value label
+BAR_WIDTH = 600 - 230 - 90
+
+
+def _widths(svg):
+    return [float(width) for width in re.findall(r'<rect x="[\d.]+" y="[\d.]+" width="([\d.]+)"', svg)]
+
+
+def test_band_widths_add_up_to_income_tax_bands():
+    # £130,000: no allowance left, so tax in all three bands
+    salary = 130000
+    bands = tax_by_band(salary)
+    top = max(amount for _, amount in bands)
+    drawn = [width / BAR_WIDTH * top for width in _widths(band_chart(bands))]
+
+    expected = [0] + [amount * rate for _, rate, amount in income_tax_bands(salary, RULES)]
+    slack = 0.05 / BAR_WIDTH * top                  # Widths are drawn to 0.1
+    assert len(drawn) == len(expected)
+    for got, want in zip(drawn, expected):
+        assert abs(got - want) <= slack, (got, want)
+    assert abs(sum(drawn) - income_tax(salary, RULES)) <= slack * len(drawn)
+
+
+def test_split_chart_fills_the_bar():
+    svg = split_chart([('Income Tax', 4486, 'tax'), ('National Insurance', 2994.4, 'ni'),
+                       ('Take-home', 42519.6, 'net')])
+    bars = _widths(svg)[:3]                         # Then one 12px legend swatch per segment
+    assert abs(sum(bars) - 600) < 0.2
+    assert '£42,520 (85%)' in svg
+
+
+def test_identical_charts_render_once():
+    before = cache_stats()
+    first = band_chart([('Basic rate (20%)', 1234.5)], "Cache test")
+    second = band_chart([('Basic rate (20%)', 1234.5)], "Cache test")
+    after = cache_stats()
+    assert first == second
+    assert after['rendered'] - before['rendered'] == 1
+    assert after['reused'] - before['reused'] == 1
+
+
+def test_amortization_repays_the_loan():
+    payment, balances, interest = amortization_schedule(200000, 0.05, 25)
+    assert abs(payment - 1169.18) < 0.01
+    assert len(balances) == 26 and balances[0] == 200000
+    assert balances[-1] < 0.01
+    assert abs(interest[-1] - (payment * 300 - 200000)) < 0.01
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
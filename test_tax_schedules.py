@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled tax schedules: every schedule and batch path must agree with the
+scalar HMRC rules it was compiled from, to the penny.
+"""
+
+from differential_harness import boundary_points, check_batch_engine, reference_results
+from regenerate_income_tax_pages import calculate_net_pay
+from tax_schedules import (TAX_YEARS, class1_ni, class1_ni_schedule, class4_ni, class4_ni_schedule,
+                           income_tax, income_tax_schedule, net_pay_batch)
+
+INCOMES = [0, 1, 12570, 12571, 30000, 50270, 50271, 75000, 100000, 100001, 110000,
+           125140, 125141, 150000, 500000]
+
+
+def test_batch_matches_scalar():
+    for tax_year, rules in TAX_YEARS.items():
+        for schedule, func in ((income_tax_schedule(tax_year), income_tax),
+                               (class1_ni_schedule(tax_year), class1_ni),
+                               (class4_ni_schedule(tax_year), class4_ni)):
+            for income, value in zip(INCOMES, schedule.batch(INCOMES)):
+                assert abs(value - func(income, rules)) < 0.005, (tax_year, func.__name__, income)
+                assert value == schedule(income)
+
+
+def test_income_tax_figures():
+    # 2025/26: basic rate to £50,270, 60% effective in the taper, 45% above £125,140
+    schedule = income_tax_schedule('2025/26')
+    assert round(schedule(30000), 2) == 3486.00
+    assert round(schedule(60000), 2) == 11432.00
+    assert round(schedule(125140), 2) == 42516.00
+    assert round(schedule.marginal_rate(110000), 2) == 0.60
+    assert round(schedule.marginal_rate(130000), 2) == 0.45
+
+
+def test_net_pay_batch_matches_calculate_net_pay():
+    batch = net_pay_batch(INCOMES)
+    for i, salary in enumerate(INCOMES):
+        result = calculate_net_pay(salary)
+        for field in ('tax', 'ni', 'net'):
+            assert abs(batch[field][i] - result[field]) < 0.011, (salary, field)
+
+
+def test_harness_boundaries_agree():
+    salaries = boundary_points()
+    pensions = [0, 5] * (len(salaries) // 2) + [0] * (len(salaries) % 2)
+    count, first = check_batch_engine(salaries, pensions, reference_results(salaries, pensions))
+    assert count == 0, first
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
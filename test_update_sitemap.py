@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-place sitemap.xml edits made by partial rebuilds.
+"""
+
+import os
+
+from temp_tree import temp_tree
+from update_sitemap import SITE_URL, _entry, update_entries
+
+SITEMAP = ('<?xml version="1.0" encoding="UTF-8"?>\n<urlset>\n'
+           + _entry(f"{SITE_URL}/", '2025-01-01', 'weekly', '1.0')
+           + _entry(f"{SITE_URL}/expenses/travel.html", '2025-01-01', 'monthly', '0.7')
+           + _entry(f"{SITE_URL}/expenses/uniforms.html", '2025-01-01', 'monthly', '0.7')
+           + _entry(f"{SITE_URL}/guides/isa.html", '2025-01-01', 'yearly', '0.5')
+           + '\n</urlset>')
+
+
+def _locs(xml):
+    return [line.strip()[5:-6].replace(SITE_URL, '') for line in xml.splitlines() if '<loc>' in line]
+
+
+def test_changes_additions_and_removals_in_one_call():
+    with temp_tree({'sitemap.xml': SITEMAP}) as root:
+        path = os.path.join(root, 'sitemap.xml')
+        touched = update_entries(['expenses/travel.html', 'expenses/mileage.html', 'expenses/tools.html',
+                                  'tools/a.html', 'tools/b.html', 'about.html'],
+                                 ['expenses/uniforms.html'], '2026-10-19', path)
+        with open(path, encoding='utf-8') as f:
+            xml = f.read()
+    assert touched == 7
+    assert _locs(xml) == ['/', '/expenses/travel.html', '/expenses/mileage.html', '/expenses/tools.html',
+                          '/guides/isa.html', '/tools/a.html', '/tools/b.html', '/about.html']
+    assert xml.count('<lastmod>2026-10-19</lastmod>') == 6
+    # New pages take their changefreq and priority from the last page in their directory
+    assert _entry(f"{SITE_URL}/expenses/tools.html", '2026-10-19', 'monthly', '0.7') in xml
+    assert xml.endswith('</url>\n\n</urlset>')
+
+
+def test_nothing_to_do_leaves_the_file_alone():
+    with temp_tree({'sitemap.xml': SITEMAP}) as root:
+        path = os.path.join(root, 'sitemap.xml')
+        assert update_entries(['guides/isa.html'], [], '2025-01-01', path) == 1
+        with open(path, encoding='utf-8') as f:
+            assert f.read() == SITEMAP
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"ok {name}")
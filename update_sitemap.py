@@ -4,7 +4,15 @@ Generate updated sitemap.xml with all new pre-filled calculator pages and blog p
 """
 
 import os
-from datetime import datetime
+import re
+from collections import defaultdict
+from datetime import datetime, date
+
+from blog_posts import load_posts, sitemap_entries
+
+SITE_URL = 'https://www.quidwise.co.uk'
+
+URL_BLOCK = re.compile(r'[ \t]*<url>\s*<loc>(?P<loc>[^<]+)</loc>.*?</url>\n', re.S)
 
 def generate_sitemap_entries():
     """Generate sitemap entries for all new pages"""
@@ -49,21 +57,6 @@ def generate_sitemap_entries():
             'priority': '0.6'
         })
 
-    # New Salary Blog Posts (priority 0.7, changefreq monthly)
-    salary_blogs = [
-        ('blog-25k-salary-take-home.html', '2025-11-24'),
-        ('blog-42k-salary-take-home.html', '2025-11-23'),
-        ('blog-60k-salary-take-home.html', '2025-11-22')
-    ]
-
-    for blog_file, date in salary_blogs:
-        entries.append({
-            'url': f'https://www.quidwise.co.uk/{blog_file}',
-            'lastmod': date,
-            'changefreq': 'monthly',
-            'priority': '0.7'
-        })
-
     return entries
 
 def generate_sitemap_xml():
@@ -270,185 +263,115 @@ def generate_sitemap_xml():
 
     xml_content += '''
   <!-- Blog Posts - Latest First -->
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-self-employed-expenses-2026.html</loc>
-    <lastmod>2026-03-13</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-interest-rate-cuts-mortgages-2026.html</loc>
-    <lastmod>2026-03-06</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-stamp-duty-ftb-2026.html</loc>
-    <lastmod>2026-02-27</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-30k-salary-take-home-2026.html</loc>
-    <lastmod>2026-02-20</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-tax-year-end-planning-2026.html</loc>
-    <lastmod>2026-02-13</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-25k-salary-take-home.html</loc>
-    <lastmod>2025-11-24</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-42k-salary-take-home.html</loc>
-    <lastmod>2025-11-23</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-60k-salary-take-home.html</loc>
-    <lastmod>2025-11-22</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-200k-mortgage-repayments.html</loc>
-    <lastmod>2025-11-20</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-sdlt-budget-changes.html</loc>
-    <lastmod>2025-11-20</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-350k-stamp-duty-ftb.html</loc>
-    <lastmod>2025-11-19</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-40k-vs-45k-salary.html</loc>
-    <lastmod>2025-11-18</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-60k-salary-student-loan.html</loc>
-    <lastmod>2025-11-17</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-35k-salary-take-home.html</loc>
-    <lastmod>2025-11-16</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-draft-excluder.html</loc>
-    <lastmod>2025-11-19</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-mortgage-costs-2025.html</loc>
-    <lastmod>2025-11-17</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-fscs-limit-increase.html</loc>
-    <lastmod>2025-11-18</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-budget-2025-autumn.html</loc>
-    <lastmod>2025-11-11</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-broadband-speed-guide.html</loc>
-    <lastmod>2025-11-04</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-budget-2025.html</loc>
-    <lastmod>2025-10-28</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-mortgage-rates-2024.html</loc>
-    <lastmod>2025-10-21</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-mortgage-overpayment.html</loc>
-    <lastmod>2025-10-14</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
+  <!-- blog-posts:start -->
+'''
 
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-isa-guide.html</loc>
-    <lastmod>2025-10-07</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
+    # Blog posts, from their front matter in posts/
+    xml_content += '\n'.join(_entry(entry['url'], entry['lastmod'], entry['changefreq'], entry['priority'])
+                              for entry in sitemap_entries(load_posts()))
 
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-income-tax-guide.html</loc>
-    <lastmod>2025-09-25</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
-
-  <url>
-    <loc>https://www.quidwise.co.uk/blog-stamp-duty-guide.html</loc>
-    <lastmod>2025-09-18</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.7</priority>
-  </url>
+    xml_content += '''  <!-- blog-posts:end -->
 
 </urlset>'''
 
     return xml_content
 
+def _entry(loc, lastmod, changefreq, priority):
+    return (f"  <url>\n    <loc>{loc}</loc>\n    <lastmod>{lastmod}</lastmod>\n"
+            f"    <changefreq>{changefreq}</changefreq>\n    <priority>{priority}</priority>\n  </url>\n")
+
+
+def update_entries(changed=(), removed=(), lastmod=None, path='sitemap.xml'):
+    """
+    Edit sitemap.xml in place for a partial rebuild: bump <lastmod> for changed pages,
+    add entries for pages it doesn't list yet (next to the pages in the same directory,
+    with their changefreq and priority) and drop removed pages.
+    Paths are relative to the site root. Returns the number of entries touched.
+    """
+    lastmod = lastmod or date.today().isoformat()
+    with open(path, encoding='utf-8') as f:
+        xml = f.read()
+
+    # Parse the <url> blocks once, collect every edit by offset, then splice them in one pass
+    removed_locs = {f"{SITE_URL}/{page}" for page in removed}
+    matches = list(URL_BLOCK.finditer(xml))
+    blocks = {m.group('loc'): m for m in matches if m.group('loc') not in removed_locs}
+    replaced = {m.start(): (m.end(), '') for m in matches if m.group('loc') in removed_locs}   # start -> (end, text)
+    touched = len(replaced)
+    inserted = defaultdict(list)
+    last_sibling = {}
+    appended = []           # Groups of new pages with no siblings, one per directory, added at the end
+    new_directories = {}
+    added = set()
+
+    for page in changed:
+        loc = f"{SITE_URL}/{page}"
+        if loc in blocks:
+            block = blocks[loc]
+            updated = re.sub(r'<lastmod>[^<]*</lastmod>', f'<lastmod>{lastmod}</lastmod>', block.group(0))
+            replaced[block.start()] = (block.end(), updated)
+        elif loc not in added:
+            added.add(loc)
+            directory = f"{SITE_URL}/{os.path.dirname(page)}/" if os.path.dirname(page) else None
+            if directory not in last_sibling:
+                siblings = [m for l, m in blocks.items() if directory and l.startswith(directory)]
+                last_sibling[directory] = siblings[-1] if siblings else None
+            last = last_sibling[directory]
+            if last:
+                changefreq = re.search(r'<changefreq>([^<]*)', last.group(0))
+                priority = re.search(r'<priority>([^<]*)', last.group(0))
+                inserted[last.end()].append(_entry(loc, lastmod, changefreq.group(1) if changefreq else 'monthly',
+                                                   priority.group(1) if priority else '0.6'))
+            else:
+                entry = _entry(loc, lastmod, 'monthly', '0.6')
+                if directory in new_directories:
+                    new_directories[directory].append(entry)
+                else:
+                    appended.append([entry])
+                    if directory:
+                        new_directories[directory] = appended[-1]
+        touched += 1
+    if appended:
+        inserted[xml.rindex('</urlset>')].extend(''.join(group) + '\n' for group in appended)
+
+    pieces = []
+    position = 0
+    for offset in sorted(replaced.keys() | inserted.keys()):
+        pieces.append(xml[position:offset])
+        pieces.extend(inserted.get(offset, ()))
+        position = offset
+        if offset in replaced:
+            position, text = replaced[offset]
+            pieces.append(text)
+    pieces.append(xml[position:])
+    updated_xml = ''.join(pieces)
+
+    if updated_xml != xml:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(updated_xml)
+    return touched
+
+
+def update_section(name, entries, path='sitemap.xml'):
+    """
+    Replace the entries between <!-- name:start --> and <!-- name:end --> (entries shaped
+    like generate_sitemap_entries'). Returns True if sitemap.xml changed.
+    """
+    section = re.compile(rf'(<!-- {re.escape(name)}:start -->\n)(.*?)([ \t]*<!-- {re.escape(name)}:end -->)', re.S)
+    with open(path, encoding='utf-8') as f:
+        xml = f.read()
+    body = '\n'.join(_entry(entry['url'], entry['lastmod'], entry['changefreq'], entry['priority'])
+                     for entry in entries)
+    updated, count = section.subn(lambda m: m.group(1) + body + m.group(3), xml, count=1)
+    if not count:
+        raise ValueError(f"{path} has no {name} section")
+    if updated == xml:
+        return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(updated)
+    return True
+
+
 def main():
     """Generate and save the updated sitemap.xml"""
 